@@ -1,11 +1,15 @@
 import sqlite3
 import os
-import csv
-import json
+import re
 import sys
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+import metricas
+from cache_disponibilidad import CacheDisponibilidad
+from cache_reportes import CacheReportes
+from calendario import ANTICIPACION_DIAS, Calendario
 
 DB_FILE = "coworking.db"
 
@@ -15,6 +19,18 @@ TURNOS = {
     "N": "Nocturno",
 }
 
+ESTADOS = ("activa", "cancelada")
+
+# Cada turno es un intervalo predefinido del día, en minutos desde la medianoche.
+# Las reservaciones por horario usan cualquier intervalo dentro del horario de la sede.
+HORARIOS_TURNO = {
+    "M": (8 * 60, 13 * 60),
+    "V": (13 * 60, 18 * 60),
+    "N": (18 * 60, 22 * 60),
+}
+APERTURA = min(inicio for inicio, _ in HORARIOS_TURNO.values())
+CIERRE = max(fin for _, fin in HORARIOS_TURNO.values())
+
 @dataclass
 class Cliente:
     id: str
@@ -36,60 +52,809 @@ class Reservacion:
     fecha: datetime
     turno: str
     estado: str
+    hora_inicio: Optional[int] = None
+    hora_fin: Optional[int] = None
 
-class BaseDatos:
-    def _init_(self, db_file: str = DB_FILE):
-        self.db_file = db_file
-        self.conn = sqlite3.connect(
-            db_file,
-            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+@dataclass
+class EntradaEspera:
+    id: int
+    evento: str
+    id_cliente: str
+    fecha: datetime
+    turno: str
+    id_sala: Optional[str]
+    cupo_minimo: Optional[int]
+    estado: str
+    folio: Optional[int]
+    folio_liberado: Optional[int]
+
+@dataclass
+class Disponibilidad:
+    sala: Sala
+    fecha: datetime
+    turno: str
+
+def trigramas(texto: str) -> set:
+    texto = " ".join(texto.lower().split())
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+def hora_a_minutos(texto: str) -> int:
+    try:
+        horas, minutos = (int(parte) for parte in texto.strip().split(":"))
+    except ValueError:
+        raise ValueError("Hora inválida. Use el formato HH:MM (ejemplo: 09:30).")
+    if not (0 <= horas <= 24 and 0 <= minutos < 60) or horas * 60 + minutos > 24 * 60:
+        raise ValueError("Hora inválida. Use el formato HH:MM (ejemplo: 09:30).")
+    return horas * 60 + minutos
+
+def minutos_a_hora(minutos: int) -> str:
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+def turno_de_minuto(minuto: int) -> str:
+    # Turno al que pertenece el inicio de un intervalo; con él se agrupa en reportes y filtros
+    for turno, (inicio, fin) in HORARIOS_TURNO.items():
+        if inicio <= minuto < fin:
+            return turno
+    raise ValueError(f"La hora debe estar entre {minutos_a_hora(APERTURA)} y {minutos_a_hora(CIERRE)}.")
+
+COLUMNAS_RESERVACION = ("folio", "evento", "id_cliente", "id_sala", "fecha", "dia", "turno", "estado")
+
+# ---------------------------
+# Esquema y migraciones
+# ---------------------------
+def _existe_tabla(cursor: sqlite3.Cursor, nombre: str) -> bool:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (nombre,))
+    return cursor.fetchone() is not None
+
+def _existe_columna(cursor: sqlite3.Cursor, tabla: str, columna: str) -> bool:
+    cursor.execute("SELECT 1 FROM pragma_table_info(?) WHERE name = ?", (tabla, columna))
+    return cursor.fetchone() is not None
+
+def _poblar_ocupacion(cursor: sqlite3.Cursor) -> int:
+    cursor.execute("DELETE FROM ocupacion")
+    # Si una base antigua tiene reservaciones duplicadas se conserva la de menor folio
+    cursor.execute("""
+        INSERT OR IGNORE INTO ocupacion (dia, turno, id_sala, folio)
+        SELECT DATE(fecha), turno, id_sala, folio FROM reservaciones
+        WHERE estado = 'activa'
+        ORDER BY folio
+    """)
+    cursor.execute("SELECT COUNT(*) FROM ocupacion")
+    return cursor.fetchone()[0]
+
+# Coordenadas de la tabla intervalos: minutos desde 1970-01-01 y número de sala (S0007 -> 7)
+MINUTO_ABSOLUTO_SQL = "CAST(ROUND((julianday(DATE({fecha})) - 2440587.5) * 1440) AS INTEGER)"
+NUMERO_SALA_SQL = "CAST(SUBSTR({sala}, 2) AS INTEGER)"
+
+def _minuto_absoluto(dia: date, minuto: int) -> int:
+    return (dia - date(1970, 1, 1)).days * 1440 + minuto
+
+def _numero_sala(id_sala: str) -> int:
+    return int(id_sala[1:])
+
+def _columnas_intervalo(fila: str) -> str:
+    # (folio, desde, hasta, sala_min, sala_max) de una reservación unida con horarios_turno h;
+    # los turnos toman su horario de esa tabla y las reservaciones por horario, el propio.
+    base = MINUTO_ABSOLUTO_SQL.format(fecha=f"{fila}.fecha")
+    sala = NUMERO_SALA_SQL.format(sala=f"{fila}.id_sala")
+    return (f"{fila}.folio, {base} + COALESCE({fila}.hora_inicio, h.inicio), "
+            f"{base} + COALESCE({fila}.hora_fin, h.fin), {sala}, {sala}")
+
+def _turnos_ocupados_sql(tabla: str) -> str:
+    # (id_sala, dia, turno) de cada reservación activa de la tabla entre :desde y :hasta;
+    # una reservación por horario ocupa todos los turnos con los que se cruza.
+    return f"""
+        SELECT r.id_sala, r.dia, h.clave FROM {tabla} r
+        JOIN horarios_turno h ON CASE WHEN r.hora_inicio IS NULL THEN h.clave = r.turno
+                                      ELSE r.hora_inicio < h.fin AND h.inicio < r.hora_fin END
+        WHERE r.dia BETWEEN :desde AND :hasta AND r.estado = 'activa'
+    """
+
+def _poblar_intervalos(cursor: sqlite3.Cursor) -> int:
+    cursor.execute("DELETE FROM intervalos")
+    cursor.execute(f"""
+        INSERT INTO intervalos (folio, desde, hasta, sala_min, sala_max)
+        SELECT {_columnas_intervalo("r")}
+        FROM reservaciones r JOIN horarios_turno h ON h.clave = r.turno
+        WHERE r.estado = 'activa'
+    """)
+    cursor.execute("SELECT COUNT(*) FROM intervalos")
+    return cursor.fetchone()[0]
+
+def _poblar_busqueda(cursor: sqlite3.Cursor) -> int:
+    cursor.execute("DELETE FROM reservaciones_fts")
+    cursor.execute("""
+        INSERT INTO reservaciones_fts (rowid, evento, cliente)
+        SELECT r.folio, r.evento, COALESCE(c.nombres || ' ' || c.apellidos, '')
+        FROM reservaciones r LEFT JOIN clientes c ON c.id = r.id_cliente
+    """)
+    return cursor.rowcount
+
+def _migracion_esquema_base(cursor: sqlite3.Cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS clientes (
+            id TEXT PRIMARY KEY,
+            nombres TEXT NOT NULL,
+            apellidos TEXT NOT NULL
         )
-        self._inicializar()
+    """)
 
-    def _inicializar(self):
-        cursor = self.conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS salas (
+            id TEXT PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            cupo INTEGER NOT NULL
+        )
+    """)
+
+    # Las bases de Evidencia3 guardan el folio como texto ("R0001") y no tienen estado
+    if _existe_tabla(cursor, "reservaciones") and not _existe_columna(cursor, "reservaciones", "estado"):
+        cursor.execute("ALTER TABLE reservaciones RENAME TO reservaciones_evidencia3")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS reservaciones (
+            folio INTEGER PRIMARY KEY AUTOINCREMENT,
+            evento TEXT NOT NULL,
+            id_cliente TEXT NOT NULL,
+            id_sala TEXT NOT NULL,
+            fecha timestamp NOT NULL,
+            turno TEXT NOT NULL,
+            estado TEXT NOT NULL DEFAULT 'activa',
+            FOREIGN KEY (id_cliente) REFERENCES clientes(id),
+            FOREIGN KEY (id_sala) REFERENCES salas(id)
+        )
+    """)
 
+    if _existe_tabla(cursor, "reservaciones_evidencia3"):
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS clientes (
-                id TEXT PRIMARY KEY,
-                nombres TEXT NOT NULL,
-                apellidos TEXT NOT NULL
-            )
+            INSERT INTO reservaciones (folio, evento, id_cliente, id_sala, fecha, turno, estado)
+            SELECT CAST(SUBSTR(folio, 2) AS INTEGER), evento, id_cliente, id_sala, fecha, turno, 'activa'
+            FROM reservaciones_evidencia3
         """)
+        cursor.execute("DROP TABLE reservaciones_evidencia3")
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS salas (
-                id TEXT PRIMARY KEY,
-                nombre TEXT NOT NULL,
-                cupo INTEGER NOT NULL
-            )
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS contadores (
+            tipo TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL
+        )
+    """)
+
+    for tipo in ["C", "S"]:
+        cursor.execute("INSERT OR IGNORE INTO contadores (tipo, valor) VALUES (?, 0)", (tipo,))
+    cursor.execute("DELETE FROM contadores WHERE tipo = 'R'")
+
+def _migracion_ocupacion(cursor: sqlite3.Cursor):
+    # Una fila por (dia, turno, sala) con reservación activa; la llave
+    # primaria impide además dos reservaciones activas en el mismo espacio.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ocupacion (
+            dia TEXT NOT NULL,
+            turno TEXT NOT NULL,
+            id_sala TEXT NOT NULL,
+            folio INTEGER NOT NULL,
+            PRIMARY KEY (dia, turno, id_sala)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS ocupacion_insertar
+        AFTER INSERT ON reservaciones
+        WHEN NEW.estado = 'activa'
+        BEGIN
+            INSERT INTO ocupacion (dia, turno, id_sala, folio)
+            VALUES (DATE(NEW.fecha), NEW.turno, NEW.id_sala, NEW.folio);
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS ocupacion_actualizar
+        AFTER UPDATE OF estado, fecha, turno, id_sala ON reservaciones
+        BEGIN
+            DELETE FROM ocupacion
+            WHERE dia = DATE(OLD.fecha) AND turno = OLD.turno
+              AND id_sala = OLD.id_sala AND folio = OLD.folio;
+            INSERT INTO ocupacion (dia, turno, id_sala, folio)
+            SELECT DATE(NEW.fecha), NEW.turno, NEW.id_sala, NEW.folio
+            WHERE NEW.estado = 'activa';
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS ocupacion_eliminar
+        AFTER DELETE ON reservaciones
+        BEGIN
+            DELETE FROM ocupacion
+            WHERE dia = DATE(OLD.fecha) AND turno = OLD.turno
+              AND id_sala = OLD.id_sala AND folio = OLD.folio;
+        END
+    """)
+
+    _poblar_ocupacion(cursor)
+
+def _migracion_busqueda(cursor: sqlite3.Cursor):
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS reservaciones_fts USING fts5(
+            evento,
+            cliente,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS busqueda_insertar
+        AFTER INSERT ON reservaciones
+        BEGIN
+            INSERT INTO reservaciones_fts (rowid, evento, cliente)
+            SELECT NEW.folio, NEW.evento,
+                   COALESCE((SELECT nombres || ' ' || apellidos FROM clientes WHERE id = NEW.id_cliente), '');
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS busqueda_actualizar
+        AFTER UPDATE OF evento, id_cliente ON reservaciones
+        BEGIN
+            DELETE FROM reservaciones_fts WHERE rowid = OLD.folio;
+            INSERT INTO reservaciones_fts (rowid, evento, cliente)
+            SELECT NEW.folio, NEW.evento,
+                   COALESCE((SELECT nombres || ' ' || apellidos FROM clientes WHERE id = NEW.id_cliente), '');
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS busqueda_eliminar
+        AFTER DELETE ON reservaciones
+        BEGIN
+            DELETE FROM reservaciones_fts WHERE rowid = OLD.folio;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS busqueda_cliente
+        AFTER UPDATE OF nombres, apellidos ON clientes
+        BEGIN
+            UPDATE reservaciones_fts SET cliente = NEW.nombres || ' ' || NEW.apellidos
+            WHERE rowid IN (SELECT folio FROM reservaciones WHERE id_cliente = NEW.id);
+        END
+    """)
+
+    _poblar_busqueda(cursor)
+
+def _migracion_busqueda_clientes(cursor: sqlite3.Cursor):
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_clientes_apellidos
+        ON clientes (apellidos COLLATE NOCASE, nombres COLLATE NOCASE)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_clientes_nombres
+        ON clientes (nombres COLLATE NOCASE, apellidos COLLATE NOCASE)
+    """)
+
+    # Índice de trigramas para encontrar clientes aunque el nombre tenga errores de dedo
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS clientes_trigramas USING fts5(
+            nombre_completo,
+            tokenize = 'trigram'
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trigramas_insertar
+        AFTER INSERT ON clientes
+        BEGIN
+            INSERT INTO clientes_trigramas (rowid, nombre_completo)
+            VALUES (NEW.rowid, NEW.nombres || ' ' || NEW.apellidos);
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trigramas_actualizar
+        AFTER UPDATE OF nombres, apellidos ON clientes
+        BEGIN
+            UPDATE clientes_trigramas SET nombre_completo = NEW.nombres || ' ' || NEW.apellidos
+            WHERE rowid = OLD.rowid;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trigramas_eliminar
+        AFTER DELETE ON clientes
+        BEGIN
+            DELETE FROM clientes_trigramas WHERE rowid = OLD.rowid;
+        END
+    """)
+
+    cursor.execute("DELETE FROM clientes_trigramas")
+    cursor.execute("""
+        INSERT INTO clientes_trigramas (rowid, nombre_completo)
+        SELECT rowid, nombres || ' ' || apellidos FROM clientes
+    """)
+
+def _migracion_historico(cursor: sqlite3.Cursor):
+    # Reservaciones pasadas o canceladas que ya no forman parte de la operación diaria
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS reservaciones_historico (
+            folio INTEGER PRIMARY KEY,
+            evento TEXT NOT NULL,
+            id_cliente TEXT NOT NULL,
+            id_sala TEXT NOT NULL,
+            fecha timestamp NOT NULL,
+            turno TEXT NOT NULL,
+            estado TEXT NOT NULL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS parametros (
+            clave TEXT PRIMARY KEY,
+            valor TEXT NOT NULL
+        )
+    """)
+
+def _migracion_columna_dia(cursor: sqlite3.Cursor):
+    # Día en formato ISO junto a la fecha completa: se compara con índice y se decodifica sin convertidores
+    for tabla_reservas in ["reservaciones", "reservaciones_historico"]:
+        if not _existe_columna(cursor, tabla_reservas, "dia"):
+            cursor.execute(f"ALTER TABLE {tabla_reservas} ADD COLUMN dia TEXT")
+        cursor.execute(f"UPDATE {tabla_reservas} SET dia = DATE(fecha) WHERE dia IS NULL")
+    cursor.execute("DROP INDEX IF EXISTS idx_historico_fecha")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservaciones_dia ON reservaciones (dia)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_historico_dia ON reservaciones_historico (dia)")
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS dia_insertar
+        AFTER INSERT ON reservaciones
+        WHEN NEW.dia IS NULL OR NEW.dia <> DATE(NEW.fecha)
+        BEGIN
+            UPDATE reservaciones SET dia = DATE(NEW.fecha) WHERE folio = NEW.folio;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS dia_actualizar
+        AFTER UPDATE OF fecha ON reservaciones
+        BEGIN
+            UPDATE reservaciones SET dia = DATE(NEW.fecha) WHERE folio = NEW.folio;
+        END
+    """)
+
+def _migracion_versiones(cursor: sqlite3.Cursor):
+    # Contador de cambios por día (clave ISO) y global ('*', para clientes y salas);
+    # cualquier escritura que toque un día aumenta su versión.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS versiones (
+            clave TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+
+    for tabla_reservas in ["reservaciones", "reservaciones_historico"]:
+        for evento, dias in [
+            ("INSERT", ["NEW"]),
+            ("UPDATE", ["OLD", "NEW"]),
+            ("DELETE", ["OLD"]),
+        ]:
+            incrementos = "".join(f"""
+                INSERT INTO versiones (clave, valor) VALUES (DATE({fila}.fecha), 1)
+                ON CONFLICT (clave) DO UPDATE SET valor = valor + 1;"""
+                for fila in dias)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS version_{tabla_reservas}_{evento.lower()}
+                AFTER {evento} ON {tabla_reservas}
+                BEGIN{incrementos}
+                END
+            """)
+
+    for tabla in ["clientes", "salas"]:
+        for evento in ["UPDATE", "DELETE"]:
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS version_{tabla}_{evento.lower()}
+                AFTER {evento} ON {tabla}
+                BEGIN
+                    INSERT INTO versiones (clave, valor) VALUES ('*', 1)
+                    ON CONFLICT (clave) DO UPDATE SET valor = valor + 1;
+                END
+            """)
+
+def _migracion_indices_busqueda_salas(cursor: sqlite3.Cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_salas_cupo ON salas (cupo, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ocupacion_sala ON ocupacion (id_sala, turno, dia)")
+
+def _migracion_lista_espera(cursor: sqlite3.Cursor):
+    # Solicitudes para un espacio ocupado: una sala concreta (id_sala) o cualquiera
+    # con el cupo mínimo indicado. Se atienden en orden de llegada (id).
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS lista_espera (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            evento TEXT NOT NULL,
+            id_cliente TEXT NOT NULL,
+            dia TEXT NOT NULL,
+            turno TEXT NOT NULL,
+            id_sala TEXT,
+            cupo_minimo INTEGER,
+            estado TEXT NOT NULL DEFAULT 'pendiente',
+            folio INTEGER,
+            folio_liberado INTEGER,
+            FOREIGN KEY (id_cliente) REFERENCES clientes(id),
+            FOREIGN KEY (id_sala) REFERENCES salas(id)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_lista_espera_pendientes
+        ON lista_espera (dia, turno, id) WHERE estado = 'pendiente'
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lista_espera_liberado ON lista_espera (folio_liberado)")
+
+COLUMNAS_CAMBIOS = {
+    "clientes": ("id", ["id", "nombres", "apellidos"]),
+    "salas": ("id", ["id", "nombre", "cupo"]),
+    "reservaciones": ("folio", ["folio", "evento", "id_cliente", "id_sala", "fecha", "turno", "estado"]),
+    "reservaciones_historico": ("folio", ["folio", "evento", "id_cliente", "id_sala", "fecha", "turno", "estado"]),
+}
+
+def _json_fila(fila: str, columnas: List[str]) -> str:
+    pares = ", ".join(f"'{c}', {fila}.{c}" for c in columnas)
+    return f"json_object({pares})"
+
+def _migracion_cambios(cursor: sqlite3.Cursor):
+    # Bitácora de cambios para sincronización incremental: cada escritura deja una
+    # fila con secuencia creciente, operación y la fila resultante (o la borrada).
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cambios (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabla TEXT NOT NULL,
+            operacion TEXT NOT NULL,
+            clave TEXT NOT NULL,
+            datos TEXT NOT NULL,
+            momento TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+        )
+    """)
+
+    for tabla, (clave, columnas) in COLUMNAS_CAMBIOS.items():
+        # El estado actual entra como una inserción por fila, así un consumidor que
+        # empieza desde la secuencia 0 obtiene una copia completa.
+        cursor.execute(f"""
+            INSERT INTO cambios (tabla, operacion, clave, datos)
+            SELECT '{tabla}', 'INSERT', {clave}, {_json_fila(tabla, columnas)}
+            FROM {tabla} ORDER BY {clave}
+        """)
+        # La columna dia se deriva de fecha; su ajuste no es un cambio
+        distintas = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in columnas)
+        for evento, fila, condicion in [
+            ("INSERT", "NEW", ""),
+            ("UPDATE", "NEW", f"WHEN {distintas}"),
+            ("DELETE", "OLD", ""),
+        ]:
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS cambios_{tabla}_{evento.lower()}
+                AFTER {evento} ON {tabla}
+                {condicion}
+                BEGIN
+                    INSERT INTO cambios (tabla, operacion, clave, datos)
+                    VALUES ('{tabla}', '{evento}', {fila}.{clave}, {_json_fila(fila, columnas)});
+                END
+            """)
+
+def _triggers_cambios(cursor: sqlite3.Cursor, tabla: str, clave: str, columnas: List[str]):
+    # La columna dia se deriva de fecha; su ajuste no es un cambio
+    distintas = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in columnas)
+    for evento, fila, condicion in [
+        ("INSERT", "NEW", ""),
+        ("UPDATE", "NEW", f"WHEN {distintas}"),
+        ("DELETE", "OLD", ""),
+    ]:
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS cambios_{tabla}_{evento.lower()}
+            AFTER {evento} ON {tabla}
+            {condicion}
+            BEGIN
+                INSERT INTO cambios (tabla, operacion, clave, datos)
+                VALUES ('{tabla}', '{evento}', {fila}.{clave}, {_json_fila(fila, columnas)});
+            END
         """)
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS reservaciones (
-                folio INTEGER PRIMARY KEY AUTOINCREMENT,
-                evento TEXT NOT NULL,
-                id_cliente TEXT NOT NULL,
-                id_sala TEXT NOT NULL,
-                fecha timestamp NOT NULL,
-                turno TEXT NOT NULL,
-                estado TEXT NOT NULL DEFAULT 'activa',
-                FOREIGN KEY (id_cliente) REFERENCES clientes(id),
-                FOREIGN KEY (id_sala) REFERENCES salas(id)
-            )
+def _migracion_calendario(cursor: sqlite3.Cursor):
+    # Días festivos y cierres de la sede; los domingos cierran siempre y no se guardan
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS dias_cerrados (
+            dia TEXT PRIMARY KEY,
+            motivo TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+    for evento in ["INSERT", "UPDATE", "DELETE"]:
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS version_dias_cerrados_{evento.lower()}
+            AFTER {evento} ON dias_cerrados
+            BEGIN
+                INSERT INTO versiones (clave, valor) VALUES ('calendario', 1)
+                ON CONFLICT (clave) DO UPDATE SET valor = valor + 1;
+            END
         """)
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS contadores (
-                tipo TEXT PRIMARY KEY,
-                valor INTEGER NOT NULL
+def _migracion_indices_cliente(cursor: sqlite3.Cursor):
+    # El folio es el rowid, así que va implícito al final de cada índice: el historial
+    # paginado (dia, folio) y los conteos por estado y sala se resuelven solo con el índice.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservaciones_cliente ON reservaciones (id_cliente, dia, estado, id_sala)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_historico_cliente ON reservaciones_historico (id_cliente, dia, estado, id_sala)")
+
+def _migracion_intervalos(cursor: sqlite3.Cursor):
+    # Reservaciones por horario (hora_inicio/hora_fin en minutos desde la medianoche);
+    # las de turno dejan ambas columnas en NULL y ocupan el horario predefinido del turno.
+    for tabla_reservas in ["reservaciones", "reservaciones_historico"]:
+        for columna in ["hora_inicio", "hora_fin"]:
+            if not _existe_columna(cursor, tabla_reservas, columna):
+                cursor.execute(f"ALTER TABLE {tabla_reservas} ADD COLUMN {columna} INTEGER")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS horarios_turno (
+            clave TEXT PRIMARY KEY,
+            inicio INTEGER NOT NULL,
+            fin INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cursor.executemany("""
+        INSERT INTO horarios_turno (clave, inicio, fin) VALUES (?, ?, ?)
+        ON CONFLICT (clave) DO UPDATE SET inicio = excluded.inicio, fin = excluded.fin
+    """, [(turno, inicio, fin) for turno, (inicio, fin) in HORARIOS_TURNO.items()])
+
+    # Índice R*Tree de todo intervalo activo (de turno o por horario): una dimensión es
+    # el tiempo y la otra la sala, así un traslape es una búsqueda logarítmica.
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS intervalos USING rtree_i32(
+            folio, desde, hasta, sala_min, sala_max
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS intervalos_insertar
+        AFTER INSERT ON reservaciones
+        WHEN NEW.estado = 'activa'
+        BEGIN
+            INSERT INTO intervalos (folio, desde, hasta, sala_min, sala_max)
+            SELECT {_columnas_intervalo("NEW")}
+            FROM horarios_turno h WHERE h.clave = NEW.turno;
+        END
+    """)
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS intervalos_actualizar
+        AFTER UPDATE OF estado, fecha, turno, id_sala, hora_inicio, hora_fin ON reservaciones
+        BEGIN
+            DELETE FROM intervalos WHERE folio = OLD.folio;
+            INSERT INTO intervalos (folio, desde, hasta, sala_min, sala_max)
+            SELECT {_columnas_intervalo("NEW")}
+            FROM horarios_turno h WHERE h.clave = NEW.turno AND NEW.estado = 'activa';
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS intervalos_eliminar
+        AFTER DELETE ON reservaciones
+        BEGIN
+            DELETE FROM intervalos WHERE folio = OLD.folio;
+        END
+    """)
+
+    # La ocupación por turno deja fuera las reservaciones por horario: varias pueden
+    # compartir turno y sala sin traslaparse.
+    cursor.execute("DROP TRIGGER IF EXISTS ocupacion_insertar")
+    cursor.execute("""
+        CREATE TRIGGER ocupacion_insertar
+        AFTER INSERT ON reservaciones
+        WHEN NEW.estado = 'activa' AND NEW.hora_inicio IS NULL
+        BEGIN
+            INSERT INTO ocupacion (dia, turno, id_sala, folio)
+            VALUES (DATE(NEW.fecha), NEW.turno, NEW.id_sala, NEW.folio);
+        END
+    """)
+    cursor.execute("DROP TRIGGER IF EXISTS ocupacion_actualizar")
+    cursor.execute("""
+        CREATE TRIGGER ocupacion_actualizar
+        AFTER UPDATE OF estado, fecha, turno, id_sala, hora_inicio ON reservaciones
+        BEGIN
+            DELETE FROM ocupacion
+            WHERE dia = DATE(OLD.fecha) AND turno = OLD.turno
+              AND id_sala = OLD.id_sala AND folio = OLD.folio;
+            INSERT INTO ocupacion (dia, turno, id_sala, folio)
+            SELECT DATE(NEW.fecha), NEW.turno, NEW.id_sala, NEW.folio
+            WHERE NEW.estado = 'activa' AND NEW.hora_inicio IS NULL;
+        END
+    """)
+
+    # La bitácora de cambios incluye el horario
+    for tabla in ["reservaciones", "reservaciones_historico"]:
+        clave, columnas = COLUMNAS_CAMBIOS[tabla]
+        for evento in ["insert", "update", "delete"]:
+            cursor.execute(f"DROP TRIGGER IF EXISTS cambios_{tabla}_{evento}")
+        _triggers_cambios(cursor, tabla, clave, columnas + ["hora_inicio", "hora_fin"])
+
+    _poblar_intervalos(cursor)
+
+def _migracion_identidad(cursor: sqlite3.Cursor):
+    # Identificador aleatorio de la base, fijo desde que se crea
+    cursor.execute("""
+        INSERT OR IGNORE INTO parametros (clave, valor) VALUES ('identidad', LOWER(HEX(RANDOMBLOB(16))))
+    """)
+
+def _migracion_sin_indice_ocupacion(cursor: sqlite3.Cursor):
+    # La búsqueda del primer día libre ya recorre intervalos; ocupacion se conserva por
+    # su llave primaria, que rechaza dos reservaciones activas del mismo turno y sala.
+    cursor.execute("DROP INDEX IF EXISTS idx_ocupacion_sala")
+
+def _migracion_trigramas_por_id(cursor: sqlite3.Cursor):
+    # El rowid de clientes es implícito (la llave es id TEXT) y VACUUM puede renumerarlo;
+    # el índice de trigramas guarda el id del cliente y se une por él.
+    for trigger in ("trigramas_insertar", "trigramas_actualizar", "trigramas_eliminar"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("DROP TABLE IF EXISTS clientes_trigramas")
+    cursor.execute("""
+        CREATE VIRTUAL TABLE clientes_trigramas USING fts5(
+            id_cliente UNINDEXED,
+            nombre_completo,
+            tokenize = 'trigram'
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER trigramas_insertar
+        AFTER INSERT ON clientes
+        BEGIN
+            INSERT INTO clientes_trigramas (id_cliente, nombre_completo)
+            VALUES (NEW.id, NEW.nombres || ' ' || NEW.apellidos);
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER trigramas_actualizar
+        AFTER UPDATE OF id, nombres, apellidos ON clientes
+        BEGIN
+            UPDATE clientes_trigramas SET id_cliente = NEW.id, nombre_completo = NEW.nombres || ' ' || NEW.apellidos
+            WHERE id_cliente = OLD.id;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER trigramas_eliminar
+        AFTER DELETE ON clientes
+        BEGIN
+            DELETE FROM clientes_trigramas WHERE id_cliente = OLD.id;
+        END
+    """)
+
+    cursor.execute("""
+        INSERT INTO clientes_trigramas (id_cliente, nombre_completo)
+        SELECT id, nombres || ' ' || apellidos FROM clientes
+    """)
+
+def _migracion_sin_ocupacion(cursor: sqlite3.Cursor):
+    # Toda la disponibilidad se lee de intervalos; de ocupacion solo quedaba su llave,
+    # que impedía dos reservaciones activas de turno completo en el mismo espacio. Esa
+    # regla pasa a un índice único parcial sobre reservaciones y la tabla se elimina.
+    for trigger in ("ocupacion_insertar", "ocupacion_actualizar", "ocupacion_eliminar"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("DROP TABLE IF EXISTS ocupacion")
+    # Una base muy antigua puede traer espacios repetidos; ocupacion ya consideraba
+    # dueño del espacio al menor folio, así que las demás se cancelan
+    cursor.execute("""
+        UPDATE reservaciones SET estado = 'cancelada'
+        WHERE estado = 'activa' AND hora_inicio IS NULL
+          AND folio NOT IN (
+              SELECT MIN(folio) FROM reservaciones
+              WHERE estado = 'activa' AND hora_inicio IS NULL
+              GROUP BY dia, turno, id_sala
+          )
+    """)
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_reservaciones_turno_activo
+        ON reservaciones (dia, turno, id_sala) WHERE estado = 'activa' AND hora_inicio IS NULL
+    """)
+
+# La posición en la lista es el número de versión (PRAGMA user_version) que deja
+# aplicada cada migración. Solo se agregan al final; nunca se editan las existentes.
+MIGRACIONES = [
+    _migracion_esquema_base,
+    _migracion_ocupacion,
+    _migracion_busqueda,
+    _migracion_busqueda_clientes,
+    _migracion_historico,
+    _migracion_columna_dia,
+    _migracion_versiones,
+    _migracion_indices_busqueda_salas,
+    _migracion_lista_espera,
+    _migracion_cambios,
+    _migracion_calendario,
+    _migracion_indices_cliente,
+    _migracion_intervalos,
+    _migracion_identidad,
+    _migracion_sin_indice_ocupacion,
+    _migracion_trigramas_por_id,
+    _migracion_sin_ocupacion,
+]
+
+class BaseDatos:
+    def __init__(self, db_file: str = DB_FILE, solo_lectura: bool = False, compartida: bool = False):
+        # compartida permite pasar la conexión entre hilos; quien la use debe serializar el acceso
+        self.db_file = db_file
+        self.solo_lectura = solo_lectura
+        self._calendario: Optional[Tuple[int, date, Calendario]] = None
+        self.cache_disponibilidad = CacheDisponibilidad()
+        if solo_lectura:
+            from urllib.parse import quote
+
+            self.conn = sqlite3.connect(
+                f"file:{quote(os.path.abspath(db_file))}?mode=ro",
+                uri=True,
+                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                check_same_thread=not compartida
             )
-        """)
+            # Una conexión de solo lectura no puede migrar; exige el esquema al día
+            if self.version_esquema() < len(MIGRACIONES):
+                self.conn.close()
+                raise sqlite3.OperationalError("El esquema de la base de datos no está actualizado.")
+        else:
+            self.conn = sqlite3.connect(
+                db_file,
+                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                check_same_thread=not compartida
+            )
+            self._inicializar()
+            # Después de migrar: las bases antiguas pueden traer huérfanos (ver auditoria.py)
+            self.conn.execute("PRAGMA foreign_keys = ON")
+        # La identidad distingue esta base de otra recreada con el mismo nombre, cuyas
+        # versiones vuelven a empezar en 0
+        self.cache_reportes = CacheReportes(
+            None if db_file == ":memory:" else
+            os.path.join(os.path.dirname(os.path.abspath(db_file)), ".cache_reportes", os.path.basename(db_file)),
+            identidad=self.identidad(),
+        )
 
-        for tipo in ["C", "S"]:
-            cursor.execute("INSERT OR IGNORE INTO contadores (tipo, valor) VALUES (?, 0)", (tipo,))
+    def _inicializar(self):
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA user_version")
+        version = cursor.fetchone()[0]
+        # Con el esquema al día no se ejecuta ningún DDL ni se abre una transacción
+        for numero in range(version + 1, len(MIGRACIONES) + 1):
+            cursor.execute("BEGIN")
+            try:
+                MIGRACIONES[numero - 1](cursor)
+                cursor.execute(f"PRAGMA user_version = {numero}")
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+
+    def identidad(self) -> str:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT valor FROM parametros WHERE clave = 'identidad'")
+        return cursor.fetchone()[0]
 
-        self.conn.commit()
+    def version_esquema(self) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA user_version")
+        return cursor.fetchone()[0]
+
+    def reconstruir_indice_busqueda(self) -> int:
+        cursor = self.conn.cursor()
+        try:
+            total = _poblar_busqueda(cursor)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return total
+
+    def reconstruir_ocupacion(self) -> int:
+        # La ocupación de las salas vive en el índice de intervalos
+        cursor = self.conn.cursor()
+        try:
+            total = _poblar_intervalos(cursor)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        self.cache_disponibilidad.limpiar()
+        return total
 
     def _nuevo_id(self, prefijo: str) -> str:
         cursor = self.conn.cursor()
@@ -106,7 +871,7 @@ class BaseDatos:
         if not nombres or not apellidos:
             raise ValueError("Nombres y apellidos no pueden estar vacíos.")
         cursor = self.conn.cursor()
-        cursor.execute("SELECT id FROM clientes WHERE LOWER(nombres) = ? AND LOWER(apellidos) = ?", (nombres.lower(), apellidos.lower()))
+        cursor.execute("SELECT id FROM clientes WHERE apellidos = ? COLLATE NOCASE AND nombres = ? COLLATE NOCASE", (apellidos, nombres))
         if cursor.fetchone():
             raise ValueError("El cliente ya existe.")
         cid = self._nuevo_id("C")
@@ -116,9 +881,62 @@ class BaseDatos:
 
     def listar_clientes_ordenados(self) -> List[Cliente]:
         cursor = self.conn.cursor()
-        cursor.execute("SELECT id, nombres, apellidos FROM clientes ORDER BY apellidos, nombres")
+        cursor.execute("SELECT id, nombres, apellidos FROM clientes ORDER BY apellidos COLLATE NOCASE, nombres COLLATE NOCASE")
         return [Cliente(*row) for row in cursor.fetchall()]
 
+    def buscar_clientes(self, texto: str, limite: int = 20, difuso: bool = False) -> List[Cliente]:
+        texto = (texto or "").strip()
+        if not texto:
+            return []
+        if difuso:
+            return self._buscar_clientes_difuso(texto, limite)
+        prefijo = texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        cursor = self.conn.cursor()
+        # Cada rama recorre su índice en orden y se detiene al llegar al límite
+        cursor.execute("""
+            SELECT id, nombres, apellidos FROM (
+                SELECT id, nombres, apellidos FROM clientes
+                WHERE apellidos LIKE :prefijo ESCAPE '\\'
+                ORDER BY apellidos COLLATE NOCASE, nombres COLLATE NOCASE
+                LIMIT :limite
+            )
+            UNION
+            SELECT id, nombres, apellidos FROM (
+                SELECT id, nombres, apellidos FROM clientes
+                WHERE nombres LIKE :prefijo ESCAPE '\\'
+                ORDER BY nombres COLLATE NOCASE, apellidos COLLATE NOCASE
+                LIMIT :limite
+            )
+            ORDER BY apellidos COLLATE NOCASE, nombres COLLATE NOCASE
+            LIMIT :limite
+        """, {"prefijo": prefijo, "limite": limite})
+        return [Cliente(*row) for row in cursor.fetchall()]
+
+    def _buscar_clientes_difuso(self, texto: str, limite: int, similitud_minima: float = 0.4) -> List[Cliente]:
+        buscados = trigramas(texto)
+        if not buscados:
+            return []
+        consulta = " OR ".join('"' + t.replace('"', '""') + '"' for t in sorted(buscados))
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT c.id, c.nombres, c.apellidos
+            FROM clientes_trigramas t
+            JOIN clientes c ON c.id = t.id_cliente
+            WHERE clientes_trigramas MATCH :consulta
+            ORDER BY t.rank
+            LIMIT :candidatos
+        """, {"consulta": consulta, "candidatos": limite * 5})
+        puntuados = []
+        for row in cursor.fetchall():
+            cliente = Cliente(*row)
+            # Proporción de los trigramas buscados presentes en el nombre del cliente
+            comunes = len(buscados & trigramas(f"{cliente.nombres} {cliente.apellidos}"))
+            similitud = comunes / len(buscados)
+            if similitud >= similitud_minima:
+                puntuados.append((similitud, cliente))
+        puntuados.sort(key=lambda p: (-p[0], p[1].apellidos.lower(), p[1].nombres.lower()))
+        return [c for _, c in puntuados[:limite]]
+
     def registrar_sala(self, nombre: str, cupo: int) -> Sala:
         nombre = nombre.strip()
         if not nombre:
@@ -132,6 +950,8 @@ class BaseDatos:
         sid = self._nuevo_id("S")
         cursor.execute("INSERT INTO salas (id, nombre, cupo) VALUES (?, ?, ?)", (sid, nombre, cupo))
         self.conn.commit()
+        # Una sala nueva está libre en todos los espacios
+        self.cache_disponibilidad.limpiar()
         return Sala(id=sid, nombre=nombre, cupo=cupo)
 
     def obtener_sala(self, id_sala: str) -> Optional[Sala]:
@@ -146,56 +966,353 @@ class BaseDatos:
         row = cursor.fetchone()
         return Cliente(*row) if row else None
 
-    def salas_disponibles(self, fecha_dt: datetime, turno: str) -> List[Sala]:
+    def calendario(self) -> Calendario:
+        # Se reconstruye solo si cambiaron los días cerrados (aquí o en otro proceso) o cambió el día
         cursor = self.conn.cursor()
-        fecha_buscar = fecha_dt.date()
+        cursor.execute("SELECT COALESCE((SELECT valor FROM versiones WHERE clave = 'calendario'), 0)")
+        version = cursor.fetchone()[0]
+        hoy = date.today()
+        if self._calendario is None or self._calendario[:2] != (version, hoy):
+            cursor.execute("SELECT dia, motivo FROM dias_cerrados WHERE dia >= ?", (hoy - timedelta(days=ANTICIPACION_DIAS),))
+            cerrados = {date.fromisoformat(dia): motivo for dia, motivo in cursor.fetchall()}
+            self._calendario = (version, hoy, Calendario(cerrados, inicio=hoy))
+        return self._calendario[2]
+
+    def dias_cerrados(self, desde_dt: Optional[datetime] = None) -> List[Tuple[date, str]]:
+        desde = (desde_dt.date() if desde_dt else date.today()).isoformat()
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT dia, motivo FROM dias_cerrados WHERE dia >= ? ORDER BY dia", (desde,))
+        return [(date.fromisoformat(dia), motivo) for dia, motivo in cursor.fetchall()]
+
+    def cerrar_dias(self, desde_dt: datetime, hasta_dt: datetime, motivo: str) -> int:
+        motivo = (motivo or "").strip()
+        if not motivo:
+            raise ValueError("El motivo del cierre no puede estar vacío.")
+        if hasta_dt.date() < desde_dt.date():
+            raise ValueError("La fecha final no puede ser anterior a la inicial.")
+        dias = [
+            ((desde_dt.date() + timedelta(days=i)).isoformat(), motivo)
+            for i in range((hasta_dt.date() - desde_dt.date()).days + 1)
+        ]
+        cursor = self.conn.cursor()
+        cursor.executemany("""
+            INSERT INTO dias_cerrados (dia, motivo) VALUES (?, ?)
+            ON CONFLICT (dia) DO UPDATE SET motivo = excluded.motivo
+        """, dias)
+        self.conn.commit()
+        return len(dias)
+
+    def abrir_dias(self, desde_dt: datetime, hasta_dt: datetime) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM dias_cerrados WHERE dia BETWEEN ? AND ?",
+                       (desde_dt.date().isoformat(), hasta_dt.date().isoformat()))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def _traslape(self, cursor: sqlite3.Cursor, id_sala: str, dia: date, inicio: int, fin: int) -> Optional[int]:
+        # Folio de alguna reservación activa de la sala cuyo intervalo se cruza con [inicio, fin)
         cursor.execute("""
+            SELECT folio FROM intervalos
+            WHERE sala_min <= :sala AND sala_max >= :sala AND desde < :fin AND hasta > :inicio
+            LIMIT 1
+        """, {"sala": _numero_sala(id_sala), "inicio": _minuto_absoluto(dia, inicio), "fin": _minuto_absoluto(dia, fin)})
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def salas_libres_en(self, fecha_dt: datetime, hora_inicio: int, hora_fin: int) -> List[Sala]:
+        base = _minuto_absoluto(fecha_dt.date(), 0)
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
             SELECT s.id, s.nombre, s.cupo FROM salas s
-            WHERE s.id NOT IN (
-                SELECT id_sala FROM reservaciones 
-                WHERE DATE(fecha) = :fecha AND turno = :turno AND estado = 'activa'
+            WHERE NOT EXISTS (
+                SELECT 1 FROM intervalos i
+                WHERE i.sala_min <= {NUMERO_SALA_SQL.format(sala="s.id")}
+                  AND i.sala_max >= {NUMERO_SALA_SQL.format(sala="s.id")}
+                  AND i.desde < :fin AND i.hasta > :inicio
             )
-        """, {"fecha": fecha_buscar, "turno": turno})
+        """, {"inicio": base + hora_inicio, "fin": base + hora_fin})
         return [Sala(*row) for row in cursor.fetchall()]
 
-    def registrar_reserva(self, evento: str, id_cliente: str, id_sala: str, fecha_dt: datetime, turno: str) -> Reservacion:
+    def salas_disponibles(self, fecha_dt: datetime, turno: str) -> List[Sala]:
+        # Un turno es libre si ninguna reservación (de turno o por horario) se cruza con su horario
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA data_version")
+        self.cache_disponibilidad.sincronizar(cursor.fetchone()[0])
+        return self.cache_disponibilidad.obtener(
+            (fecha_dt.date(), turno), lambda: self.salas_libres_en(fecha_dt, *HORARIOS_TURNO[turno])
+        )
+
+    def invalidar_disponibilidad(self, dia: date, hora_inicio: int = APERTURA, hora_fin: int = CIERRE):
+        # Olvida la disponibilidad de cada turno del día que se cruza con [hora_inicio, hora_fin);
+        # quien escriba reservaciones directo en self.conn debe llamarla.
+        for turno, (inicio, fin) in HORARIOS_TURNO.items():
+            if inicio < hora_fin and hora_inicio < fin:
+                self.cache_disponibilidad.invalidar((dia, turno))
+
+    def huecos_libres(self, id_sala: str, fecha_dt: datetime, duracion_minima: int = 1) -> List[Tuple[int, int]]:
+        # Intervalos [inicio, fin) sin reservar entre la apertura y el cierre, en minutos del día
+        dia = fecha_dt.date()
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT desde, hasta FROM intervalos
+            WHERE sala_min <= :sala AND sala_max >= :sala AND desde < :fin AND hasta > :inicio
+            ORDER BY desde
+        """, {"sala": _numero_sala(id_sala), "inicio": _minuto_absoluto(dia, APERTURA),
+              "fin": _minuto_absoluto(dia, CIERRE)})
+        base = _minuto_absoluto(dia, 0)
+        huecos = []
+        libre_desde = APERTURA
+        for desde, hasta in cursor.fetchall():
+            if desde - base - libre_desde >= duracion_minima:
+                huecos.append((libre_desde, desde - base))
+            libre_desde = max(libre_desde, hasta - base)
+        if CIERRE - libre_desde >= duracion_minima:
+            huecos.append((libre_desde, CIERRE))
+        return huecos
+
+    def _primer_dia_libre(self, cursor: sqlite3.Cursor, id_sala: str, turno: str, desde: date,
+                          calendario: Calendario) -> date:
+        # Una sola consulta al índice de intervalos trae, en orden, los días a partir de
+        # "desde" en que alguna reservación de la sala se cruza con el horario del turno;
+        # se recorren solo los ocupados consecutivos y el primer hueco abierto es la respuesta.
+        inicio, fin = HORARIOS_TURNO[turno]
+        candidato = calendario.siguiente_abierto(desde)
+        cursor.execute("""
+            SELECT DISTINCT desde / 1440 AS dia FROM intervalos
+            WHERE sala_min <= :sala AND sala_max >= :sala AND hasta > :desde
+              AND desde % 1440 < :fin AND hasta - desde / 1440 * 1440 > :inicio
+            ORDER BY dia
+        """, {"sala": _numero_sala(id_sala), "desde": _minuto_absoluto(candidato, 0), "inicio": inicio, "fin": fin})
+        for (dia,) in cursor:
+            ocupado = date(1970, 1, 1) + timedelta(days=dia)
+            if ocupado > candidato:
+                break
+            if ocupado == candidato:
+                candidato = calendario.siguiente_abierto(candidato + timedelta(days=1))
+        return candidato
+
+    def buscar_sala_para(self, asistentes: int, desde_dt: datetime, turno: Optional[str] = None,
+                         alternativas: int = 3) -> List[Disponibilidad]:
+        if asistentes <= 0:
+            raise ValueError("El número de asistentes debe ser mayor que 0.")
+        if turno is not None and turno not in TURNOS:
+            raise ValueError("Turno inválido.")
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id, nombre, cupo FROM salas WHERE cupo >= ? ORDER BY cupo, id", (asistentes,))
+        salas = [Sala(*row) for row in cursor.fetchall()]
+        turnos = [turno] if turno else list(TURNOS)
+        orden_turno = {t: i for i, t in enumerate(TURNOS)}
+
+        calendario = self.calendario()
+        opciones = []
+        for sala in salas:
+            for t in turnos:
+                dia = self._primer_dia_libre(cursor, sala.id, t, desde_dt.date(), calendario)
+                opciones.append(Disponibilidad(sala=sala, fecha=datetime.combine(dia, datetime.min.time()), turno=t))
+        # Primero el espacio más próximo; a igual fecha y turno, la sala más chica que alcance
+        opciones.sort(key=lambda o: (o.fecha, orden_turno[o.turno], o.sala.cupo, o.sala.id))
+        return opciones[:alternativas + 1]
+
+    def _validar_reserva(self, cursor: sqlite3.Cursor, evento: str, id_cliente: str, id_sala: str, fecha_dt: datetime) -> str:
         evento = (evento or "").strip()
         if not evento:
             raise ValueError("El nombre del evento no puede estar vacío.")
-        cursor = self.conn.cursor()
         cursor.execute("SELECT id FROM clientes WHERE id = ?", (id_cliente,))
         if not cursor.fetchone():
             raise ValueError("Cliente no encontrado.")
         cursor.execute("SELECT id FROM salas WHERE id = ?", (id_sala,))
         if not cursor.fetchone():
             raise ValueError("Sala no encontrada.")
-        if turno not in TURNOS:
-            raise ValueError("Turno inválido.")
+        motivo = self.calendario().motivo_cierre(fecha_dt)
+        if motivo is not None:
+            raise ValueError(f"El coworking está cerrado ese día ({motivo}).")
+        return evento
+
+    def _insertar_reserva(self, cursor: sqlite3.Cursor, evento: str, id_cliente: str, id_sala: str, fecha_dt: datetime,
+                          turno: str, hora_inicio: Optional[int], hora_fin: Optional[int], mensaje_traslape: str) -> int:
+        # La revisión de traslape y la inserción van en una sola transacción de escritura:
+        # entre ambas nadie puede tomar un intervalo que se cruce.
+        inicio, fin = (hora_inicio, hora_fin) if hora_inicio is not None else HORARIOS_TURNO[turno]
         fecha_buscar = fecha_dt.date()
-        cursor.execute("""
-            SELECT folio FROM reservaciones 
-            WHERE id_sala = :sala AND DATE(fecha) = :fecha AND turno = :turno AND estado = 'activa'
-        """, {"sala": id_sala, "fecha": fecha_buscar, "turno": turno})
-        if cursor.fetchone():
-            raise ValueError("Ya existe una reservación activa en esa sala para esa fecha y turno.")
-        cursor.execute("""
-            INSERT INTO reservaciones (evento, id_cliente, id_sala, fecha, turno, estado)
-            VALUES (?, ?, ?, ?, ?, 'activa')
-        """, (evento, id_cliente, id_sala, fecha_dt, turno))
         self.conn.commit()
-        folio = cursor.lastrowid
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            if self._traslape(cursor, id_sala, fecha_buscar, inicio, fin) is not None:
+                raise ValueError(mensaje_traslape)
+            cursor.execute("""
+                INSERT INTO reservaciones (evento, id_cliente, id_sala, fecha, dia, turno, estado, hora_inicio, hora_fin)
+                VALUES (?, ?, ?, ?, ?, ?, 'activa', ?, ?)
+            """, (evento, id_cliente, id_sala, fecha_dt, fecha_buscar.isoformat(), turno, hora_inicio, hora_fin))
+            folio = cursor.lastrowid
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return folio
+
+    def registrar_reserva(self, evento: str, id_cliente: str, id_sala: str, fecha_dt: datetime, turno: str) -> Reservacion:
+        cursor = self.conn.cursor()
+        evento = self._validar_reserva(cursor, evento, id_cliente, id_sala, fecha_dt)
+        if turno not in TURNOS:
+            raise ValueError("Turno inválido.")
+        folio = self._insertar_reserva(cursor, evento, id_cliente, id_sala, fecha_dt, turno, None, None,
+                                       "Ya existe una reservación activa en esa sala para esa fecha y turno.")
+        self.invalidar_disponibilidad(fecha_dt.date(), *HORARIOS_TURNO[turno])
         return Reservacion(folio=folio, evento=evento, id_cliente=id_cliente, id_sala=id_sala, fecha=fecha_dt, turno=turno, estado='activa')
 
-    def reservas_en_rango(self, desde_dt: datetime, hasta_dt: datetime) -> List[Reservacion]:
+    def registrar_reserva_intervalo(self, evento: str, id_cliente: str, id_sala: str, fecha_dt: datetime,
+                                    hora_inicio: int, hora_fin: int) -> Reservacion:
+        # Reservación por horario libre (minutos desde la medianoche); se archiva bajo el
+        # turno en el que empieza, pero solo ocupa [hora_inicio, hora_fin).
+        cursor = self.conn.cursor()
+        evento = self._validar_reserva(cursor, evento, id_cliente, id_sala, fecha_dt)
+        if not APERTURA <= hora_inicio < hora_fin <= CIERRE:
+            raise ValueError(f"El horario debe estar entre {minutos_a_hora(APERTURA)} y {minutos_a_hora(CIERRE)} "
+                             "y la hora de inicio debe ser anterior a la de fin.")
+        turno = turno_de_minuto(hora_inicio)
+        folio = self._insertar_reserva(cursor, evento, id_cliente, id_sala, fecha_dt, turno, hora_inicio, hora_fin,
+                                       "La sala ya tiene una reservación que se traslapa con ese horario.")
+        self.invalidar_disponibilidad(fecha_dt.date(), hora_inicio, hora_fin)
+        return Reservacion(folio=folio, evento=evento, id_cliente=id_cliente, id_sala=id_sala, fecha=fecha_dt, turno=turno,
+                           estado='activa', hora_inicio=hora_inicio, hora_fin=hora_fin)
+
+    def corte_historico(self) -> Optional[date]:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT valor FROM parametros WHERE clave = 'corte_historico'")
+        row = cursor.fetchone()
+        return date.fromisoformat(row[0]) if row else None
+
+    def _tablas_reservaciones(self, desde: date, incluir_historico: bool, solo_activas: bool = True) -> List[str]:
+        # Las activas del histórico son todas anteriores al corte, así que para ellas solo
+        # se consulta cuando el rango llega a fechas ya archivadas; las canceladas se
+        # archivan sin importar su fecha y obligan a consultarlo siempre.
+        if incluir_historico and not solo_activas:
+            return ["reservaciones", "reservaciones_historico"]
+        corte = self.corte_historico() if incluir_historico else None
+        if corte is not None and desde < corte:
+            return ["reservaciones", "reservaciones_historico"]
+        return ["reservaciones"]
+
+    def _consultar_reservas(self, condicion: str, orden: str, params: dict, desde: date, incluir_historico: bool) -> List[Reservacion]:
+        consultas = [
+            f"SELECT folio, evento, id_cliente, id_sala, fecha, turno, estado, hora_inicio, hora_fin FROM {t} WHERE {condicion}"
+            for t in self._tablas_reservaciones(desde, incluir_historico)
+        ]
+        cursor = self.conn.cursor()
+        cursor.execute(" UNION ALL ".join(consultas) + f" ORDER BY {orden}", params)
+        return [Reservacion(*row) for row in cursor.fetchall()]
+
+    def archivar(self, corte_dt: Optional[datetime] = None) -> int:
+        corte = corte_dt.date() if corte_dt else date.today()
+        if corte > date.today():
+            raise ValueError("Solo se pueden archivar reservaciones de fechas pasadas.")
+        condicion = "dia < :corte OR estado = 'cancelada'"
         cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                INSERT INTO reservaciones_historico (folio, evento, id_cliente, id_sala, fecha, dia, turno, estado,
+                                                     hora_inicio, hora_fin)
+                SELECT folio, evento, id_cliente, id_sala, fecha, dia, turno, estado, hora_inicio, hora_fin
+                FROM reservaciones WHERE {condicion}
+            """, {"corte": corte})
+            cursor.execute(f"DELETE FROM reservaciones WHERE {condicion}", {"corte": corte})
+            movidas = cursor.rowcount
+            cursor.execute("""
+                INSERT INTO parametros (clave, valor) VALUES ('corte_historico', :corte)
+                ON CONFLICT (clave) DO UPDATE SET valor = MAX(valor, excluded.valor)
+            """, {"corte": corte.isoformat()})
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        self.cache_disponibilidad.limpiar()
+        return movidas
+
+    def reservas_en_rango(self, desde_dt: datetime, hasta_dt: datetime, incluir_historico: bool = True) -> List[Reservacion]:
         desde_buscar = desde_dt.date()
         hasta_buscar = hasta_dt.date()
+        return self._consultar_reservas(
+            "dia BETWEEN :desde AND :hasta AND estado = 'activa'",
+            "fecha, folio",
+            {"desde": desde_buscar, "hasta": hasta_buscar},
+            desde_buscar,
+            incluir_historico,
+        )
+
+    def historial_cliente(self, id_cliente: str, limite: int = 20,
+                          despues_de: Optional[Tuple[str, int]] = None) -> List[Reservacion]:
+        # Paginación por llave (dia, folio), de la más reciente a la más antigua: cada
+        # página es un recorrido acotado del índice, sin importar cuántas haya antes.
+        if limite <= 0:
+            raise ValueError("El tamaño de página debe ser mayor que 0.")
+        condicion = "id_cliente = :cliente"
+        params = {"cliente": id_cliente, "limite": limite, "dia": None, "folio": None}
+        if despues_de is not None:
+            condicion += " AND (dia < :dia OR (dia = :dia AND folio < :folio))"
+            params["dia"], params["folio"] = despues_de
+        consultas = [
+            f"""SELECT * FROM (
+                SELECT folio, evento, id_cliente, id_sala, fecha, turno, estado, hora_inicio, hora_fin, dia FROM {t}
+                WHERE {condicion} ORDER BY dia DESC, folio DESC LIMIT :limite
+            )"""
+            for t in ["reservaciones", "reservaciones_historico"]
+        ]
+        cursor = self.conn.cursor()
+        cursor.execute(" UNION ALL ".join(consultas) + " ORDER BY dia DESC, folio DESC LIMIT :limite", params)
+        return [Reservacion(*row[:9]) for row in cursor.fetchall()]
+
+    def estadisticas_cliente(self, id_cliente: str, salas_favoritas: int = 3) -> dict:
+        cursor = self.conn.cursor()
         cursor.execute("""
-            SELECT folio, evento, id_cliente, id_sala, fecha, turno, estado
-            FROM reservaciones
-            WHERE DATE(fecha) BETWEEN :desde AND :hasta AND estado = 'activa'
-            ORDER BY fecha, folio
-        """, {"desde": desde_buscar, "hasta": hasta_buscar})
+            SELECT estado, id_sala, COUNT(*), MIN(dia), MAX(dia),
+                   SUM(estado = 'activa' AND dia >= :hoy)
+            FROM (
+                SELECT estado, id_sala, dia FROM reservaciones WHERE id_cliente = :cliente
+                UNION ALL
+                SELECT estado, id_sala, dia FROM reservaciones_historico WHERE id_cliente = :cliente
+            )
+            GROUP BY estado, id_sala
+        """, {"cliente": id_cliente, "hoy": date.today().isoformat()})
+        por_estado: dict = {}
+        por_sala: dict = {}
+        primera = ultima = None
+        proximas = 0
+        for estado, id_sala, total, minimo, maximo, futuras in cursor.fetchall():
+            por_estado[estado] = por_estado.get(estado, 0) + total
+            if estado != 'cancelada':
+                por_sala[id_sala] = por_sala.get(id_sala, 0) + total
+            primera = minimo if primera is None else min(primera, minimo)
+            ultima = maximo if ultima is None else max(ultima, maximo)
+            proximas += futuras
+        total = sum(por_estado.values())
+        favoritas = sorted(por_sala.items(), key=lambda s: (-s[1], s[0]))[:salas_favoritas]
+        return {
+            "total": total,
+            "por_estado": por_estado,
+            "canceladas": por_estado.get('cancelada', 0),
+            "tasa_cancelacion": por_estado.get('cancelada', 0) / total if total else 0.0,
+            "proximas": proximas,
+            "primera": date.fromisoformat(primera) if primera else None,
+            "ultima": date.fromisoformat(ultima) if ultima else None,
+            "salas_favoritas": favoritas,
+        }
+
+    def buscar_reservas(self, texto: str, limite: int = 20, solo_activas: bool = True) -> List[Reservacion]:
+        # Cada palabra se busca como prefijo: "junta vent" encuentra "Junta de ventas"
+        palabras = re.findall(r"\w+", texto or "")
+        if not palabras:
+            return []
+        consulta = " ".join(f'"{p}"*' for p in palabras)
+        filtro_estado = "AND r.estado = 'activa'" if solo_activas else ""
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT r.folio, r.evento, r.id_cliente, r.id_sala, r.fecha, r.turno, r.estado
+            FROM reservaciones_fts f
+            JOIN reservaciones r ON r.folio = f.rowid
+            WHERE reservaciones_fts MATCH :consulta {filtro_estado}
+            ORDER BY f.rank
+            LIMIT :limite
+        """, {"consulta": consulta, "limite": limite})
         return [Reservacion(*row) for row in cursor.fetchall()]
 
     def editar_nombre_evento(self, folio: int, nuevo_nombre: str) -> Reservacion:
@@ -214,20 +1331,114 @@ class BaseDatos:
         cursor.execute("SELECT folio, evento, id_cliente, id_sala, fecha, turno, estado FROM reservaciones WHERE folio = ?", (folio,))
         return Reservacion(*cursor.fetchone())
 
-    def reservas_por_fecha(self, fecha_dt: datetime) -> List[Reservacion]:
+    def filas_en_rango(self, desde_dt: datetime, hasta_dt: datetime, columnas: Tuple[str, ...] = ("folio", "dia"),
+                       nombradas: bool = False, incluir_historico: bool = True) -> list:
+        # Lectura rápida para listados y reportes: sin dataclasses ni conversión de
+        # timestamp; "dia" llega como texto ISO (date.fromisoformat lo decodifica).
+        invalidas = set(columnas) - set(COLUMNAS_RESERVACION)
+        if not columnas or invalidas:
+            raise ValueError(f"Columnas inválidas: {', '.join(sorted(invalidas)) or '(ninguna)'}")
+        desde_buscar = desde_dt.date()
+        lista = ", ".join(columnas)
+        consultas = [
+            f"SELECT {lista}, dia AS orden_dia, folio AS orden_folio FROM {t} "
+            "WHERE dia BETWEEN :desde AND :hasta AND estado = 'activa'"
+            for t in self._tablas_reservaciones(desde_buscar, incluir_historico)
+        ]
+        cursor = self.conn.cursor()
+        if nombradas:
+            cursor.row_factory = sqlite3.Row
+        cursor.execute(f"SELECT {lista} FROM ({' UNION ALL '.join(consultas)}) ORDER BY orden_dia, orden_folio",
+                       {"desde": desde_buscar, "hasta": hasta_dt.date()})
+        return cursor.fetchall()
+
+    def filas_reporte(self, desde_dt: datetime, hasta_dt: datetime, id_sala: Optional[str] = None,
+                      incluir_historico: bool = True) -> List[tuple]:
+        # (dia, id_sala, folio, evento, cliente, sala, turno, cupo) con los nombres ya resueltos;
+        # en las reservaciones por horario la columna turno trae el horario (09:00-11:00)
+        desde_buscar = desde_dt.date()
+        filtro_sala = "AND r.id_sala = :sala" if id_sala is not None else ""
+        consultas = [
+            f"""
+            SELECT r.dia, r.id_sala, r.folio, r.evento,
+                   COALESCE(c.apellidos || ', ' || c.nombres, r.id_cliente),
+                   COALESCE(s.nombre, r.id_sala),
+                   CASE WHEN r.hora_inicio IS NULL THEN r.turno
+                        ELSE printf('%02d:%02d-%02d:%02d', r.hora_inicio / 60, r.hora_inicio % 60,
+                                    r.hora_fin / 60, r.hora_fin % 60) END,
+                   COALESCE(s.cupo, '')
+            FROM {t} r
+            LEFT JOIN clientes c ON c.id = r.id_cliente
+            LEFT JOIN salas s ON s.id = r.id_sala
+            WHERE r.dia BETWEEN :desde AND :hasta AND r.estado = 'activa' {filtro_sala}
+            """
+            for t in self._tablas_reservaciones(desde_buscar, incluir_historico)
+        ]
+        cursor = self.conn.cursor()
+        cursor.execute(" UNION ALL ".join(consultas) + " ORDER BY 1, 7, 3",
+                       {"desde": desde_buscar, "hasta": hasta_dt.date(), "sala": id_sala})
+        return cursor.fetchall()
+
+    def version_datos(self, desde_dt: datetime, hasta_dt: datetime) -> int:
+        # Crece con cada escritura que afecta al rango; sirve como llave de caché
         cursor = self.conn.cursor()
-        fecha_buscar = fecha_dt.date()
         cursor.execute("""
-            SELECT folio, evento, id_cliente, id_sala, fecha, turno, estado
-            FROM reservaciones
-            WHERE DATE(fecha) = :fecha AND estado = 'activa'
-            ORDER BY turno, folio
-        """, {"fecha": fecha_buscar})
-        return [Reservacion(*row) for row in cursor.fetchall()]
+            SELECT COALESCE(SUM(valor), 0) FROM versiones
+            WHERE clave BETWEEN :desde AND :hasta OR clave = '*'
+        """, {"desde": desde_dt.date(), "hasta": hasta_dt.date()})
+        return cursor.fetchone()[0]
+
+    def ultima_secuencia(self) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM cambios")
+        return cursor.fetchone()[0]
+
+    def cambios_desde(self, seq: int = 0, limite: Optional[int] = None, tamano_lote: int = 1000):
+        # Generador por lotes: no retiene la lectura abierta entre lotes ni carga todo en memoria
+        import json
+
+        pendientes = limite
+        while pendientes is None or pendientes > 0:
+            lote = tamano_lote if pendientes is None else min(tamano_lote, pendientes)
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT seq, tabla, operacion, clave, datos, momento FROM cambios
+                WHERE seq > ? ORDER BY seq LIMIT ?
+            """, (seq, lote))
+            filas = cursor.fetchall()
+            for seq, tabla, operacion, clave, datos, momento in filas:
+                yield {"seq": seq, "tabla": tabla, "operacion": operacion, "clave": clave,
+                       "momento": momento, "datos": json.loads(datos)}
+            if pendientes is not None:
+                pendientes -= len(filas)
+            if len(filas) < lote:
+                break
+
+    def exportar_cambios(self, salida, seq: int = 0, limite: Optional[int] = None) -> int:
+        # Escribe NDJSON (un cambio por línea) y devuelve la última secuencia enviada
+        import json
+
+        for cambio in self.cambios_desde(seq, limite):
+            salida.write(json.dumps(cambio, ensure_ascii=False) + "\n")
+            seq = cambio["seq"]
+        return seq
+
+    def reservas_por_fecha(self, fecha_dt: datetime, incluir_historico: bool = True) -> List[Reservacion]:
+        fecha_buscar = fecha_dt.date()
+        return self._consultar_reservas(
+            "dia = :fecha AND estado = 'activa'",
+            "turno, folio",
+            {"fecha": fecha_buscar},
+            fecha_buscar,
+            incluir_historico,
+        )
 
     def cancelar_reservacion(self, folio: int) -> Reservacion:
         cursor = self.conn.cursor()
-        cursor.execute("SELECT folio, evento, id_cliente, id_sala, fecha, turno, estado FROM reservaciones WHERE folio = ?", (folio,))
+        cursor.execute("""
+            SELECT folio, evento, id_cliente, id_sala, fecha, turno, estado, hora_inicio, hora_fin
+            FROM reservaciones WHERE folio = ?
+        """, (folio,))
         row = cursor.fetchone()
         if not row:
             raise ValueError("Folio no encontrado.")
@@ -235,14 +1446,158 @@ class BaseDatos:
         if reserva.estado == 'cancelada':
             raise ValueError("Esta reservación ya está cancelada.")
         fecha_reserva = reserva.fecha.date()
-        dias_anticipacion = (fecha_reserva - date.today()).days
-        if dias_anticipacion < 2:
-            raise ValueError(f"Solo puede cancelar con al menos 2 días de anticipación. Días restantes: {dias_anticipacion}")
-        cursor.execute("UPDATE reservaciones SET estado = 'cancelada' WHERE folio = ?", (folio,))
-        self.conn.commit()
+        if not self.calendario().puede_cancelar(fecha_reserva):
+            dias_anticipacion = (fecha_reserva - date.today()).days
+            raise ValueError(f"Solo puede cancelar con al menos {ANTICIPACION_DIAS} días de anticipación. "
+                             f"Días restantes: {dias_anticipacion}")
+        try:
+            cursor.execute("UPDATE reservaciones SET estado = 'cancelada' WHERE folio = ?", (folio,))
+            self._promover_lista_espera(cursor, folio, fecha_reserva.isoformat(), reserva.turno, reserva.id_sala)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        # La promoción, si la hubo, ocupa el turno de la reservación, que ya está entre estos
+        if reserva.hora_inicio is None:
+            self.invalidar_disponibilidad(fecha_reserva, *HORARIOS_TURNO[reserva.turno])
+        else:
+            self.invalidar_disponibilidad(fecha_reserva, reserva.hora_inicio, reserva.hora_fin)
         reserva.estado = 'cancelada'
         return reserva
 
+    def _promover_lista_espera(self, cursor: sqlite3.Cursor, folio_liberado: int, dia: str, turno: str,
+                               id_sala: str) -> Optional[int]:
+        # Se ejecuta dentro de la transacción de la cancelación: el espacio liberado
+        # pasa a la primera solicitud pendiente que lo acepte, o a nadie. Si lo liberado
+        # era un horario parcial, el turno solo se entrega cuando queda libre completo.
+        if self._traslape(cursor, id_sala, date.fromisoformat(dia), *HORARIOS_TURNO[turno]) is not None:
+            return None
+        cursor.execute("""
+            SELECT e.id, e.evento, e.id_cliente
+            FROM lista_espera e
+            WHERE e.estado = 'pendiente' AND e.dia = :dia AND e.turno = :turno
+              AND (e.id_sala = :sala
+                   OR (e.id_sala IS NULL
+                       AND COALESCE(e.cupo_minimo, 0) <= (SELECT cupo FROM salas WHERE id = :sala)))
+            ORDER BY e.id
+            LIMIT 1
+        """, {"dia": dia, "turno": turno, "sala": id_sala})
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        id_espera, evento, id_cliente = row
+        fecha_dt = datetime.combine(date.fromisoformat(dia), datetime.min.time())
+        cursor.execute("""
+            INSERT INTO reservaciones (evento, id_cliente, id_sala, fecha, dia, turno, estado)
+            VALUES (?, ?, ?, ?, ?, ?, 'activa')
+        """, (evento, id_cliente, id_sala, fecha_dt, dia, turno))
+        folio = cursor.lastrowid
+        cursor.execute("""
+            UPDATE lista_espera SET estado = 'promovida', folio = ?, folio_liberado = ?
+            WHERE id = ?
+        """, (folio, folio_liberado, id_espera))
+        return folio
+
+    def agregar_lista_espera(self, evento: str, id_cliente: str, fecha_dt: datetime, turno: str,
+                             id_sala: Optional[str] = None, cupo_minimo: Optional[int] = None) -> EntradaEspera:
+        evento = (evento or "").strip()
+        if not evento:
+            raise ValueError("El nombre del evento no puede estar vacío.")
+        if self.obtener_cliente(id_cliente) is None:
+            raise ValueError("Cliente no encontrado.")
+        if id_sala is not None and self.obtener_sala(id_sala) is None:
+            raise ValueError("Sala no encontrada.")
+        if turno not in TURNOS:
+            raise ValueError("Turno inválido.")
+        if cupo_minimo is not None and cupo_minimo <= 0:
+            raise ValueError("El cupo mínimo debe ser mayor que 0.")
+        # Mismas reglas de fecha que una reservación, y solo para espacios ya ocupados
+        self.calendario().validar(fecha_dt)
+        cursor = self.conn.cursor()
+        if id_sala is not None:
+            if self._traslape(cursor, id_sala, fecha_dt.date(), *HORARIOS_TURNO[turno]) is None:
+                raise ValueError("La sala está libre en ese turno; puede reservarla directamente.")
+        elif any(s.cupo >= (cupo_minimo or 0) for s in self.salas_disponibles(fecha_dt, turno)):
+            raise ValueError("Hay salas con cupo suficiente libres en ese turno; puede reservar directamente.")
+        cursor.execute("""
+            INSERT INTO lista_espera (evento, id_cliente, dia, turno, id_sala, cupo_minimo)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (evento, id_cliente, fecha_dt.date().isoformat(), turno, id_sala, cupo_minimo))
+        self.conn.commit()
+        return EntradaEspera(id=cursor.lastrowid, evento=evento, id_cliente=id_cliente, fecha=fecha_dt, turno=turno,
+                             id_sala=id_sala, cupo_minimo=cupo_minimo, estado='pendiente', folio=None, folio_liberado=None)
+
+    def _entradas_espera(self, condicion: str, params: tuple) -> List[EntradaEspera]:
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT id, evento, id_cliente, dia, turno, id_sala, cupo_minimo, estado, folio, folio_liberado
+            FROM lista_espera WHERE {condicion}
+            ORDER BY dia, turno, id
+        """, params)
+        return [
+            EntradaEspera(row[0], row[1], row[2], datetime.combine(date.fromisoformat(row[3]), datetime.min.time()), *row[4:])
+            for row in cursor.fetchall()
+        ]
+
+    def lista_espera_pendiente(self, desde_dt: Optional[datetime] = None) -> List[EntradaEspera]:
+        desde = (desde_dt.date() if desde_dt else date.today()).isoformat()
+        return self._entradas_espera("estado = 'pendiente' AND dia >= ?", (desde,))
+
+    def promocion_por_cancelacion(self, folio: int) -> Optional[EntradaEspera]:
+        entradas = self._entradas_espera("folio_liberado = ?", (folio,))
+        return entradas[0] if entradas else None
+
+    def retirar_lista_espera(self, id_espera: int):
+        cursor = self.conn.cursor()
+        cursor.execute("UPDATE lista_espera SET estado = 'cancelada' WHERE id = ? AND estado = 'pendiente'", (id_espera,))
+        if cursor.rowcount == 0:
+            raise ValueError("La solicitud no existe o ya no está pendiente.")
+        self.conn.commit()
+
+    def cancelar_lote(self, desde_dt: datetime, hasta_dt: datetime, id_sala: Optional[str] = None, turno: Optional[str] = None) -> Tuple[List[int], List[int]]:
+        if hasta_dt.date() < desde_dt.date():
+            raise ValueError("La fecha final no puede ser anterior a la inicial.")
+        if turno is not None and turno not in TURNOS:
+            raise ValueError("Turno inválido.")
+        if id_sala is not None and self.obtener_sala(id_sala) is None:
+            raise ValueError("Sala no encontrada.")
+        params = {
+            "desde": desde_dt.date(),
+            "hasta": hasta_dt.date(),
+            "limite": self.calendario().fecha_minima(),
+            "sala": id_sala,
+            "turno": turno,
+        }
+        filtro = """
+            dia BETWEEN :desde AND :hasta
+            AND (:sala IS NULL OR id_sala = :sala)
+            AND (:turno IS NULL OR turno = :turno)
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                UPDATE reservaciones SET estado = 'cancelada'
+                WHERE estado = 'activa' AND {filtro} AND dia >= :limite
+                RETURNING folio, dia, turno, id_sala
+            """, params)
+            liberados = sorted(cursor.fetchall())
+            cancelados = [row[0] for row in liberados]
+            for folio, dia, turno_liberado, sala_liberada in liberados:
+                self._promover_lista_espera(cursor, folio, dia, turno_liberado, sala_liberada)
+            # Las que no cumplen la anticipación mínima siguen activas
+            cursor.execute(f"""
+                SELECT folio FROM reservaciones
+                WHERE estado = 'activa' AND {filtro} AND dia < :limite ORDER BY folio
+            """, params)
+            rechazados = [row[0] for row in cursor.fetchall()]
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        for dia in {row[1] for row in liberados}:
+            self.invalidar_disponibilidad(date.fromisoformat(dia))
+        return cancelados, rechazados
+
     def cerrar(self):
         self.conn.close()
 
@@ -263,7 +1618,8 @@ def tabla(headers: List[str], filas: List[List[str]]) -> str:
 
 def input_no_vacio(prompt: str) -> str:
     while True:
-        val = input(prompt).strip()
+        with metricas.tramo("entrada"):
+            val = input(prompt).strip()
         if val and not val.isspace():
             return val
         print("⚠ No puede estar vacío ni contener solo espacios.")
@@ -271,7 +1627,8 @@ def input_no_vacio(prompt: str) -> str:
 def input_entero(prompt: str, minimo: Optional[int] = None) -> int:
     while True:
         try:
-            v = int(input(prompt).strip())
+            with metricas.tramo("entrada"):
+                v = int(input(prompt).strip())
             if minimo is not None and v < minimo:
                 print(f"⚠ Debe ser ≥ {minimo}.")
                 continue
@@ -281,7 +1638,8 @@ def input_entero(prompt: str, minimo: Optional[int] = None) -> int:
 
 def input_fecha(prompt: str, permitir_vacio: bool = False) -> datetime:
     while True:
-        s = input(prompt).strip()
+        with metricas.tramo("entrada"):
+            s = input(prompt).strip()
         if permitir_vacio and not s:
             return datetime.combine(date.today(), datetime.min.time())
         try:
@@ -291,8 +1649,8 @@ def input_fecha(prompt: str, permitir_vacio: bool = False) -> datetime:
             print("⚠ Formato inválido. Use mm-dd-aaaa (ejemplo: 12-25-2025).")
 
 def validar_fecha_reservacion(fecha_dt: datetime) -> bool:
-    if fecha_dt.date() < (date.today() + timedelta(days=2)):
-        raise ValueError("La reservación debe ser al menos 2 días después de hoy.")
+    if fecha_dt.date() < (date.today() + timedelta(days=ANTICIPACION_DIAS)):
+        raise ValueError(f"La reservación debe ser al menos {ANTICIPACION_DIAS} días después de hoy.")
     return True
 
 def es_domingo(fecha_dt: datetime) -> bool:
@@ -309,7 +1667,137 @@ def fecha_a_str(fecha_dt: datetime) -> str:
     return fecha_dt.strftime("%m-%d-%Y")
 
 def pausar():
-    input("\n[Presione ENTER para continuar...]")
+    with metricas.tramo("entrada"):
+        input("\n[Presione ENTER para continuar...]")
+
+ENCABEZADOS_REPORTE = ["Folio", "Evento", "Cliente", "Sala", "Turno", "Cupo"]
+FORMATOS_EXPORTACION = {"csv": ".csv", "json": ".json", "xlsx": ".xlsx"}
+
+def fila_reporte(row: tuple) -> List[str]:
+    _, _, folio, evento, cliente, sala, turno, cupo = row
+    return [str(folio), evento, cliente, sala, TURNOS.get(turno, turno), str(cupo)]
+
+def escribir_hoja_xlsx(ws, titulo: str, filas: List[List[str]]):
+    from openpyxl.styles import Font, Alignment, Border, Side
+
+    ws.merge_cells('A1:F1')
+    titulo_cell = ws['A1']
+    titulo_cell.value = titulo
+    titulo_cell.font = Font(bold=True, size=14)
+    titulo_cell.alignment = Alignment(horizontal="center")
+
+    ws.append(ENCABEZADOS_REPORTE)
+
+    bold = Font(bold=True)
+    border_grueso = Border(bottom=Side(border_style="thick"))
+    for col in range(1, len(ENCABEZADOS_REPORTE) + 1):
+        cell = ws.cell(row=2, column=col)
+        cell.font = bold
+        cell.border = border_grueso
+        cell.alignment = Alignment(horizontal="center")
+
+    for fila in filas:
+        ws.append(fila)
+
+    for row in ws.iter_rows(min_row=3, max_row=ws.max_row):
+        for cell in row:
+            cell.alignment = Alignment(horizontal="center")
+
+    # La fila 1 es una celda combinada; la letra de la columna se toma del encabezado
+    for col in ws.iter_cols(min_row=2):
+        max_len = max(len(str(c.value)) for c in col if c.value)
+        ws.column_dimensions[col[0].column_letter].width = max_len + 2
+
+def serializar_reporte(filas: List[List[str]], formato: str, titulo: str) -> bytes:
+    import io
+
+    if formato == "csv":
+        import csv
+
+        buffer = io.StringIO(newline="")
+        writer = csv.writer(buffer)
+        writer.writerow(ENCABEZADOS_REPORTE)
+        writer.writerows(filas)
+        return buffer.getvalue().encode("utf-8")
+
+    if formato == "json":
+        import json
+
+        data = [dict(zip(ENCABEZADOS_REPORTE, f)) for f in filas]
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Reservaciones"
+    escribir_hoja_xlsx(ws, titulo, filas)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+def guardar_reporte(contenido: bytes, nombre_base: str, formato: str) -> str:
+    ruta = nombre_base + FORMATOS_EXPORTACION[formato]
+    with open(ruta, "wb") as f:
+        f.write(contenido)
+    return ruta
+
+def exportar_reporte(filas: List[List[str]], nombre_base: str, formato: str, titulo: str) -> str:
+    return guardar_reporte(serializar_reporte(filas, formato, titulo), nombre_base, formato)
+
+def seleccionar_cliente(db: BaseDatos) -> Optional[Cliente]:
+    while True:
+        texto = input("\nApellido, nombre o clave del cliente (o 'CANCELAR' para salir): ").strip()
+        if not texto:
+            print("⚠ No puede estar vacío ni contener solo espacios.")
+            continue
+        if texto.upper() == 'CANCELAR':
+            return None
+        cliente = db.obtener_cliente(texto.upper())
+        if cliente:
+            return cliente
+
+        candidatos = db.buscar_clientes(texto)
+        if not candidatos:
+            candidatos = db.buscar_clientes(texto, difuso=True)
+            if candidatos:
+                print("\nNo hay coincidencias exactas. Clientes con nombre parecido:")
+        if not candidatos:
+            print("\n⚠ No se encontraron clientes con ese nombre.")
+            continue
+
+        print(linea())
+        print(tabla(["Clave Cliente", "Apellidos, Nombres"], [[c.id, f"{c.apellidos}, {c.nombres}"] for c in candidatos]))
+        print(linea())
+        if len(candidatos) == 1:
+            acepta = input(f"¿Seleccionar a {candidatos[0].apellidos}, {candidatos[0].nombres}? (S/N): ").strip().upper()
+            if acepta == 'S':
+                return candidatos[0]
+            continue
+        clave = input("Clave del cliente (ENTER para buscar de nuevo): ").strip().upper()
+        for c in candidatos:
+            if c.id == clave:
+                return c
+        if clave:
+            print("\n⚠ La clave seleccionada no está en la lista.")
+
+def buscar_reservas_interactivo(db: BaseDatos) -> Tuple[List[Reservacion], str]:
+    print("Buscar reservaciones por:")
+    print("  1) Nombre del evento o del cliente")
+    print("  2) Rango de fechas")
+    while True:
+        criterio = input("Seleccione una opción: ").strip()
+        if criterio in {"1", "2"}:
+            break
+        print("⚠ Opción inválida. Use 1 o 2.")
+
+    if criterio == "1":
+        texto = input_no_vacio("Texto a buscar: ")
+        return db.buscar_reservas(texto), f"que coinciden con '{texto}'"
+
+    fecha_desde = input_fecha("Fecha inicial del rango (mm-dd-aaaa): ")
+    fecha_hasta = input_fecha("Fecha final del rango (mm-dd-aaaa): ")
+    return db.reservas_en_rango(fecha_desde, fecha_hasta, incluir_historico=False), f"del {fecha_a_str(fecha_desde)} al {fecha_a_str(fecha_hasta)}"
 
 # ---------------------------
 # Opciones del menú
@@ -319,53 +1807,42 @@ def opcion_registrar_reserva(db: BaseDatos):
     print("REGISTRAR RESERVACIÓN DE SALA")
     print(linea())
 
-    clientes = db.listar_clientes_ordenados()
-    if not clientes:
+    cursor = db.conn.cursor()
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM clientes)")
+    if not cursor.fetchone()[0]:
         print("⚠ No hay clientes registrados. Registre un cliente primero.")
         pausar()
         return
 
-    cursor = db.conn.cursor()
     cursor.execute("SELECT COUNT(*) FROM salas")
     if cursor.fetchone()[0] == 0:
         print("⚠ No hay salas registradas. Registre una sala primero.")
         pausar()
         return
 
-    print("\nClientes registrados (ordenados alfabéticamente):")
-    print(linea())
-    filas = [[c.id, f"{c.apellidos}, {c.nombres}"] for c in clientes]
-    print(tabla(["Clave Cliente", "Apellidos, Nombres"], filas))
-    print(linea())
-
-    while True:
-        id_cliente = input("\nClave del cliente (o 'CANCELAR' para salir): ").strip()
-        if id_cliente.upper() == 'CANCELAR':
-            print("Operación cancelada.")
-            pausar()
-            return
-        if db.obtener_cliente(id_cliente):
-            break
-        print("\n⚠ La clave seleccionada no existe.")
-        print("\nClientes registrados:")
-        print(linea())
-        print(tabla(["Clave Cliente", "Apellidos, Nombres"], filas))
-        print(linea())
+    cliente = seleccionar_cliente(db)
+    if cliente is None:
+        print("Operación cancelada.")
+        pausar()
+        return
+    id_cliente = cliente.id
 
+    calendario = db.calendario()
     print(f"\nFecha actual del sistema: {date.today().strftime('%m-%d-%Y')}")
-    print(f"La fecha debe ser al menos: {(date.today() + timedelta(days=2)).strftime('%m-%d-%Y')}")
+    print(f"La fecha debe ser al menos: {fecha_a_str(calendario.primer_dia_reservable())}")
 
     while True:
         fecha_dt = input_fecha("\nFecha de reservación (mm-dd-aaaa): ")
         try:
-            validar_fecha_reservacion(fecha_dt)
-            if es_domingo(fecha_dt):
-                lunes = obtener_lunes_siguiente(fecha_dt)
-                print(f"\n⚠ No se pueden hacer reservaciones para domingos.")
-                print(f"   Se propone el lunes siguiente: {fecha_a_str(lunes)}")
+            calendario.validar_anticipacion(fecha_dt)
+            motivo = calendario.motivo_cierre(fecha_dt)
+            if motivo is not None:
+                siguiente = datetime.combine(calendario.siguiente_abierto(fecha_dt), datetime.min.time())
+                print(f"\n⚠ No se pueden hacer reservaciones ese día ({motivo}).")
+                print(f"   Se propone el siguiente día hábil: {fecha_a_str(siguiente)}")
                 acepta = input("¿Acepta esta fecha? (S/N): ").strip().upper()
                 if acepta == 'S':
-                    fecha_dt = lunes
+                    fecha_dt = siguiente
                     break
                 else:
                     print("Por favor, especifique otra fecha.")
@@ -386,10 +1863,22 @@ def opcion_registrar_reserva(db: BaseDatos):
         print("⚠ Turno inválido. Use M, V o N.")
 
     try:
-        salas_disp = db.salas_disponibles(fecha_dt, turno)
+        with metricas.tramo("sql"):
+            salas_disp = db.salas_disponibles(fecha_dt, turno)
 
         if not salas_disp:
             print(f"\n⚠ No hay salas disponibles para el turno {TURNOS[turno]} el {fecha_a_str(fecha_dt)}")
+            espera = input("¿Desea anotarse en la lista de espera? (S/N): ").strip().upper()
+            if espera == 'S':
+                id_sala = input("Clave de la sala (deje vacío para cualquiera con cupo suficiente): ").strip().upper() or None
+                cupo_minimo = None if id_sala else input_entero("Número de asistentes: ", minimo=1)
+                evento = input_no_vacio("Nombre del evento: ")
+                entrada = db.agregar_lista_espera(evento, id_cliente, fecha_dt, turno, id_sala=id_sala, cupo_minimo=cupo_minimo)
+                print("\n" + linea())
+                print("✓ SOLICITUD AGREGADA A LA LISTA DE ESPERA")
+                print(f"  Número de solicitud: {entrada.id}")
+                print("  Se reservará automáticamente si se libera un espacio compatible.")
+                print(linea())
             pausar()
             return
 
@@ -407,10 +1896,10 @@ def opcion_registrar_reserva(db: BaseDatos):
 
         evento = input_no_vacio("\nNombre del evento: ")
 
-        reserva = db.registrar_reserva(evento, id_cliente, id_sala, fecha_dt, turno)
-
-        cliente = db.obtener_cliente(id_cliente)
-        sala = db.obtener_sala(id_sala)
+        with metricas.tramo("sql"):
+            reserva = db.registrar_reserva(evento, id_cliente, id_sala, fecha_dt, turno)
+            cliente = db.obtener_cliente(id_cliente)
+            sala = db.obtener_sala(id_sala)
 
         print("\n" + linea())
         print("✓ RESERVACIÓN REGISTRADA EXITOSAMENTE")
@@ -431,6 +1920,103 @@ def opcion_registrar_reserva(db: BaseDatos):
         print(f"\n✗ Se produjo el siguiente error: {sys.exc_info()[0]}")
     pausar()
 
+def input_hora(prompt: str) -> int:
+    while True:
+        with metricas.tramo("entrada"):
+            s = input(prompt)
+        try:
+            return hora_a_minutos(s)
+        except ValueError as e:
+            print(f"⚠ {e}")
+
+def opcion_reservar_por_horario(db: BaseDatos):
+    print(linea())
+    print("RESERVAR SALA POR HORARIO")
+    print(linea())
+
+    cursor = db.conn.cursor()
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM clientes), EXISTS (SELECT 1 FROM salas)")
+    hay_clientes, hay_salas = cursor.fetchone()
+    if not hay_clientes or not hay_salas:
+        print("⚠ Se necesita al menos un cliente y una sala registrados.")
+        pausar()
+        return
+
+    cliente = seleccionar_cliente(db)
+    if cliente is None:
+        print("Operación cancelada.")
+        pausar()
+        return
+
+    calendario = db.calendario()
+    print(f"\nLa fecha debe ser al menos: {fecha_a_str(calendario.primer_dia_reservable())}")
+    while True:
+        fecha_dt = input_fecha("Fecha de reservación (mm-dd-aaaa): ")
+        try:
+            calendario.validar(fecha_dt)
+            break
+        except ValueError as e:
+            print(f"⚠ {e}")
+
+    print(f"\nHorario de la sede: {minutos_a_hora(APERTURA)} a {minutos_a_hora(CIERRE)}")
+    hora_inicio = input_hora("Hora de inicio (HH:MM): ")
+    hora_fin = input_hora("Hora de fin (HH:MM): ")
+    horario = f"{minutos_a_hora(hora_inicio)} a {minutos_a_hora(hora_fin)}"
+
+    try:
+        with metricas.tramo("sql"):
+            salas_libres = db.salas_libres_en(fecha_dt, hora_inicio, hora_fin)
+        if not salas_libres:
+            print(f"\n⚠ Ninguna sala está libre de {horario} el {fecha_a_str(fecha_dt)}.")
+            print("Horarios libres ese día:")
+            print(linea())
+            cursor.execute("SELECT id, nombre FROM salas ORDER BY id")
+            filas = [
+                [id_sala, nombre, ", ".join(f"{minutos_a_hora(i)}-{minutos_a_hora(f)}"
+                                           for i, f in db.huecos_libres(id_sala, fecha_dt)) or "Sin horarios libres"]
+                for id_sala, nombre in cursor.fetchall()
+            ]
+            print(tabla(["Clave Sala", "Nombre", "Horarios libres"], filas))
+            print(linea())
+            pausar()
+            return
+
+        print(f"\nSalas libres de {horario} el {fecha_a_str(fecha_dt)}:")
+        print(linea())
+        print(tabla(["Clave Sala", "Nombre", "Cupo"], [[s.id, s.nombre, str(s.cupo)] for s in salas_libres]))
+        print(linea())
+
+        while True:
+            id_sala = input("\nClave de la sala: ").strip()
+            if id_sala in [s.id for s in salas_libres]:
+                break
+            print("⚠ Sala no disponible o no válida.")
+
+        evento = input_no_vacio("\nNombre del evento: ")
+
+        with metricas.tramo("sql"):
+            reserva = db.registrar_reserva_intervalo(evento, cliente.id, id_sala, fecha_dt, hora_inicio, hora_fin)
+            sala = db.obtener_sala(id_sala)
+
+        print("\n" + linea())
+        print("✓ RESERVACIÓN REGISTRADA EXITOSAMENTE")
+        print(linea())
+        print(f"  Folio:   {reserva.folio}")
+        print(f"  Evento:  {reserva.evento}")
+        print(f"  Cliente: {cliente.apellidos}, {cliente.nombres}")
+        print(f"  Sala:    {sala.nombre}")
+        print(f"  Fecha:   {fecha_a_str(reserva.fecha)}")
+        print(f"  Horario: {horario}")
+        print(linea())
+
+    except ValueError as e:
+        print(f"\n✗ Error: {e}")
+    except sqlite3.Error as e:
+        print(f"\n✗ Error de base de datos: {e}")
+    except Exception:
+        print(f"\n✗ Se produjo el siguiente error: {sys.exc_info()[0]}")
+    pausar()
+
 def opcion_registrar_cliente(db: BaseDatos):
     print(linea())
     print("REGISTRAR NUEVO CLIENTE")
@@ -475,18 +2061,15 @@ def opcion_editar_evento(db: BaseDatos):
     print("EDITAR NOMBRE DE EVENTO DE UNA RESERVACIÓN")
     print(linea())
 
-    fecha_desde = input_fecha("Fecha inicial del rango (mm-dd-aaaa): ")
-    fecha_hasta = input_fecha("Fecha final del rango (mm-dd-aaaa): ")
-
     try:
-        reservas = db.reservas_en_rango(fecha_desde, fecha_hasta)
+        reservas, descripcion = buscar_reservas_interactivo(db)
 
         if not reservas:
-            print(f"\n⚠ No hay reservaciones en el rango {fecha_a_str(fecha_desde)} a {fecha_a_str(fecha_hasta)}")
+            print(f"\n⚠ No hay reservaciones {descripcion}")
             pausar()
             return
 
-        print(f"\nEventos registrados del {fecha_a_str(fecha_desde)} al {fecha_a_str(fecha_hasta)}:")
+        print(f"\nEventos registrados {descripcion}:")
         print(linea())
         filas = [[str(r.folio), r.evento, fecha_a_str(r.fecha)] for r in reservas]
         print(tabla(["Folio", "Nombre del Evento", "Fecha"], filas))
@@ -504,7 +2087,7 @@ def opcion_editar_evento(db: BaseDatos):
                     break
             except ValueError:
                 pass
-            print("\n⚠ El folio indicado no pertenece a este rango.")
+            print("\n⚠ El folio indicado no pertenece a la lista mostrada.")
             print("\nEventos disponibles:")
             print(linea())
             print(tabla(["Folio", "Nombre del Evento", "Fecha"], filas))
@@ -532,8 +2115,26 @@ def opcion_consultar_por_fecha(db: BaseDatos):
     print("(Deje vacío para usar la fecha actual del sistema)")
     fecha_dt = input_fecha("Fecha a consultar (mm-dd-aaaa): ", permitir_vacio=True)
 
+    filas_consultadas = []
+
+    def obtener_filas() -> List[List[str]]:
+        if not filas_consultadas:
+            with metricas.tramo("sql"):
+                filas_consultadas.append([fila_reporte(row) for row in db.filas_reporte(fecha_dt, fecha_dt)])
+        return filas_consultadas[0]
+
+    dia = fecha_dt.date().isoformat()
+    titulo = f"RESERVACIONES DEL {fecha_a_str(fecha_dt)}"
     try:
-        lista = db.reservas_por_fecha(fecha_dt)
+        with metricas.tramo("sql"):
+            version = db.version_datos(fecha_dt, fecha_dt)
+
+        def generar_tabla() -> bytes:
+            filas = obtener_filas()
+            with metricas.tramo("tabla"):
+                return tabla(ENCABEZADOS_REPORTE, filas).encode("utf-8")
+
+        texto = db.cache_reportes.obtener(("tabla", dia, dia), version, generar_tabla).decode("utf-8")
     except sqlite3.Error as e:
         print(f"✗ Error de base de datos: {e}")
         pausar()
@@ -543,28 +2144,15 @@ def opcion_consultar_por_fecha(db: BaseDatos):
         pausar()
         return
 
-    if not lista:
+    if not texto:
         print(f"\nNo hay reservaciones para la fecha {fecha_a_str(fecha_dt)}.")
         pausar()
         return
 
-    filas = []
-    for r in lista:
-        cli = db.obtener_cliente(r.id_cliente)
-        sala = db.obtener_sala(r.id_sala)
-        filas.append([
-            str(r.folio),
-            r.evento,
-            f"{cli.apellidos}, {cli.nombres}" if cli else r.id_cliente,
-            sala.nombre if sala else r.id_sala,
-            TURNOS.get(r.turno, r.turno),
-            str(sala.cupo if sala else ""),
-        ])
-
     print(f"\n╔{'═' * 78}╗")
-    print(f"║  RESERVACIONES DEL {fecha_a_str(fecha_dt)}".ljust(79) + "║")
+    print(f"║  {titulo}".ljust(79) + "║")
     print(f"╚{'═' * 78}╝")
-    print(tabla(["Folio", "Evento", "Cliente", "Sala", "Turno", "Cupo"], filas))
+    print(texto)
 
     print("\n" + linea())
     print("¿Desea exportar el reporte?")
@@ -573,72 +2161,28 @@ def opcion_consultar_por_fecha(db: BaseDatos):
     print("  3) Excel (XLSX)")
     print("  0) No exportar")
     print(linea())
-    export_op = input("Seleccione una opción: ").strip()
+    with metricas.tramo("entrada"):
+        export_op = input("Seleccione una opción: ").strip()
 
-    if export_op in {"1", "2", "3"}:
+    formatos = {"1": "csv", "2": "json", "3": "xlsx"}
+    if export_op in formatos:
         export_dir = "exportaciones"
         os.makedirs(export_dir, exist_ok=True)
         nombre_base = os.path.join(export_dir, f"reporte_{fecha_a_str(fecha_dt).replace('-', '')}")
-        try:
-            if export_op == "1":
-                with open(nombre_base + ".csv", "w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["Folio", "Evento", "Cliente", "Sala", "Turno", "Cupo"])
-                    writer.writerows(filas)
-                print(f"\n✓ Reporte exportado como {nombre_base}.csv")
-
-            elif export_op == "2":
-                data = [
-                    {"Folio": f[0], "Evento": f[1], "Cliente": f[2], "Sala": f[3], "Turno": f[4], "Cupo": f[5]}
-                    for f in filas
-                ]
-                with open(nombre_base + ".json", "w", encoding="utf-8") as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                print(f"\n✓ Reporte exportado como {nombre_base}.json")
-
-            elif export_op == "3":
-                try:
-                    from openpyxl import Workbook
-                    from openpyxl.styles import Font, Alignment, Border, Side
-
-                    wb = Workbook()
-                    ws = wb.active
-                    ws.title = "Reservaciones"
-
-                    ws.merge_cells('A1:F1')
-                    titulo_cell = ws['A1']
-                    titulo_cell.value = f"RESERVACIONES DEL {fecha_a_str(fecha_dt)}"
-                    titulo_cell.font = Font(bold=True, size=14)
-                    titulo_cell.alignment = Alignment(horizontal="center")
-
-                    headers = ["Folio", "Evento", "Cliente", "Sala", "Turno", "Cupo"]
-                    ws.append(headers)
-
-                    bold = Font(bold=True)
-                    border_grueso = Border(bottom=Side(border_style="thick"))
-                    for col in range(1, len(headers) + 1):
-                        cell = ws.cell(row=2, column=col)
-                        cell.font = bold
-                        cell.border = border_grueso
-                        cell.alignment = Alignment(horizontal="center")
-
-                    for fila in filas:
-                        ws.append(fila)
-
-                    for row in ws.iter_rows(min_row=3, max_row=ws.max_row):
-                        for cell in row:
-                            cell.alignment = Alignment(horizontal="center")
-
-                    for col in ws.columns:
-                        max_len = max(len(str(c.value)) for c in col if c.value)
-                        ws.column_dimensions[col[0].column_letter].width = max_len + 2
-
-                    wb.save(nombre_base + ".xlsx")
-                    print(f"\n✓ Reporte exportado como {nombre_base}.xlsx")
-                except ImportError:
-                    print("\n✗ Error: El módulo 'openpyxl' no está instalado.")
-                    print("   Instálelo con: pip install openpyxl")
+        formato = formatos[export_op]
+        def generar_reporte() -> bytes:
+            filas = obtener_filas()
+            with metricas.tramo("serializacion"):
+                return serializar_reporte(filas, formato, titulo)
 
+        try:
+            contenido = db.cache_reportes.obtener(("reporte", dia, dia, formato), version, generar_reporte)
+            with metricas.tramo("escritura"):
+                ruta = guardar_reporte(contenido, nombre_base, formato)
+            print(f"\n✓ Reporte exportado como {ruta}")
+        except ImportError:
+            print("\n✗ Error: El módulo 'openpyxl' no está instalado.")
+            print("   Instálelo con: pip install openpyxl")
         except Exception as e:
             print(f"\n✗ Error al exportar: {e}")
     else:
@@ -650,18 +2194,15 @@ def opcion_cancelar_reservacion(db: BaseDatos):
     print("CANCELAR UNA RESERVACIÓN")
     print(linea())
 
-    fecha_desde = input_fecha("Fecha inicial del rango (mm-dd-aaaa): ")
-    fecha_hasta = input_fecha("Fecha final del rango (mm-dd-aaaa): ")
-
     try:
-        reservas = db.reservas_en_rango(fecha_desde, fecha_hasta)
+        reservas, descripcion = buscar_reservas_interactivo(db)
 
         if not reservas:
-            print(f"\n⚠ No hay reservaciones activas en el rango {fecha_a_str(fecha_desde)} a {fecha_a_str(fecha_hasta)}")
+            print(f"\n⚠ No hay reservaciones activas {descripcion}")
             pausar()
             return
 
-        print(f"\nReservaciones del {fecha_a_str(fecha_desde)} al {fecha_a_str(fecha_hasta)}:")
+        print(f"\nReservaciones {descripcion}:")
         print(linea())
         filas = [[str(r.folio), r.evento, fecha_a_str(r.fecha)] for r in reservas]
         print(tabla(["Folio", "Nombre del Evento", "Fecha"], filas))
@@ -679,7 +2220,7 @@ def opcion_cancelar_reservacion(db: BaseDatos):
                     break
             except ValueError:
                 pass
-            print("\n⚠ El folio indicado no pertenece a este rango.")
+            print("\n⚠ El folio indicado no pertenece a la lista mostrada.")
 
         reserva = next(r for r in reservas if r.folio == folio)
         cliente = db.obtener_cliente(reserva.id_cliente)
@@ -704,10 +2245,152 @@ def opcion_cancelar_reservacion(db: BaseDatos):
             return
 
         db.cancelar_reservacion(folio)
+        promovida = db.promocion_por_cancelacion(folio)
 
         print("\n" + linea())
         print("✓ RESERVACIÓN CANCELADA EXITOSAMENTE")
-        print("  La disponibilidad de la sala ha sido recuperada.")
+        if promovida:
+            print(f"  El espacio se asignó a la solicitud en espera {promovida.id}: folio {promovida.folio}, \"{promovida.evento}\".")
+        else:
+            print("  La disponibilidad de la sala ha sido recuperada.")
+        print(linea())
+
+    except ValueError as e:
+        print(f"\n✗ Error: {e}")
+    except sqlite3.Error as e:
+        print(f"\n✗ Error de base de datos: {e}")
+    except Exception:
+        print(f"\n✗ Se produjo el siguiente error: {sys.exc_info()[0]}")
+    pausar()
+
+def opcion_reporte_utilizacion(db: BaseDatos):
+    try:
+        from analitica import opcion_reporte_utilizacion as reporte
+    except ImportError:
+        print("\n✗ Error: El módulo 'numpy' no está instalado.")
+        print("   Instálelo con: pip install numpy")
+        pausar()
+        return
+    reporte(db)
+
+def opcion_cancelar_lote(db: BaseDatos):
+    print(linea())
+    print("CANCELAR RESERVACIONES POR SALA Y RANGO DE FECHAS")
+    print(linea())
+
+    id_sala = input("Clave de la sala (deje vacío para todas): ").strip().upper() or None
+    fecha_desde = input_fecha("Fecha inicial del rango (mm-dd-aaaa): ")
+    fecha_hasta = input_fecha("Fecha final del rango (mm-dd-aaaa): ")
+    while True:
+        turno = input("Turno [M/V/N] (deje vacío para todos): ").strip().upper() or None
+        if turno is None or turno in TURNOS:
+            break
+        print("⚠ Turno inválido. Use M, V o N.")
+
+    try:
+        sala = db.obtener_sala(id_sala) if id_sala else None
+        if id_sala and sala is None:
+            print("\n⚠ La sala indicada no existe.")
+            pausar()
+            return
+        print("\n" + linea())
+        print(f"  Sala:  {sala.nombre if sala else 'Todas'}")
+        print(f"  Rango: {fecha_a_str(fecha_desde)} a {fecha_a_str(fecha_hasta)}")
+        print(f"  Turno: {TURNOS[turno] if turno else 'Todos'}")
+        print(linea())
+        confirmacion = input("\n¿Está seguro que desea cancelar todas las reservaciones activas indicadas? (S/N): ").strip().upper()
+        if confirmacion != 'S':
+            print("Cancelación abortada.")
+            pausar()
+            return
+
+        cancelados, rechazados = db.cancelar_lote(fecha_desde, fecha_hasta, id_sala=id_sala, turno=turno)
+
+        print("\n" + linea())
+        print(f"✓ {len(cancelados)} reservaciones canceladas.")
+        if cancelados:
+            print(f"  Folios: {', '.join(str(f) for f in cancelados)}")
+        promovidas = [e for e in map(db.promocion_por_cancelacion, cancelados) if e]
+        if promovidas:
+            print(f"✓ {len(promovidas)} solicitudes de la lista de espera recibieron un espacio liberado.")
+            print(f"  Folios nuevos: {', '.join(str(e.folio) for e in promovidas)}")
+        if rechazados:
+            print(f"⚠ {len(rechazados)} reservaciones no se cancelaron por tener menos de 2 días de anticipación.")
+            print(f"  Folios: {', '.join(str(f) for f in rechazados)}")
+        print(linea())
+
+    except ValueError as e:
+        print(f"\n✗ Error: {e}")
+    except sqlite3.Error as e:
+        print(f"\n✗ Error de base de datos: {e}")
+    except Exception:
+        print(f"\n✗ Se produjo el siguiente error: {sys.exc_info()[0]}")
+    pausar()
+
+def opcion_buscar_sala_por_asistentes(db: BaseDatos):
+    print(linea())
+    print("BUSCAR LA SALA MÁS ADECUADA POR NÚMERO DE ASISTENTES")
+    print(linea())
+
+    asistentes = input_entero("Número de asistentes: ", minimo=1)
+    calendario = db.calendario()
+    print(f"\nLa fecha debe ser al menos: {fecha_a_str(calendario.primer_dia_reservable())}")
+    while True:
+        desde_dt = input_fecha("Fecha más próxima deseada (mm-dd-aaaa): ")
+        try:
+            calendario.validar_anticipacion(desde_dt)
+            break
+        except ValueError as e:
+            print(f"⚠ {e}")
+    while True:
+        turno = input("Turno preferido [M/V/N] (deje vacío para cualquiera): ").strip().upper() or None
+        if turno is None or turno in TURNOS:
+            break
+        print("⚠ Turno inválido. Use M, V o N.")
+
+    try:
+        opciones = db.buscar_sala_para(asistentes, desde_dt, turno)
+        if not opciones:
+            print(f"\n⚠ Ninguna sala tiene cupo para {asistentes} asistentes.")
+            pausar()
+            return
+
+        print(f"\nOpciones para {asistentes} asistentes:")
+        print(linea())
+        filas = [
+            [str(i), o.sala.id, o.sala.nombre, str(o.sala.cupo), fecha_a_str(o.fecha), TURNOS[o.turno]]
+            for i, o in enumerate(opciones, start=1)
+        ]
+        print(tabla(["#", "Clave Sala", "Nombre", "Cupo", "Fecha", "Turno"], filas))
+        print(linea())
+
+        eleccion = input("\nNúmero de la opción a reservar (ENTER para salir): ").strip()
+        if not eleccion:
+            pausar()
+            return
+        if not eleccion.isdigit() or not 1 <= int(eleccion) <= len(opciones):
+            print("⚠ Opción inválida.")
+            pausar()
+            return
+        opcion = opciones[int(eleccion) - 1]
+
+        cliente = seleccionar_cliente(db)
+        if cliente is None:
+            print("Operación cancelada.")
+            pausar()
+            return
+        evento = input_no_vacio("\nNombre del evento: ")
+        reserva = db.registrar_reserva(evento, cliente.id, opcion.sala.id, opcion.fecha, opcion.turno)
+
+        print("\n" + linea())
+        print("✓ RESERVACIÓN REGISTRADA EXITOSAMENTE")
+        print(linea())
+        print(f"  Folio:   {reserva.folio}")
+        print(f"  Evento:  {reserva.evento}")
+        print(f"  Cliente: {cliente.apellidos}, {cliente.nombres}")
+        print(f"  Sala:    {opcion.sala.nombre}")
+        print(f"  Fecha:   {fecha_a_str(reserva.fecha)}")
+        print(f"  Turno:   {TURNOS[reserva.turno]}")
         print(linea())
 
     except ValueError as e:
@@ -718,6 +2401,174 @@ def opcion_cancelar_reservacion(db: BaseDatos):
         print(f"\n✗ Se produjo el siguiente error: {sys.exc_info()[0]}")
     pausar()
 
+def opcion_lista_espera(db: BaseDatos):
+    print(linea())
+    print("LISTA DE ESPERA")
+    print(linea())
+
+    try:
+        entradas = db.lista_espera_pendiente()
+        if not entradas:
+            print("\n⚠ No hay solicitudes pendientes en la lista de espera.")
+            pausar()
+            return
+
+        filas = [
+            [str(e.id), fecha_a_str(e.fecha), TURNOS.get(e.turno, e.turno), e.id_sala or f"Cupo ≥ {e.cupo_minimo}",
+             e.evento, e.id_cliente]
+            for e in entradas
+        ]
+        print(tabla(["Solicitud", "Fecha", "Turno", "Sala", "Evento", "Cliente"], filas))
+        print(linea())
+
+        id_str = input("\nNúmero de solicitud a retirar (deje vacío para regresar): ").strip()
+        if not id_str:
+            pausar()
+            return
+        if not id_str.isdigit() or int(id_str) not in [e.id for e in entradas]:
+            print("\n⚠ La solicitud indicada no pertenece a la lista mostrada.")
+            pausar()
+            return
+        db.retirar_lista_espera(int(id_str))
+        print(f"\n✓ Solicitud {id_str} retirada de la lista de espera.")
+
+    except ValueError as e:
+        print(f"\n✗ Error: {e}")
+    except sqlite3.Error as e:
+        print(f"\n✗ Error de base de datos: {e}")
+    pausar()
+
+def opcion_historial_cliente(db: BaseDatos):
+    print(linea())
+    print("HISTORIAL DE RESERVACIONES DE UN CLIENTE")
+    print(linea())
+
+    try:
+        cliente = seleccionar_cliente(db)
+        if cliente is None:
+            print("Operación cancelada.")
+            pausar()
+            return
+
+        est = db.estadisticas_cliente(cliente.id)
+        print("\n" + linea())
+        print(f"CLIENTE {cliente.id}: {cliente.apellidos}, {cliente.nombres}")
+        print(linea())
+        if not est["total"]:
+            print("\n⚠ El cliente no tiene reservaciones.")
+            pausar()
+            return
+
+        favoritas = []
+        for id_sala, veces in est["salas_favoritas"]:
+            sala = db.obtener_sala(id_sala)
+            favoritas.append(f"{sala.nombre if sala else id_sala} ({veces})")
+        print(tabla(["Indicador", "Valor"], [
+            ["Reservaciones", str(est["total"])],
+            *[[f"  {estado.capitalize()}", str(n)] for estado, n in sorted(est["por_estado"].items())],
+            ["Tasa de cancelación", f"{est['tasa_cancelacion'] * 100:.1f}%"],
+            ["Próximas (activas)", str(est["proximas"])],
+            ["Primera reservación", fecha_a_str(est["primera"])],
+            ["Última reservación", fecha_a_str(est["ultima"])],
+            ["Salas favoritas", ", ".join(favoritas) or "-"],
+        ]))
+
+        despues_de = None
+        while True:
+            pagina = db.historial_cliente(cliente.id, limite=10, despues_de=despues_de)
+            if not pagina:
+                print("\n(No hay más reservaciones)")
+                break
+            print("\n" + tabla(["Folio", "Evento", "Fecha", "Turno", "Sala", "Estado"], [
+                [str(r.folio), r.evento, fecha_a_str(r.fecha), TURNOS.get(r.turno, r.turno), r.id_sala, r.estado]
+                for r in pagina
+            ]))
+            if len(pagina) < 10:
+                break
+            if input("\n¿Ver más antiguas? (S/N): ").strip().upper() != 'S':
+                break
+            despues_de = (pagina[-1].fecha.date().isoformat(), pagina[-1].folio)
+
+    except ValueError as e:
+        print(f"\n✗ Error: {e}")
+    except sqlite3.Error as e:
+        print(f"\n✗ Error de base de datos: {e}")
+    pausar()
+
+def opcion_dias_cerrados(db: BaseDatos):
+    print(linea())
+    print("DÍAS CERRADOS (FESTIVOS Y CIERRES DE LA SEDE)")
+    print(linea())
+
+    try:
+        cerrados = db.dias_cerrados()
+        if cerrados:
+            print(tabla(["Fecha", "Motivo"], [[fecha_a_str(dia), motivo] for dia, motivo in cerrados]))
+        else:
+            print("(No hay días cerrados próximos; los domingos siempre cierran)")
+        print(linea())
+        print("  1) Cerrar un día o rango de días")
+        print("  2) Volver a abrir un día o rango de días")
+        print("  0) Regresar")
+        op = input("Seleccione una opción: ").strip()
+        if op not in {"1", "2"}:
+            pausar()
+            return
+
+        fecha_desde = input_fecha("Fecha inicial (mm-dd-aaaa): ")
+        fecha_hasta = fecha_desde + timedelta(days=input_entero("Número de días: ", minimo=1) - 1)
+
+        if op == "1":
+            motivo = input_no_vacio("Motivo del cierre: ")
+            total = db.cerrar_dias(fecha_desde, fecha_hasta, motivo)
+            activas = [r for r in db.reservas_en_rango(fecha_desde, fecha_hasta, incluir_historico=False)
+                       if r.estado == 'activa']
+            print(f"\n✓ {total} días marcados como cerrados.")
+            if activas:
+                print(f"⚠ Hay {len(activas)} reservaciones activas en esos días: "
+                      f"{', '.join(str(r.folio) for r in activas)}")
+        else:
+            total = db.abrir_dias(fecha_desde, fecha_hasta)
+            print(f"\n✓ {total} días vuelven a estar abiertos.")
+
+    except ValueError as e:
+        print(f"\n✗ Error: {e}")
+    except sqlite3.Error as e:
+        print(f"\n✗ Error de base de datos: {e}")
+    pausar()
+
+def opcion_estadisticas_cache(db: BaseDatos):
+    print(linea())
+    print("ESTADÍSTICAS DEL CACHÉ DE REPORTES")
+    print(linea())
+    est = db.cache_reportes.estadisticas()
+    print(tabla(["Indicador", "Valor"], [
+        ["Solicitudes", str(est["solicitudes"])],
+        ["Aciertos en memoria", str(est["aciertos_memoria"])],
+        ["Aciertos en disco", str(est["aciertos_disco"])],
+        ["Reportes generados", str(est["fallos"])],
+        ["Entradas en memoria", str(est["entradas_memoria"])],
+        ["Tasa de aciertos", f"{est['tasa_aciertos'] * 100:.1f}%"],
+    ]))
+    print("\nDISPONIBILIDAD DE SALAS POR FECHA Y TURNO")
+    print(linea())
+    est = db.cache_disponibilidad.estadisticas()
+    print(tabla(["Indicador", "Valor"], [
+        ["Solicitudes", str(est["solicitudes"])],
+        ["Aciertos", str(est["aciertos"])],
+        ["Consultas a la base", str(est["fallos"])],
+        ["Espacios invalidados", str(est["invalidaciones"])],
+        ["Vaciados por escrituras externas", str(est["invalidaciones_globales"])],
+        ["Entradas en memoria", str(est["entradas"])],
+        ["Tasa de aciertos", f"{est['tasa_aciertos'] * 100:.1f}%"],
+    ]))
+    pausar()
+
+def opcion_reportes_lote(db: BaseDatos):
+    from reportes_lote import opcion_reportes_lote as reportes
+
+    reportes(db)
+
 def menu():
     print("\n" + "=" * 60)
     print("SISTEMA DE RESERVACIONES DE ESPACIOS DE COWORKING")
@@ -741,21 +2592,32 @@ def menu():
         "4": ("Cancelar una reservación", opcion_cancelar_reservacion),
         "5": ("Registrar a un nuevo cliente", opcion_registrar_cliente),
         "6": ("Registrar una sala", opcion_registrar_sala),
-        "7": ("Salir", None),
+        "7": ("Reporte de utilización de salas", opcion_reporte_utilizacion),
+        "8": ("Cancelar reservaciones por sala y rango de fechas", opcion_cancelar_lote),
+        "9": ("Generar reportes por lote", opcion_reportes_lote),
+        "10": ("Estadísticas de los cachés de reportes y disponibilidad", opcion_estadisticas_cache),
+        "11": ("Buscar sala por número de asistentes", opcion_buscar_sala_por_asistentes),
+        "12": ("Consultar la lista de espera", opcion_lista_espera),
+        "13": ("Administrar días cerrados", opcion_dias_cerrados),
+        "14": ("Historial de un cliente", opcion_historial_cliente),
+        "15": ("Reservar una sala por horario", opcion_reservar_por_horario),
+        "16": ("Salir", None),
     }
 
     try:
         while True:
-            os.system("cls" if os.name == "nt" else "clear")
+            with metricas.tramo("limpiar_pantalla"):
+                os.system("cls" if os.name == "nt" else "clear")
             print("=" * 60)
             print("MENÚ PRINCIPAL - SISTEMA DE RESERVACIONES COWORKING")
             print("=" * 60)
-            for k in sorted(opciones.keys()):
+            for k in sorted(opciones.keys(), key=int):
                 print(f"  {k}. {opciones[k][0]}")
             print("=" * 60)
-            op = input("Seleccione una opción: ").strip()
+            with metricas.tramo("entrada"):
+                op = input("Seleccione una opción: ").strip()
 
-            if op == "7":
+            if op in opciones and opciones[op][1] is None:
                 print("\n" + linea())
                 print("¿Está seguro que desea salir del sistema?")
                 confirm = input("Confirmar salida (S/N): ").strip().upper()
@@ -770,8 +2632,10 @@ def menu():
             elif op in opciones:
                 _, fn = opciones[op]
                 if fn:
-                    os.system("cls" if os.name == "nt" else "clear")
-                    fn(db)
+                    with metricas.tramo("limpiar_pantalla"):
+                        os.system("cls" if os.name == "nt" else "clear")
+                    with metricas.tramo(fn.__name__):
+                        fn(db)
             else:
                 print("\n⚠ Opción inválida.")
                 pausar()
@@ -782,5 +2646,5 @@ def menu():
     finally:
         db.cerrar()
 
-if _name_ == "_main_":
+if __name__ == "__main__":
     menu()
\ No newline at end of file
@@ -0,0 +1,252 @@
+import csv
+import os
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import List, Optional
+
+import numpy as np
+
+from PIA_EDD import (
+    BaseDatos,
+    Sala,
+    TURNOS,
+    _turnos_ocupados_sql,
+    fecha_a_str,
+    input_fecha,
+    linea,
+    pausar,
+    tabla,
+)
+
+ORDEN_TURNOS = list(TURNOS.keys())
+NOMBRES_DIAS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+@dataclass
+class CuboOcupacion:
+    salas: List[Sala]
+    dias: np.ndarray
+    ocupado: np.ndarray
+
+    @property
+    def cupos(self) -> np.ndarray:
+        return np.array([s.cupo for s in self.salas], dtype=np.int64)
+
+    @property
+    def dias_semana(self) -> np.ndarray:
+        # 1970-01-01 fue jueves (weekday 3)
+        return (self.dias.astype(np.int64) + 3) % 7
+
+    @property
+    def habiles(self) -> np.ndarray:
+        # Los domingos no se pueden reservar, no cuentan como capacidad
+        return self.dias_semana != 6
+
+def cargar_cubo(db: BaseDatos, desde_dt: datetime, hasta_dt: datetime) -> CuboOcupacion:
+    desde = np.datetime64(desde_dt.date(), "D")
+    hasta = np.datetime64(hasta_dt.date(), "D")
+    if hasta < desde:
+        raise ValueError("La fecha final no puede ser anterior a la inicial.")
+    dias = np.arange(desde, hasta + 1, dtype="datetime64[D]")
+
+    cursor = db.conn.cursor()
+    cursor.execute("SELECT id, nombre, cupo FROM salas ORDER BY id")
+    salas = [Sala(*row) for row in cursor.fetchall()]
+    indice_sala = {s.id: i for i, s in enumerate(salas)}
+    indice_turno = {t: i for i, t in enumerate(ORDEN_TURNOS)}
+
+    ocupado = np.zeros((len(salas), len(dias), len(ORDEN_TURNOS)), dtype=bool)
+
+    # Desde las reservaciones y no desde ocupacion, que solo guarda las de turno completo
+    consulta = " UNION ALL ".join(
+        _turnos_ocupados_sql(t) for t in db._tablas_reservaciones(desde_dt.date(), incluir_historico=True)
+    )
+    cursor.execute(consulta, {"desde": desde_dt.date(), "hasta": hasta_dt.date()})
+    filas = [r for r in cursor.fetchall() if r[0] in indice_sala and r[2] in indice_turno]
+    if filas:
+        i_sala = np.fromiter((indice_sala[r[0]] for r in filas), dtype=np.int64, count=len(filas))
+        i_dia = (np.array([r[1] for r in filas], dtype="datetime64[D]") - desde).astype(np.int64)
+        i_turno = np.fromiter((indice_turno[r[2]] for r in filas), dtype=np.int64, count=len(filas))
+        ocupado[i_sala, i_dia, i_turno] = True
+
+    return CuboOcupacion(salas=salas, dias=dias, ocupado=ocupado)
+
+def _proporcion(ocupados: np.ndarray, capacidad: np.ndarray) -> np.ndarray:
+    ocupados = np.asarray(ocupados, dtype=np.float64)
+    capacidad = np.asarray(capacidad, dtype=np.float64)
+    return np.divide(ocupados, capacidad, out=np.zeros_like(ocupados), where=capacidad > 0)
+
+def utilizacion_por_sala(cubo: CuboOcupacion) -> np.ndarray:
+    habiles = cubo.habiles
+    ocupados = cubo.ocupado[:, habiles, :].sum(axis=(1, 2))
+    capacidad = np.full(len(cubo.salas), habiles.sum() * len(ORDEN_TURNOS))
+    return _proporcion(ocupados, capacidad)
+
+def utilizacion_por_turno(cubo: CuboOcupacion) -> np.ndarray:
+    habiles = cubo.habiles
+    ocupados = cubo.ocupado[:, habiles, :].sum(axis=(0, 1))
+    capacidad = np.full(len(ORDEN_TURNOS), len(cubo.salas) * habiles.sum())
+    return _proporcion(ocupados, capacidad)
+
+def utilizacion_por_dia_semana(cubo: CuboOcupacion) -> np.ndarray:
+    por_dia = cubo.ocupado.sum(axis=(0, 2))
+    ocupados = np.bincount(cubo.dias_semana, weights=por_dia, minlength=7)
+    capacidad = np.bincount(cubo.dias_semana, minlength=7) * len(cubo.salas) * len(ORDEN_TURNOS)
+    return _proporcion(ocupados, capacidad)
+
+def semanas(cubo: CuboOcupacion) -> np.ndarray:
+    return cubo.dias - cubo.dias_semana.astype("timedelta64[D]")
+
+def utilizacion_por_semana(cubo: CuboOcupacion):
+    lunes, indice = np.unique(semanas(cubo), return_inverse=True)
+    habiles = cubo.habiles
+    por_dia = cubo.ocupado.sum(axis=(0, 2)) * habiles
+    ocupados = np.bincount(indice, weights=por_dia, minlength=len(lunes))
+    capacidad = np.bincount(indice, weights=habiles, minlength=len(lunes)) * len(cubo.salas) * len(ORDEN_TURNOS)
+    return lunes, _proporcion(ocupados, capacidad)
+
+def utilizacion_ponderada_por_cupo(cubo: CuboOcupacion) -> float:
+    habiles = cubo.habiles
+    lugares_ocupados = np.einsum("sdt,s->", cubo.ocupado[:, habiles, :].astype(np.int64), cubo.cupos)
+    lugares_totales = cubo.cupos.sum() * habiles.sum() * len(ORDEN_TURNOS)
+    return float(_proporcion(lugares_ocupados, lugares_totales))
+
+def dias_pico(cubo: CuboOcupacion, n: int = 5):
+    lugares = np.einsum("sdt,s->d", cubo.ocupado.astype(np.int64), cubo.cupos)
+    turnos = cubo.ocupado.sum(axis=(0, 2))
+    orden = np.lexsort((-lugares, -turnos))[:n]
+    orden = orden[turnos[orden] > 0]
+    return cubo.dias[orden], turnos[orden], lugares[orden]
+
+def salas_ociosas(cubo: CuboOcupacion) -> List[Sala]:
+    sin_uso = ~cubo.ocupado.any(axis=(1, 2))
+    return [s for s, ocioso in zip(cubo.salas, sin_uso) if ocioso]
+
+def _dia_a_str(dia: np.datetime64) -> str:
+    return fecha_a_str(dia.astype(date))
+
+def _porcentaje(valor: float) -> str:
+    return f"{valor * 100:.1f}%"
+
+def secciones_reporte(cubo: CuboOcupacion):
+    por_sala = utilizacion_por_sala(cubo)
+    yield "Utilización por sala", ["Clave Sala", "Nombre", "Cupo", "Utilización"], [
+        [s.id, s.nombre, str(s.cupo), _porcentaje(u)] for s, u in zip(cubo.salas, por_sala)
+    ]
+
+    por_turno = utilizacion_por_turno(cubo)
+    yield "Utilización por turno", ["Turno", "Utilización"], [
+        [TURNOS[t], _porcentaje(u)] for t, u in zip(ORDEN_TURNOS, por_turno)
+    ]
+
+    por_dia = utilizacion_por_dia_semana(cubo)
+    yield "Utilización por día de la semana", ["Día", "Utilización"], [
+        [NOMBRES_DIAS[i], _porcentaje(por_dia[i])] for i in range(6)
+    ]
+
+    lunes, por_semana = utilizacion_por_semana(cubo)
+    yield "Utilización por semana", ["Semana del", "Utilización"], [
+        [_dia_a_str(l), _porcentaje(u)] for l, u in zip(lunes, por_semana)
+    ]
+
+    dias, turnos, lugares = dias_pico(cubo)
+    yield "Días pico", ["Fecha", "Turnos ocupados", "Lugares reservados"], [
+        [_dia_a_str(d), str(t), str(l)] for d, t, l in zip(dias, turnos, lugares)
+    ]
+
+    yield "Salas sin uso", ["Clave Sala", "Nombre", "Cupo"], [
+        [s.id, s.nombre, str(s.cupo)] for s in salas_ociosas(cubo)
+    ]
+
+    yield "Resumen", ["Indicador", "Valor"], [
+        ["Utilización ponderada por cupo", _porcentaje(utilizacion_ponderada_por_cupo(cubo))],
+    ]
+
+def exportar_csv(cubo: CuboOcupacion, ruta: str) -> None:
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for titulo, headers, filas in secciones_reporte(cubo):
+            writer.writerow([titulo])
+            writer.writerow(headers)
+            writer.writerows(filas)
+            writer.writerow([])
+
+def opcion_reporte_utilizacion(db: BaseDatos):
+    print(linea())
+    print("REPORTE DE UTILIZACIÓN DE SALAS")
+    print(linea())
+
+    fecha_desde = input_fecha("Fecha inicial del rango (mm-dd-aaaa): ")
+    fecha_hasta = input_fecha("Fecha final del rango (mm-dd-aaaa): ")
+
+    try:
+        cubo = cargar_cubo(db, fecha_desde, fecha_hasta)
+    except ValueError as e:
+        print(f"\n✗ Error: {e}")
+        pausar()
+        return
+    except Exception:
+        print(f"\n✗ Se produjo el siguiente error: {sys.exc_info()[0]}")
+        pausar()
+        return
+
+    if not cubo.salas:
+        print("\n⚠ No hay salas registradas.")
+        pausar()
+        return
+
+    print(f"\nUtilización del {fecha_a_str(fecha_desde)} al {fecha_a_str(fecha_hasta)}:")
+    for titulo, headers, filas in secciones_reporte(cubo):
+        print("\n" + linea())
+        print(titulo.upper())
+        print(linea())
+        print(tabla(headers, filas) if filas else "(sin datos)")
+
+    export = input("\n¿Desea exportar el reporte a CSV? (S/N): ").strip().upper()
+    if export == "S":
+        export_dir = "exportaciones"
+        os.makedirs(export_dir, exist_ok=True)
+        ruta = os.path.join(
+            export_dir,
+            f"utilizacion_{fecha_a_str(fecha_desde).replace('-', '')}_{fecha_a_str(fecha_hasta).replace('-', '')}.csv",
+        )
+        try:
+            exportar_csv(cubo, ruta)
+            print(f"\n✓ Reporte exportado como {ruta}")
+        except Exception as e:
+            print(f"\n✗ Error al exportar: {e}")
+    else:
+        print("\nNo se exportó el reporte.")
+    pausar()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reporte de utilización de salas")
+    parser.add_argument("desde", help="Fecha inicial (mm-dd-aaaa)")
+    parser.add_argument("hasta", help="Fecha final (mm-dd-aaaa)")
+    parser.add_argument("--db", default="coworking.db", help="Archivo de base de datos")
+    parser.add_argument("--csv", help="Ruta del CSV de salida")
+    args = parser.parse_args(argv)
+
+    desde = datetime.strptime(args.desde, "%m-%d-%Y")
+    hasta = datetime.strptime(args.hasta, "%m-%d-%Y")
+    db = BaseDatos(args.db)
+    try:
+        cubo = cargar_cubo(db, desde, hasta)
+    finally:
+        db.cerrar()
+
+    if args.csv:
+        exportar_csv(cubo, args.csv)
+        print(f"✓ Reporte exportado como {args.csv}")
+    else:
+        for titulo, headers, filas in secciones_reporte(cubo):
+            print(linea())
+            print(titulo.upper())
+            print(linea())
+            print(tabla(headers, filas) if filas else "(sin datos)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+import argparse
+import csv
+import sqlite3
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from PIA_EDD import DB_FILE, HORARIOS_TURNO, TURNOS, BaseDatos, Sala, _turnos_ocupados_sql, fecha_a_str, linea, tabla
+
+@dataclass
+class Solicitud:
+    evento: str
+    id_cliente: str
+    asistentes: int
+    opciones: List[Tuple[datetime, str]]
+
+@dataclass
+class Asignacion:
+    solicitud: Solicitud
+    sala: Sala
+    fecha: datetime
+    turno: str
+    folio: Optional[int] = None
+
+@dataclass
+class ResultadoAsignacion:
+    asignadas: List[Asignacion] = field(default_factory=list)
+    sin_lugar: List[Solicitud] = field(default_factory=list)
+    en_orden_de_llegada: int = 0
+
+Espacio = Tuple[str, str, str]
+
+def _cargar_estado(db: BaseDatos, solicitudes: List[Solicitud]):
+    cursor = db.conn.cursor()
+    cursor.execute("SELECT id, nombre, cupo FROM salas ORDER BY cupo, id")
+    salas = [Sala(*row) for row in cursor.fetchall()]
+    dias = sorted({f.date().isoformat() for s in solicitudes for f, _ in s.opciones})
+    ocupados: Set[Espacio] = set()
+    if dias:
+        cursor.execute(_turnos_ocupados_sql("reservaciones"), {"desde": dias[0], "hasta": dias[-1]})
+        ocupados = {(dia, turno, id_sala) for id_sala, dia, turno in cursor.fetchall()}
+    cursor.execute("SELECT id FROM clientes")
+    clientes = {row[0] for row in cursor.fetchall()}
+    return salas, ocupados, clientes
+
+def _aristas(db: BaseDatos, solicitudes: List[Solicitud], salas: List[Sala], ocupados: Set[Espacio],
+             clientes: Set[str]) -> Tuple[List[List[int]], List[Espacio]]:
+    # Cada solicitud se une con cada espacio libre (dia, turno, sala) que acepta y cuyo
+    # cupo alcanza; las salas van de menor a mayor cupo, así se prefiere la más chica.
+    # Todas las fechas del lote se validan contra el calendario en una sola llamada
+    fechas = sorted({f.date() for s in solicitudes for f, _ in s.opciones})
+    reservables = {f for f, error in zip(fechas, db.calendario().validar_lote(fechas)) if error is None}
+    indice: Dict[Espacio, int] = {}
+    espacios: List[Espacio] = []
+    aristas: List[List[int]] = []
+    for s in solicitudes:
+        vecinos = []
+        if s.id_cliente in clientes and s.asistentes > 0:
+            validas = [
+                (f.date().isoformat(), t) for f, t in s.opciones
+                if t in TURNOS and f.date() in reservables
+            ]
+            for sala in salas:
+                if sala.cupo < s.asistentes:
+                    continue
+                for dia, turno in validas:
+                    espacio = (dia, turno, sala.id)
+                    if espacio in ocupados:
+                        continue
+                    if espacio not in indice:
+                        indice[espacio] = len(espacios)
+                        espacios.append(espacio)
+                    vecinos.append(indice[espacio])
+        aristas.append(vecinos)
+    return aristas, espacios
+
+def _voraz(aristas: List[List[int]], orden: List[int], pareja_espacio: List[int], pareja_solicitud: List[int]) -> int:
+    colocadas = 0
+    for i in orden:
+        for j in aristas[i]:
+            if pareja_espacio[j] == -1:
+                pareja_solicitud[i] = j
+                pareja_espacio[j] = i
+                colocadas += 1
+                break
+    return colocadas
+
+def emparejamiento_maximo(aristas: List[List[int]], n_espacios: int) -> List[int]:
+    # Hopcroft-Karp, arrancando de una asignación voraz (primero las solicitudes con
+    # menos opciones). Devuelve, por solicitud, el índice del espacio o -1.
+    n = len(aristas)
+    pareja_solicitud = [-1] * n
+    pareja_espacio = [-1] * n_espacios
+    _voraz(aristas, sorted(range(n), key=lambda i: len(aristas[i])), pareja_espacio, pareja_solicitud)
+
+    infinito = n + 1
+    while True:
+        distancia = [infinito] * n
+        cola = deque()
+        for i in range(n):
+            if pareja_solicitud[i] == -1 and aristas[i]:
+                distancia[i] = 0
+                cola.append(i)
+        alcanza_libre = False
+        while cola:
+            i = cola.popleft()
+            for j in aristas[i]:
+                k = pareja_espacio[j]
+                if k == -1:
+                    alcanza_libre = True
+                elif distancia[k] == infinito:
+                    distancia[k] = distancia[i] + 1
+                    cola.append(k)
+        if not alcanza_libre:
+            break
+
+        # Caminos de aumento disjuntos por capas, con DFS iterativo (sin límite de recursión)
+        siguiente = [0] * n
+        for raiz in range(n):
+            if pareja_solicitud[raiz] != -1 or distancia[raiz] != 0:
+                continue
+            pila = [raiz]
+            camino: List[int] = []
+            while pila:
+                i = pila[-1]
+                avanzo = False
+                while siguiente[i] < len(aristas[i]):
+                    j = aristas[i][siguiente[i]]
+                    siguiente[i] += 1
+                    k = pareja_espacio[j]
+                    if k == -1:
+                        # Se invierte el camino raíz -> ... -> i -> j
+                        camino.append(j)
+                        for nodo, espacio in zip(pila, camino):
+                            pareja_solicitud[nodo] = espacio
+                            pareja_espacio[espacio] = nodo
+                        pila = []
+                        avanzo = True
+                        break
+                    if distancia[k] == distancia[i] + 1:
+                        camino.append(j)
+                        pila.append(k)
+                        avanzo = True
+                        break
+                if not avanzo:
+                    distancia[i] = infinito
+                    pila.pop()
+                    if camino:
+                        camino.pop()
+    return pareja_solicitud
+
+def planear(db: BaseDatos, solicitudes: List[Solicitud]) -> ResultadoAsignacion:
+    for n, s in enumerate(solicitudes, start=1):
+        if not (s.evento or "").strip():
+            raise ValueError(f"Solicitud {n}: el nombre del evento no puede estar vacío.")
+    salas, ocupados, clientes = _cargar_estado(db, solicitudes)
+    aristas, espacios = _aristas(db, solicitudes, salas, ocupados, clientes)
+    salas_por_id = {s.id: s for s in salas}
+
+    en_orden = _voraz(aristas, list(range(len(solicitudes))), [-1] * len(espacios), [-1] * len(solicitudes))
+    pareja = emparejamiento_maximo(aristas, len(espacios))
+
+    resultado = ResultadoAsignacion(en_orden_de_llegada=en_orden)
+    for solicitud, j in zip(solicitudes, pareja):
+        if j == -1:
+            resultado.sin_lugar.append(solicitud)
+        else:
+            dia, turno, id_sala = espacios[j]
+            fecha = datetime.combine(date.fromisoformat(dia), datetime.min.time())
+            resultado.asignadas.append(Asignacion(solicitud, salas_por_id[id_sala], fecha, turno))
+    return resultado
+
+def asignar_lote(db: BaseDatos, solicitudes: List[Solicitud]) -> ResultadoAsignacion:
+    # El estado se lee, se asigna y se reserva dentro de una sola transacción de
+    # escritura: nadie puede ocupar un espacio entre el cálculo y las inserciones.
+    db.conn.commit()
+    cursor = db.conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        resultado = planear(db, solicitudes)
+        for a in resultado.asignadas:
+            cursor.execute("""
+                INSERT INTO reservaciones (evento, id_cliente, id_sala, fecha, dia, turno, estado)
+                VALUES (?, ?, ?, ?, ?, ?, 'activa')
+            """, (a.solicitud.evento.strip(), a.solicitud.id_cliente, a.sala.id, a.fecha, a.fecha.date().isoformat(), a.turno))
+            a.folio = cursor.lastrowid
+        db.conn.commit()
+    except Exception:
+        db.conn.rollback()
+        raise
+    for a in resultado.asignadas:
+        db.invalidar_disponibilidad(a.fecha.date(), *HORARIOS_TURNO[a.turno])
+    return resultado
+
+def leer_solicitudes(ruta: str) -> List[Solicitud]:
+    # CSV con columnas evento, id_cliente, asistentes, opciones; opciones es una lista
+    # separada por "|" de fecha:turno (mm-dd-aaaa:M) o de fecha sola (cualquier turno)
+    solicitudes = []
+    with open(ruta, newline="", encoding="utf-8") as f:
+        for n, fila in enumerate(csv.DictReader(f), start=2):
+            try:
+                opciones = []
+                for opcion in fila["opciones"].split("|"):
+                    fecha_str, _, turno = opcion.strip().partition(":")
+                    fecha = datetime.strptime(fecha_str, "%m-%d-%Y")
+                    turnos = [turno.strip().upper()] if turno.strip() else list(TURNOS)
+                    opciones.extend((fecha, t) for t in turnos)
+                solicitudes.append(Solicitud(fila["evento"].strip(), fila["id_cliente"].strip().upper(),
+                                             int(fila["asistentes"]), opciones))
+            except KeyError as e:
+                raise ValueError(f"Falta la columna {e} en el archivo de solicitudes.")
+            except ValueError as e:
+                raise ValueError(f"Línea {n} inválida: {e}")
+    return solicitudes
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Asigna salas a un lote de solicitudes flexibles maximizando las colocadas")
+    parser.add_argument("solicitudes", help="CSV con columnas evento, id_cliente, asistentes, opciones")
+    parser.add_argument("--db", default=DB_FILE, help="Archivo de base de datos")
+    parser.add_argument("--simular", action="store_true", help="Calcula la asignación sin reservar")
+    args = parser.parse_args(argv)
+
+    db = BaseDatos(args.db)
+    try:
+        solicitudes = leer_solicitudes(args.solicitudes)
+        resultado = planear(db, solicitudes) if args.simular else asignar_lote(db, solicitudes)
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        return 1
+    except sqlite3.Error as e:
+        print(f"✗ Error de base de datos: {e}")
+        return 1
+    finally:
+        db.cerrar()
+
+    filas = [
+        [str(a.folio or "-"), a.solicitud.evento, a.solicitud.id_cliente, str(a.solicitud.asistentes),
+         fecha_a_str(a.fecha), TURNOS[a.turno], a.sala.id, str(a.sala.cupo)]
+        for a in resultado.asignadas
+    ]
+    print(linea())
+    if filas:
+        print(tabla(["Folio", "Evento", "Cliente", "Asistentes", "Fecha", "Turno", "Sala", "Cupo"], filas))
+        print(linea())
+    print(f"{'Simulación: ' if args.simular else ''}{len(resultado.asignadas)} de {len(solicitudes)} solicitudes colocadas "
+          f"(en orden de llegada se habrían colocado {resultado.en_orden_de_llegada}).")
+    for s in resultado.sin_lugar:
+        print(f"⚠ Sin lugar: {s.evento} ({s.id_cliente}, {s.asistentes} asistentes)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
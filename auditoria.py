@@ -0,0 +1,187 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from PIA_EDD import ESTADOS, TURNOS, BaseDatos, _columnas_intervalo, _poblar_intervalos
+
+@dataclass
+class Hallazgo:
+    problema: str
+    cantidad: int
+    ejemplos: List[str] = field(default_factory=list)
+    reparable: bool = True
+    reparados: int = 0
+
+def _lista_sql(valores) -> str:
+    return ", ".join(f"'{v}'" for v in valores)
+
+def _ejemplos(concatenado, separador: str) -> List[str]:
+    return concatenado.split(separador)[:10] if concatenado else []
+
+def _revisar(db: BaseDatos) -> List[Hallazgo]:
+    # Cada revisión es una sola consulta agregada; las columnas de reservaciones se
+    # revisan juntas en un único recorrido de la tabla.
+    cursor = db.conn.cursor()
+    turnos, estados = _lista_sql(TURNOS), _lista_sql(ESTADOS)
+    hallazgos = []
+
+    cursor.execute(f"""
+        SELECT
+            COALESCE(SUM(turno NOT IN ({turnos})), 0),
+            COALESCE(SUM(estado NOT IN ({estados})), 0),
+            COALESCE(SUM(dia IS NOT DATE(fecha)), 0),
+            GROUP_CONCAT(CASE WHEN turno NOT IN ({turnos}) THEN folio END),
+            GROUP_CONCAT(CASE WHEN estado NOT IN ({estados}) THEN folio END)
+        FROM reservaciones
+    """)
+    turno_invalido, estado_invalido, dia_desfasado, folios_turno, folios_estado = cursor.fetchone()
+    hallazgos.append(Hallazgo("Reservaciones con turno inválido", turno_invalido, _ejemplos(folios_turno, ",")))
+    hallazgos.append(Hallazgo("Reservaciones con estado inválido", estado_invalido, _ejemplos(folios_estado, ",")))
+    hallazgos.append(Hallazgo("Reservaciones con columna dia desfasada", dia_desfasado))
+
+    cursor.execute("""
+        SELECT COUNT(*), GROUP_CONCAT(espacio, '; ')
+        FROM (
+            SELECT dia || ' ' || turno || ' ' || id_sala AS espacio
+            FROM reservaciones WHERE estado = 'activa' AND hora_inicio IS NULL
+            GROUP BY dia, turno, id_sala HAVING COUNT(*) > 1
+        )
+    """)
+    espacios, detalle = cursor.fetchone()
+    hallazgos.append(Hallazgo("Espacios con doble reservación activa", espacios, _ejemplos(detalle, "; ")))
+
+    esperados = f"""
+        SELECT {_columnas_intervalo("r")}
+        FROM reservaciones r JOIN horarios_turno h ON h.clave = r.turno
+        WHERE r.estado = 'activa'
+    """
+    indexados = "SELECT folio, desde, hasta, sala_min, sala_max FROM intervalos"
+    cursor.execute(f"""
+        SELECT (SELECT COUNT(*) FROM ({esperados} EXCEPT {indexados}))
+             + (SELECT COUNT(*) FROM ({indexados} EXCEPT {esperados}))
+    """)
+    hallazgos.append(Hallazgo("Diferencias entre intervalos y reservaciones activas", cursor.fetchone()[0]))
+
+    # Autounión sobre el R*Tree: cada intervalo busca los que se le cruzan en la misma sala
+    cursor.execute("""
+        SELECT COUNT(*), GROUP_CONCAT(a.folio || '/' || b.folio)
+        FROM intervalos a JOIN intervalos b
+          ON b.sala_min <= a.sala_max AND b.sala_max >= a.sala_min
+         AND b.desde < a.hasta AND b.hasta > a.desde AND b.folio > a.folio
+    """)
+    traslapes, pares = cursor.fetchone()
+    hallazgos.append(Hallazgo("Reservaciones con horarios traslapados", traslapes, _ejemplos(pares, ",")))
+
+    # foreign_key_check revisa las llaves aunque PRAGMA foreign_keys esté apagado
+    huerfanas = {}
+    for tabla in ("reservaciones", "lista_espera"):
+        cursor.execute(f"PRAGMA foreign_key_check({tabla})")
+        for _, rowid, padre, _ in cursor.fetchall():
+            huerfanas.setdefault(f"{tabla} → {padre}", []).append(str(rowid))
+    for tabla_fk in ("reservaciones_historico",):
+        cursor.execute(f"""
+            SELECT folio FROM {tabla_fk} h
+            WHERE NOT EXISTS (SELECT 1 FROM clientes c WHERE c.id = h.id_cliente)
+               OR NOT EXISTS (SELECT 1 FROM salas s WHERE s.id = h.id_sala)
+        """)
+        filas = [str(row[0]) for row in cursor.fetchall()]
+        if filas:
+            huerfanas[f"{tabla_fk} → clientes/salas"] = filas
+    for relacion in ["reservaciones → clientes", "reservaciones → salas", "lista_espera → clientes",
+                     "lista_espera → salas", "reservaciones_historico → clientes/salas"]:
+        filas = huerfanas.get(relacion, [])
+        # Un cliente o sala inexistente no se puede inventar: se reporta para revisión manual
+        hallazgos.append(Hallazgo(f"Referencias huérfanas {relacion}", len(filas), filas[:10], reparable=False))
+
+    cursor.execute("""
+        SELECT c.tipo, c.valor, m.maximo
+        FROM contadores c
+        JOIN (
+            SELECT 'C' AS tipo, MAX(CAST(SUBSTR(id, 2) AS INTEGER)) AS maximo FROM clientes
+            UNION ALL
+            SELECT 'S', MAX(CAST(SUBSTR(id, 2) AS INTEGER)) FROM salas
+        ) m ON m.tipo = c.tipo
+        WHERE c.valor < m.maximo
+    """)
+    desfasados = cursor.fetchall()
+    hallazgos.append(Hallazgo(
+        "Contadores por debajo del mayor ID existente", len(desfasados),
+        [f"{tipo}: contador {valor}, máximo {maximo}" for tipo, valor, maximo in desfasados],
+    ))
+    return hallazgos
+
+def _reparar(db: BaseDatos):
+    cursor = db.conn.cursor()
+    turnos, estados = _lista_sql(TURNOS), _lista_sql(ESTADOS)
+
+    # Antes de corregir dia, turno y estado se resuelven los espacios que quedarían
+    # repetidos ('M' y 'm' activas en la misma sala y día): se conserva la reservación más
+    # antigua (menor folio). Si no, el índice único de turnos activos rompería la reparación.
+    cursor.execute(f"""
+        WITH normalizadas AS (
+            SELECT folio, DATE(fecha) AS dia, id_sala, UPPER(TRIM(turno)) AS turno
+            FROM reservaciones
+            WHERE LOWER(TRIM(estado)) = 'activa' AND hora_inicio IS NULL
+              AND UPPER(TRIM(turno)) IN ({turnos})
+        )
+        UPDATE reservaciones SET estado = 'cancelada'
+        WHERE folio IN (SELECT folio FROM normalizadas)
+          AND folio NOT IN (SELECT MIN(folio) FROM normalizadas GROUP BY dia, turno, id_sala)
+    """)
+
+    cursor.execute("UPDATE reservaciones SET dia = DATE(fecha) WHERE dia IS NOT DATE(fecha)")
+
+    cursor.execute(f"""
+        UPDATE reservaciones SET turno = UPPER(TRIM(turno))
+        WHERE turno NOT IN ({turnos}) AND UPPER(TRIM(turno)) IN ({turnos})
+    """)
+    cursor.execute(f"""
+        UPDATE reservaciones SET estado = LOWER(TRIM(estado))
+        WHERE estado NOT IN ({estados}) AND LOWER(TRIM(estado)) IN ({estados})
+    """)
+
+    _poblar_intervalos(cursor)
+
+    # Horarios traslapados: en orden de folio se conserva cada reservación que no choca con
+    # otra ya conservada. En una cadena A-B-C solo se cancela B, porque A y C no se tocan.
+    cursor.execute("""
+        SELECT b.folio, a.folio FROM intervalos a JOIN intervalos b
+          ON b.sala_min <= a.sala_max AND b.sala_max >= a.sala_min
+         AND b.desde < a.hasta AND b.hasta > a.desde AND b.folio > a.folio
+    """)
+    anteriores: Dict[int, List[int]] = {}
+    for folio, anterior in cursor.fetchall():
+        anteriores.setdefault(folio, []).append(anterior)
+    canceladas = set()
+    for folio in sorted(anteriores):
+        if any(anterior not in canceladas for anterior in anteriores[folio]):
+            canceladas.add(folio)
+    cursor.executemany(
+        "UPDATE reservaciones SET estado = 'cancelada' WHERE folio = ?",
+        [(folio,) for folio in sorted(canceladas)],
+    )
+
+    for tipo, tabla in [("C", "clientes"), ("S", "salas")]:
+        cursor.execute(f"""
+            UPDATE contadores SET valor = (SELECT MAX(CAST(SUBSTR(id, 2) AS INTEGER)) FROM {tabla})
+            WHERE tipo = ? AND valor < (SELECT MAX(CAST(SUBSTR(id, 2) AS INTEGER)) FROM {tabla})
+        """, (tipo,))
+
+def auditar(db: BaseDatos, reparar: bool = False) -> List[Hallazgo]:
+    hallazgos = _revisar(db)
+    if not reparar or not any(h.cantidad and h.reparable for h in hallazgos):
+        return hallazgos
+    # Todas las reparaciones van en una sola transacción; después se vuelve a revisar
+    db.conn.commit()
+    cursor = db.conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        _reparar(db)
+        db.conn.commit()
+    except Exception:
+        db.conn.rollback()
+        raise
+    db.cache_disponibilidad.limpiar()
+    despues = {h.problema: h.cantidad for h in _revisar(db)}
+    for h in hallazgos:
+        h.reparados = max(0, h.cantidad - despues.get(h.problema, 0))
+    return hallazgos
@@ -0,0 +1,38 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+# Lo que ejecuta menu() antes de mostrar el menú principal, sin la pausa interactiva
+HASTA_MENU = "import PIA_EDD; PIA_EDD.BaseDatos(sys.argv[1]).cerrar()"
+
+def medir(codigo: str, args: List[str], repeticiones: int) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import sys; " + codigo, *args], check=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mide el tiempo desde el arranque del proceso hasta el menú principal")
+    parser.add_argument("-r", "--repeticiones", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "arranque.db")
+        interprete = medir("pass", [], args.repeticiones)
+        primera = medir(HASTA_MENU, [db_file], 1)
+        al_dia = medir(HASTA_MENU, [db_file], args.repeticiones)
+
+    print(f"{'Intérprete vacío':<35} {interprete * 1000:>8.1f} ms")
+    print(f"{'Primer arranque (crea el esquema)':<35} {primera * 1000:>8.1f} ms")
+    print(f"{'Arranque con esquema al día':<35} {al_dia * 1000:>8.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
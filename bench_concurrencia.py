@@ -0,0 +1,250 @@
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import auditoria
+from PIA_EDD import TURNOS, BaseDatos
+
+OPERACIONES = ("consulta", "reserva", "edicion", "cancelacion")
+MEZCLA = "consulta=50,reserva=30,edicion=10,cancelacion=10"
+
+def leer_mezcla(texto: str) -> Dict[str, int]:
+    mezcla = {}
+    for parte in texto.split(","):
+        nombre, _, peso = parte.partition("=")
+        nombre = nombre.strip()
+        if nombre not in OPERACIONES or not peso.strip().isdigit():
+            raise ValueError(f"Mezcla inválida: '{parte}'. Use p. ej. {MEZCLA}")
+        mezcla[nombre] = int(peso)
+    if not sum(mezcla.values()):
+        raise ValueError("La mezcla debe tener al menos un peso mayor que 0.")
+    return mezcla
+
+def dias_reservables(n: int) -> List[datetime]:
+    # A partir de pasado mañana + 1 para que las cancelaciones sigan siendo válidas
+    dias = []
+    dia = date.today() + timedelta(days=3)
+    while len(dias) < n:
+        if dia.weekday() != 6:
+            dias.append(datetime.combine(dia, datetime.min.time()))
+        dia += timedelta(days=1)
+    return dias
+
+def preparar(db_file: str, n_salas: int, n_clientes: int):
+    # Con una --db que ya se usó antes se reutilizan los clientes y salas de la corrida anterior
+    db = BaseDatos(db_file)
+    try:
+        cursor = db.conn.cursor()
+        cursor.execute("SELECT nombres, id FROM clientes WHERE apellidos = 'Carga'")
+        existentes = dict(cursor.fetchall())
+        clientes = [existentes.get(f"Cliente {i}") or db.registrar_cliente(f"Cliente {i}", "Carga").id
+                    for i in range(n_clientes)]
+        cursor.execute("SELECT nombre, id FROM salas")
+        existentes = dict(cursor.fetchall())
+        salas = [existentes.get(f"Sala {i}") or db.registrar_sala(f"Sala {i}", 5 + i).id
+                 for i in range(n_salas)]
+    finally:
+        db.cerrar()
+    return clientes, salas
+
+def es_bloqueo(error: Exception) -> bool:
+    # FTS5 informa el bloqueo al abrir su tabla virtual como "vtable constructor failed"
+    mensaje = str(error).lower()
+    return "locked" in mensaje or "busy" in mensaje or "vtable constructor failed" in mensaje
+
+def trabajador(db_file: str, semilla: int, duracion: float, inicio: float, mezcla: Dict[str, int],
+               clientes: List[str], salas: List[str], dias: List[datetime], calientes: int,
+               timeout_ms: int, reintentos: int) -> dict:
+    rnd = random.Random(semilla)
+    db = BaseDatos(db_file)
+    db.conn.execute(f"PRAGMA busy_timeout = {timeout_ms}")
+    nombres, pesos = zip(*mezcla.items())
+    turnos = list(TURNOS)
+    propias: List[int] = []
+    resultado = {
+        "latencias": {op: [] for op in OPERACIONES},
+        "rechazadas": {op: 0 for op in OPERACIONES},
+        "errores_bloqueo": 0,
+        "espera_bloqueo": 0.0,
+        "fallidas": 0,
+        "choques": 0,
+        "otros_errores": {},
+    }
+
+    def espacio():
+        # La mayoría de las reservas compiten por unos pocos espacios "calientes"
+        if rnd.random() < 0.8:
+            return rnd.choice(dias[:calientes]), rnd.choice(turnos[:1]), rnd.choice(salas[:2])
+        return rnd.choice(dias), rnd.choice(turnos), rnd.choice(salas)
+
+    def ejecutar(op: str):
+        if op == "consulta":
+            fecha, turno, _ = espacio()
+            db.salas_disponibles(fecha, turno)
+        elif op == "reserva":
+            fecha, turno, sala = espacio()
+            propias.append(db.registrar_reserva("Evento de carga", rnd.choice(clientes), sala, fecha, turno).folio)
+        elif op == "edicion":
+            if not propias:
+                raise ValueError("Sin reservaciones propias")
+            db.editar_nombre_evento(rnd.choice(propias), f"Evento {rnd.randrange(10_000)}")
+        else:
+            if not propias:
+                raise ValueError("Sin reservaciones propias")
+            db.cancelar_reservacion(propias.pop(rnd.randrange(len(propias))))
+
+    while time.time() < inicio:
+        time.sleep(0.001)
+    fin = inicio + duracion
+    try:
+        while time.time() < fin:
+            op = rnd.choices(nombres, pesos)[0]
+            t0 = time.perf_counter()
+            for intento in range(reintentos + 1):
+                t_intento = time.perf_counter()
+                try:
+                    ejecutar(op)
+                    resultado["latencias"][op].append(time.perf_counter() - t0)
+                    break
+                except ValueError:
+                    resultado["rechazadas"][op] += 1
+                    break
+                except sqlite3.IntegrityError:
+                    # Dos reservas pasaron la validación a la vez; la llave de ocupación lo impidió
+                    db.conn.rollback()
+                    resultado["choques"] += 1
+                    break
+                except sqlite3.OperationalError as e:
+                    db.conn.rollback()
+                    if not es_bloqueo(e):
+                        resultado["otros_errores"][str(e)] = resultado["otros_errores"].get(str(e), 0) + 1
+                        break
+                    resultado["errores_bloqueo"] += 1
+                    if intento == reintentos:
+                        resultado["fallidas"] += 1
+                        resultado["espera_bloqueo"] += time.perf_counter() - t_intento
+                        break
+                    pausa = rnd.uniform(0, 0.002 * 2 ** intento)
+                    time.sleep(pausa)
+                    resultado["espera_bloqueo"] += time.perf_counter() - t_intento
+    finally:
+        db.cerrar()
+    return resultado
+
+def _trabajador_en_cola(cola, args):
+    cola.put(trabajador(*args))
+
+def verificar_integridad(db_file: str) -> Dict[str, int]:
+    db = BaseDatos(db_file)
+    try:
+        return {h.problema: h.cantidad for h in auditoria.auditar(db)}
+    finally:
+        db.cerrar()
+
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+def imprimir_resumen(resultados: List[dict], duracion: float, integridad: Dict[str, int]):
+    print(f"\n{'Operación':<14} {'Hechas':>8} {'Rechaz.':>8} {'op/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    total = 0
+    for op in OPERACIONES:
+        latencias = [l for r in resultados for l in r["latencias"][op]]
+        rechazadas = sum(r["rechazadas"][op] for r in resultados)
+        total += len(latencias)
+        print(f"{op:<14} {len(latencias):>8} {rechazadas:>8} {len(latencias) / duracion:>9.1f} "
+              f"{percentil(latencias, 50) * 1000:>9.2f} {percentil(latencias, 95) * 1000:>9.2f} "
+              f"{percentil(latencias, 99) * 1000:>9.2f}")
+    print(f"\nRendimiento total: {total / duracion:,.1f} op/s")
+    print(f"Errores 'database is locked': {sum(r['errores_bloqueo'] for r in resultados)}")
+    print(f"Operaciones fallidas tras reintentos: {sum(r['fallidas'] for r in resultados)}")
+    print(f"Tiempo total esperando bloqueos: {sum(r['espera_bloqueo'] for r in resultados):.3f} s")
+    print(f"Reservas simultáneas frenadas por el índice único de turnos: {sum(r['choques'] for r in resultados)}")
+    otros: Dict[str, int] = {}
+    for r in resultados:
+        for mensaje, veces in r["otros_errores"].items():
+            otros[mensaje] = otros.get(mensaje, 0) + veces
+    for mensaje, veces in sorted(otros.items(), key=lambda o: -o[1]):
+        print(f"✗ Error inesperado ({veces} veces): {mensaje}")
+    print("\nIntegridad al terminar:")
+    ancho = max(map(len, integridad), default=0)
+    for nombre, valor in integridad.items():
+        print(f"  {nombre:<{ancho}} {valor:>6}{'' if valor == 0 else '  ✗'}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga con varias terminales reservando a la vez")
+    parser.add_argument("-n", "--terminales", type=int, default=8, help="Procesos (o hilos) simultáneos")
+    parser.add_argument("-d", "--duracion", type=float, default=10.0, help="Segundos de carga")
+    parser.add_argument("--hilos", action="store_true", help="Usa hilos en lugar de procesos")
+    parser.add_argument("--mezcla", default=MEZCLA, help=f"Pesos de cada operación (por omisión, {MEZCLA})")
+    parser.add_argument("--salas", type=int, default=10)
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--dias", type=int, default=30, help="Días reservables")
+    parser.add_argument("--calientes", type=int, default=2, help="Días por los que compite la mayoría de las reservas")
+    parser.add_argument("--timeout", type=int, default=0, help="busy_timeout de cada conexión en ms")
+    parser.add_argument("--reintentos", type=int, default=5, help="Reintentos ante 'database is locked'")
+    parser.add_argument("--wal", action="store_true", help="Usa journal_mode=WAL")
+    parser.add_argument("--db", help="Base de datos a usar (por omisión, una temporal)")
+    args = parser.parse_args(argv)
+
+    try:
+        mezcla = leer_mezcla(args.mezcla)
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = args.db or os.path.join(tmp, "carga.db")
+        clientes, salas = preparar(db_file, args.salas, args.clientes)
+        if args.wal:
+            db = BaseDatos(db_file)
+            db.conn.execute("PRAGMA journal_mode = WAL")
+            db.cerrar()
+        dias = dias_reservables(args.dias)
+        inicio = time.time() + 0.5
+        tareas = [
+            (db_file, semilla, args.duracion, inicio, mezcla, clientes, salas, dias,
+             max(1, min(args.calientes, len(dias))), args.timeout, args.reintentos)
+            for semilla in range(args.terminales)
+        ]
+
+        print(f"{args.terminales} {'hilos' if args.hilos else 'procesos'} durante {args.duracion:g} s "
+              f"(busy_timeout={args.timeout} ms, {'WAL' if args.wal else 'rollback journal'})")
+        if args.hilos:
+            resultados: List[dict] = []
+            candado = threading.Lock()
+
+            def correr(t):
+                r = trabajador(*t)
+                with candado:
+                    resultados.append(r)
+
+            hilos = [threading.Thread(target=correr, args=(t,)) for t in tareas]
+            for h in hilos:
+                h.start()
+            for h in hilos:
+                h.join()
+        else:
+            cola = multiprocessing.Queue()
+            procesos = [multiprocessing.Process(target=_trabajador_en_cola, args=(cola, t)) for t in tareas]
+            for p in procesos:
+                p.start()
+            resultados = [cola.get() for _ in procesos]
+            for p in procesos:
+                p.join()
+
+        imprimir_resumen(resultados, args.duracion, verificar_integridad(db_file))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from PIA_EDD import TURNOS, BaseDatos
+
+def poblar(db: BaseDatos, n: int, n_salas: int = 20) -> datetime:
+    cursor = db.conn.cursor()
+    cliente = db.registrar_cliente("Cliente", "Benchmark")
+    salas = [db.registrar_sala(f"Sala {i}", 10 + i).id for i in range(n_salas)]
+    inicio = datetime(2030, 1, 1)
+    random.seed(0)
+    filas = []
+    folio = 0
+    dia = 0
+    while len(filas) < n:
+        for turno in TURNOS:
+            for sala in salas:
+                folio += 1
+                filas.append((f"Evento {folio}", cliente.id, sala, inicio + timedelta(days=dia), turno))
+        dia += 1
+    cursor.executemany("""
+        INSERT INTO reservaciones (evento, id_cliente, id_sala, fecha, turno, estado)
+        VALUES (?, ?, ?, ?, ?, 'activa')
+    """, filas[:n])
+    db.conn.commit()
+    return inicio + timedelta(days=dia)
+
+def medir(nombre: str, fn, repeticiones: int) -> None:
+    mejor = float("inf")
+    filas = 0
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = fn()
+        filas = len(resultado)
+        mejor = min(mejor, time.perf_counter() - t0)
+    print(f"{nombre:<40} {filas:>9} filas  {mejor * 1000:>9.1f} ms  {filas / mejor:>12,.0f} filas/s")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compara la lectura de reservaciones con dataclasses contra la ruta ligera")
+    parser.add_argument("-n", type=int, default=200_000, help="Número de reservaciones a generar")
+    parser.add_argument("-r", "--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = BaseDatos(os.path.join(tmp, "bench.db"))
+        try:
+            fin = poblar(db, args.n)
+            desde = datetime(2030, 1, 1)
+            print(f"Decodificación de {args.n:,} reservaciones:\n")
+            medir("reservas_en_rango (Reservacion)", lambda: db.reservas_en_rango(desde, fin), args.repeticiones)
+            medir("filas_en_rango folio, dia (tuplas)", lambda: db.filas_en_rango(desde, fin), args.repeticiones)
+            medir("filas_en_rango folio, dia (sqlite3.Row)",
+                  lambda: db.filas_en_rango(desde, fin, nombradas=True), args.repeticiones)
+            medir("filas_en_rango completas (tuplas)",
+                  lambda: db.filas_en_rango(desde, fin, columnas=("folio", "evento", "id_cliente", "id_sala", "dia", "turno")),
+                  args.repeticiones)
+            medir("filas_en_rango + date.fromisoformat",
+                  lambda: [(f, date.fromisoformat(d)) for f, d in db.filas_en_rango(desde, fin)], args.repeticiones)
+        finally:
+            db.cerrar()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Resultados de salas_disponibles por (dia, turno), en memoria y con desalojo LRU.
+# Las escrituras de la propia conexión invalidan solo las claves que tocan; las de
+# otra conexión o proceso se detectan con PRAGMA data_version y vacían todo el caché.
+class CacheDisponibilidad:
+    def __init__(self, capacidad: int = 256):
+        self.capacidad = capacidad
+        self._memoria: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._data_version: Optional[int] = None
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self.invalidaciones_globales = 0
+
+    def sincronizar(self, data_version: int):
+        # data_version solo cambia cuando otra conexión confirma cambios en la base
+        if self._data_version is not None and data_version != self._data_version and self._memoria:
+            self._memoria.clear()
+            self.invalidaciones_globales += 1
+        self._data_version = data_version
+
+    def obtener(self, clave: Hashable, generar: Callable[[], List[T]]) -> List[T]:
+        guardado = self._memoria.get(clave)
+        if guardado is not None:
+            self._memoria.move_to_end(clave)
+            self.aciertos += 1
+            return list(guardado)
+        self.fallos += 1
+        resultado = generar()
+        self._memoria[clave] = tuple(resultado)
+        while len(self._memoria) > self.capacidad:
+            self._memoria.popitem(last=False)
+        return list(resultado)
+
+    def invalidar(self, clave: Hashable):
+        if self._memoria.pop(clave, None) is not None:
+            self.invalidaciones += 1
+
+    def limpiar(self):
+        self._memoria.clear()
+
+    def estadisticas(self) -> Dict[str, float]:
+        solicitudes = self.aciertos + self.fallos
+        return {
+            "solicitudes": solicitudes,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "invalidaciones": self.invalidaciones,
+            "invalidaciones_globales": self.invalidaciones_globales,
+            "entradas": len(self._memoria),
+            "tasa_aciertos": self.aciertos / solicitudes if solicitudes else 0.0,
+        }
@@ -0,0 +1,108 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+# Reportes ya generados por (tipo, rango, formato). Una entrada solo se reutiliza si su
+# versión coincide con BaseDatos.version_datos del rango, así que cualquier escritura
+# sobre esos días la invalida. Vive en memoria (LRU) y, con directorio, también en disco;
+# en disco la llave incluye la identidad de la base y se guardan a lo más capacidad_disco
+# archivos (se eliminan primero los menos recientes).
+class CacheReportes:
+    def __init__(self, directorio: Optional[str] = None, capacidad: int = 128, identidad: str = "",
+                 capacidad_disco: int = 512):
+        self.directorio = directorio
+        self.capacidad = capacidad
+        self.identidad = identidad
+        self.capacidad_disco = capacidad_disco
+        self._memoria: "OrderedDict[tuple, Tuple[int, bytes]]" = OrderedDict()
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+    def _ruta(self, clave: tuple, version: int) -> Tuple[str, str]:
+        prefijo = hashlib.sha1(repr((self.identidad, clave)).encode("utf-8")).hexdigest()
+        return prefijo, os.path.join(self.directorio, f"{prefijo}_{version}")
+
+    def _leer_disco(self, clave: tuple, version: int) -> Optional[bytes]:
+        if not self.directorio:
+            return None
+        _, ruta = self._ruta(clave, version)
+        try:
+            with open(ruta, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _escribir_disco(self, clave: tuple, version: int, contenido: bytes):
+        if not self.directorio:
+            return
+        os.makedirs(self.directorio, exist_ok=True)
+        prefijo, ruta = self._ruta(clave, version)
+        # Las versiones anteriores del mismo reporte ya no se pueden usar
+        for nombre in os.listdir(self.directorio):
+            if nombre.startswith(prefijo + "_"):
+                os.remove(os.path.join(self.directorio, nombre))
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(contenido)
+        os.replace(temporal, ruta)
+        self._podar_disco()
+
+    def _podar_disco(self):
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                entradas.append((os.path.getmtime(ruta), ruta))
+            except OSError:
+                pass
+        entradas.sort()
+        for _, ruta in entradas[:max(0, len(entradas) - self.capacidad_disco)]:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+    def _recordar(self, clave: tuple, version: int, contenido: bytes):
+        self._memoria[clave] = (version, contenido)
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.capacidad:
+            self._memoria.popitem(last=False)
+
+    def obtener(self, clave: tuple, version: int, generar: Callable[[], bytes]) -> bytes:
+        guardado = self._memoria.get(clave)
+        if guardado is not None and guardado[0] == version:
+            self._memoria.move_to_end(clave)
+            self.aciertos_memoria += 1
+            return guardado[1]
+
+        contenido = self._leer_disco(clave, version)
+        if contenido is not None:
+            self.aciertos_disco += 1
+            self._recordar(clave, version, contenido)
+            return contenido
+
+        self.fallos += 1
+        contenido = generar()
+        self._recordar(clave, version, contenido)
+        self._escribir_disco(clave, version, contenido)
+        return contenido
+
+    def limpiar(self):
+        self._memoria.clear()
+        if self.directorio and os.path.isdir(self.directorio):
+            for nombre in os.listdir(self.directorio):
+                os.remove(os.path.join(self.directorio, nombre))
+
+    def estadisticas(self) -> Dict[str, float]:
+        solicitudes = self.aciertos_memoria + self.aciertos_disco + self.fallos
+        aciertos = self.aciertos_memoria + self.aciertos_disco
+        return {
+            "solicitudes": solicitudes,
+            "aciertos_memoria": self.aciertos_memoria,
+            "aciertos_disco": self.aciertos_disco,
+            "fallos": self.fallos,
+            "entradas_memoria": len(self._memoria),
+            "tasa_aciertos": aciertos / solicitudes if solicitudes else 0.0,
+        }
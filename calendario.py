@@ -0,0 +1,130 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Union
+
+ANTICIPACION_DIAS = 2
+HORIZONTE_DIAS = 800
+
+Fecha = Union[date, datetime]
+
+def _dia(fecha: Fecha) -> date:
+    return fecha.date() if isinstance(fecha, datetime) else fecha
+
+# Días hábiles del coworking: cierra los domingos y los días de la tabla dias_cerrados.
+# Para el horizonte [inicio, inicio + dias) se precalcula, por cada día, el índice del
+# siguiente día abierto, así "siguiente día reservable" es una sola consulta a una lista.
+class Calendario:
+    def __init__(self, cerrados: Dict[date, str], inicio: Optional[date] = None, dias: int = HORIZONTE_DIAS,
+                 anticipacion: int = ANTICIPACION_DIAS):
+        self.cerrados = cerrados
+        self.inicio = inicio or date.today()
+        self.dias = dias
+        self.anticipacion = anticipacion
+        self.abierto = bytearray(
+            0 if self._cerrado_por(self.inicio + timedelta(days=i)) else 1 for i in range(dias)
+        )
+        # siguiente[i] = índice del primer día abierto >= i (dias si no hay ninguno en el horizonte)
+        self.siguiente = [dias] * (dias + 1)
+        for i in range(dias - 1, -1, -1):
+            self.siguiente[i] = i if self.abierto[i] else self.siguiente[i + 1]
+        self._siguiente_np = None
+
+    def _cerrado_por(self, dia: date) -> Optional[str]:
+        if dia in self.cerrados:
+            return self.cerrados[dia]
+        if dia.weekday() == 6:
+            return "Domingo"
+        return None
+
+    def _indice(self, dia: date) -> Optional[int]:
+        i = (dia - self.inicio).days
+        return i if 0 <= i < self.dias else None
+
+    def motivo_cierre(self, fecha: Fecha) -> Optional[str]:
+        return self._cerrado_por(_dia(fecha))
+
+    def esta_abierto(self, fecha: Fecha) -> bool:
+        dia = _dia(fecha)
+        i = self._indice(dia)
+        if i is None:
+            return self._cerrado_por(dia) is None
+        return bool(self.abierto[i])
+
+    def siguiente_abierto(self, fecha: Fecha) -> date:
+        dia = _dia(fecha)
+        i = self._indice(dia)
+        if i is not None and self.siguiente[i] < self.dias:
+            return self.inicio + timedelta(days=self.siguiente[i])
+        # Fuera del horizonte se recorre día por día
+        while self._cerrado_por(dia) is not None:
+            dia += timedelta(days=1)
+        return dia
+
+    def fecha_minima(self, hoy: Optional[date] = None) -> date:
+        return (hoy or date.today()) + timedelta(days=self.anticipacion)
+
+    def primer_dia_reservable(self, hoy: Optional[date] = None) -> date:
+        return self.siguiente_abierto(self.fecha_minima(hoy))
+
+    def validar_anticipacion(self, fecha: Fecha, hoy: Optional[date] = None):
+        if _dia(fecha) < self.fecha_minima(hoy):
+            raise ValueError(f"La reservación debe ser al menos {self.anticipacion} días después de hoy.")
+
+    def validar(self, fecha: Fecha, hoy: Optional[date] = None):
+        self.validar_anticipacion(fecha, hoy)
+        motivo = self.motivo_cierre(fecha)
+        if motivo is not None:
+            raise ValueError(f"El coworking está cerrado ese día ({motivo}).")
+
+    def puede_cancelar(self, fecha: Fecha, hoy: Optional[date] = None) -> bool:
+        return _dia(fecha) >= self.fecha_minima(hoy)
+
+    def _siguientes_np(self, dias):
+        # Índice de cada día en el horizonte y, para los que caen dentro, el índice del
+        # siguiente día abierto (self.dias si no hay); una sola indexación de arreglo
+        import numpy as np
+
+        if self._siguiente_np is None:
+            self._siguiente_np = np.asarray(self.siguiente, dtype=np.int64)
+        indices = (dias - np.datetime64(self.inicio, "D")).astype(np.int64)
+        dentro = (indices >= 0) & (indices < self.dias)
+        siguientes = np.full(len(dias), self.dias, dtype=np.int64)
+        siguientes[dentro] = self._siguiente_np[indices[dentro]]
+        return indices, dentro, siguientes
+
+    def validar_lote(self, fechas, hoy: Optional[date] = None) -> List[Optional[str]]:
+        # Un mensaje de error por fecha, o None si la fecha se puede reservar. Recibe una
+        # secuencia de fechas o un arreglo datetime64[D]; un día del horizonte está
+        # abierto si su siguiente día abierto es él mismo.
+        import numpy as np
+
+        if not hasattr(fechas, "dtype"):
+            fechas = [_dia(f) for f in fechas]
+        dias = np.asarray(fechas, dtype="datetime64[D]")
+        indices, dentro, siguientes = self._siguientes_np(dias)
+        temprano = dias < np.datetime64(self.fecha_minima(hoy), "D")
+        errores: List[Optional[str]] = [None] * len(dias)
+        for k in np.flatnonzero(temprano):
+            errores[k] = f"La reservación debe ser al menos {self.anticipacion} días después de hoy."
+        # Los cerrados del horizonte, y lo que cae fuera de él, se revisan uno por uno
+        for k in np.flatnonzero(~temprano & ~(dentro & (siguientes == indices))):
+            motivo = self._cerrado_por(dias[k].astype(date))
+            if motivo is not None:
+                errores[k] = f"El coworking está cerrado ese día ({motivo})."
+        return errores
+
+    def ajustar_lote(self, fechas, hoy: Optional[date] = None):
+        # Mueve cada fecha al primer día reservable igual o posterior. Con un arreglo
+        # datetime64[D] de NumPy el cálculo es vectorizado y devuelve otro arreglo.
+        minima = self.fecha_minima(hoy)
+        if hasattr(fechas, "dtype"):
+            import numpy as np
+
+            dias = np.maximum(np.asarray(fechas, dtype="datetime64[D]"), np.datetime64(minima, "D"))
+            _, dentro, siguientes = self._siguientes_np(dias)
+            resultado = dias.copy()
+            resultado[dentro] = np.datetime64(self.inicio, "D") + siguientes[dentro].astype("timedelta64[D]")
+            # Lo que cae fuera del horizonte (o sin días abiertos dentro) se resuelve uno por uno
+            for k in np.flatnonzero(siguientes >= self.dias):
+                resultado[k] = np.datetime64(self.siguiente_abierto(dias[k].astype(date)), "D")
+            return resultado
+        return [self.siguiente_abierto(max(_dia(f), minima)) for f in fechas]
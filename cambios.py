@@ -0,0 +1,60 @@
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+from PIA_EDD import DB_FILE, BaseDatos
+
+def leer_posicion(ruta: str) -> int:
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+def guardar_posicion(ruta: str, seq: int):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(f"{seq}\n")
+    os.replace(temporal, ruta)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Emite como NDJSON los cambios registrados a partir de una secuencia")
+    parser.add_argument("--db", default=DB_FILE, help="Archivo de base de datos")
+    parser.add_argument("--desde", type=int, help="Última secuencia ya procesada (por omisión, 0)")
+    parser.add_argument("--posicion", help="Archivo donde se lee y se guarda la última secuencia enviada")
+    parser.add_argument("--limite", type=int, help="Número máximo de cambios a emitir")
+    parser.add_argument("--salida", help="Archivo NDJSON de salida (por omisión, la salida estándar)")
+    parser.add_argument("--seguir", type=float, metavar="SEGUNDOS",
+                        help="Sigue esperando cambios nuevos, consultando cada SEGUNDOS")
+    args = parser.parse_args(argv)
+
+    if args.desde is not None:
+        seq = args.desde
+    elif args.posicion:
+        seq = leer_posicion(args.posicion)
+    else:
+        seq = 0
+
+    db = BaseDatos(args.db)
+    salida = open(args.salida, "a", encoding="utf-8") if args.salida else sys.stdout
+    try:
+        while True:
+            seq = db.exportar_cambios(salida, seq, args.limite)
+            salida.flush()
+            if args.posicion:
+                guardar_posicion(args.posicion, seq)
+            if not args.seguir:
+                break
+            time.sleep(args.seguir)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.salida:
+            salida.close()
+        db.cerrar()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import inspect
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Union
+
+from PIA_EDD import DB_FILE, BaseDatos
+
+METODOS_LECTURA = {
+    "buscar_clientes", "buscar_reservas", "buscar_sala_para", "calendario", "cambios_desde", "corte_historico",
+    "dias_cerrados", "estadisticas_cliente", "exportar_cambios", "filas_en_rango", "filas_reporte",
+    "historial_cliente", "huecos_libres", "identidad", "lista_espera_pendiente", "listar_clientes_ordenados",
+    "obtener_cliente", "obtener_sala", "promocion_por_cancelacion", "reservas_en_rango", "reservas_por_fecha",
+    "salas_disponibles", "salas_libres_en", "ultima_secuencia", "version_datos", "version_esquema",
+}
+
+METODOS_ESCRITURA = {
+    "abrir_dias", "agregar_lista_espera", "archivar", "cancelar_lote", "cancelar_reservacion", "cerrar_dias",
+    "editar_nombre_evento", "reconstruir_indice_busqueda", "reconstruir_ocupacion", "registrar_cliente",
+    "registrar_reserva", "registrar_reserva_intervalo", "registrar_sala", "retirar_lista_espera",
+}
+
+# Métodos públicos que solo tienen sentido sobre una conexión propia; cualquier otro
+# método público de BaseDatos debe estar en una de las dos listas (ver tests)
+METODOS_LOCALES = {"cerrar", "invalidar_disponibilidad"}
+
+Operacion = Union[str, Callable[[BaseDatos], object]]
+
+# BaseDatos para varios hilos: las lecturas corren en un grupo acotado de hilos, cada
+# uno con su propia conexión de solo lectura; las escrituras se encolan hacia un único
+# hilo escritor con la única conexión de escritura. Todo devuelve un Future.
+class BaseDatosConcurrente:
+    def __init__(self, db_file: str = DB_FILE, lectores: Optional[int] = None):
+        self.db_file = db_file
+        self._local = threading.local()
+        self._conexiones: List[BaseDatos] = []
+        self._candado = threading.Lock()
+        self._escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="escritor",
+                                            initializer=self._abrir, initargs=(False,))
+        self._lectores = ThreadPoolExecutor(max_workers=lectores or min(8, os.cpu_count() or 1),
+                                            thread_name_prefix="lector",
+                                            initializer=self._abrir, initargs=(True,))
+        # El escritor migra el esquema antes de que se abra cualquier lector
+        self._escritor.submit(self._activar_wal).result()
+
+    def _abrir(self, solo_lectura: bool):
+        db = BaseDatos(self.db_file, solo_lectura=solo_lectura, compartida=True)
+        self._local.db = db
+        with self._candado:
+            self._conexiones.append(db)
+
+    def _activar_wal(self):
+        # En modo WAL los lectores no se bloquean mientras el escritor confirma
+        self._local.db.conn.execute("PRAGMA journal_mode = WAL")
+
+    def _ejecutar(self, operacion: Operacion, args: tuple, kwargs: dict):
+        db = self._local.db
+        if callable(operacion):
+            resultado = operacion(db, *args, **kwargs)
+        else:
+            resultado = getattr(db, operacion)(*args, **kwargs)
+        # Un generador leería con la conexión del hilo desde otro hilo: se consume aquí
+        if inspect.isgenerator(resultado):
+            return list(resultado)
+        return resultado
+
+    def leer(self, operacion: Operacion, *args, **kwargs) -> Future:
+        if isinstance(operacion, str) and operacion not in METODOS_LECTURA:
+            raise ValueError(f"'{operacion}' no es una operación de lectura.")
+        return self._lectores.submit(self._ejecutar, operacion, args, kwargs)
+
+    def escribir(self, operacion: Operacion, *args, **kwargs) -> Future:
+        if isinstance(operacion, str) and operacion not in METODOS_ESCRITURA:
+            raise ValueError(f"'{operacion}' no es una operación de escritura.")
+        return self._escritor.submit(self._ejecutar, operacion, args, kwargs)
+
+    def __getattr__(self, nombre: str):
+        # db.salas_disponibles(...) o db.registrar_reserva(...) devuelven un Future
+        if nombre in METODOS_LECTURA:
+            return lambda *args, **kwargs: self.leer(nombre, *args, **kwargs)
+        if nombre in METODOS_ESCRITURA:
+            return lambda *args, **kwargs: self.escribir(nombre, *args, **kwargs)
+        raise AttributeError(nombre)
+
+    def cerrar(self):
+        self._escritor.shutdown(wait=True)
+        self._lectores.shutdown(wait=True)
+        with self._candado:
+            for db in self._conexiones:
+                db.cerrar()
+            self._conexiones.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,224 @@
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from PIA_EDD import DB_FILE, ESTADOS, TURNOS, BaseDatos
+
+# Exportación por columnas de las reservaciones de un rango de fechas, para cuadernos
+# de análisis. Las filas se leen del cursor en lotes y cada lote se convierte en un
+# RecordBatch de Arrow que se escribe de inmediato (Parquet o Arrow IPC), así la
+# memoria no depende del tamaño del rango. Sin pyarrow queda el respaldo .npz de NumPy.
+
+FORMATOS_COLUMNARES = {"parquet": ".parquet", "arrow": ".arrow", "npz": ".npz"}
+TAMANO_LOTE = 65_536
+
+# turno y estado son categóricas con diccionario fijo: todos los lotes comparten los
+# mismos códigos (el formato de archivo de Arrow no admite reemplazar diccionarios)
+CATEGORIAS = {
+    "turno": list(TURNOS),
+    "estado": list(ESTADOS),
+}
+
+# dia y fecha salen de SQLite ya como días y segundos desde 1970-01-01
+COLUMNAS = [
+    ("folio", "folio"),
+    ("evento", "evento"),
+    ("id_cliente", "id_cliente"),
+    ("id_sala", "id_sala"),
+    ("dia", "CAST(julianday(dia) - 2440587.5 AS INTEGER)"),
+    ("fecha", "CAST(strftime('%s', fecha) AS INTEGER)"),
+    ("turno", "turno"),
+    ("estado", "estado"),
+    ("hora_inicio", "hora_inicio"),
+    ("hora_fin", "hora_fin"),
+]
+
+def lotes_reservaciones(db: BaseDatos, desde_dt: datetime, hasta_dt: datetime, tamano_lote: int = TAMANO_LOTE,
+                        incluir_historico: bool = True) -> Iterator[Dict[str, tuple]]:
+    # Cada lote es un diccionario columna -> tupla de valores, en orden de día y folio.
+    # Los argumentos se revisan aquí, antes de que alguien abra el archivo de salida.
+    if hasta_dt.date() < desde_dt.date():
+        raise ValueError("La fecha final no puede ser anterior a la inicial.")
+    if tamano_lote <= 0:
+        raise ValueError("El tamaño de lote debe ser mayor que 0.")
+    desde_buscar = desde_dt.date()
+    lista = ", ".join(f"{expresion} AS {nombre}" for nombre, expresion in COLUMNAS)
+    # Se exportan todos los estados: las canceladas archivadas pueden ser de cualquier fecha
+    consultas = [
+        f"SELECT {lista}, dia AS orden_dia FROM {t} WHERE dia BETWEEN :desde AND :hasta"
+        for t in db._tablas_reservaciones(desde_buscar, incluir_historico, solo_activas=False)
+    ]
+    nombres = [nombre for nombre, _ in COLUMNAS]
+    cursor = db.conn.cursor()
+    cursor.execute(
+        f"SELECT {', '.join(nombres)} FROM ({' UNION ALL '.join(consultas)}) ORDER BY orden_dia, folio",
+        {"desde": desde_buscar, "hasta": hasta_dt.date().isoformat()},
+    )
+    return _lotes(cursor, nombres, tamano_lote)
+
+def _lotes(cursor, nombres: List[str], tamano_lote: int) -> Iterator[Dict[str, tuple]]:
+    while True:
+        filas = cursor.fetchmany(tamano_lote)
+        if not filas:
+            break
+        yield dict(zip(nombres, zip(*filas)))
+
+def _codigos(valores: tuple, categorias: List[str]) -> np.ndarray:
+    # Un valor fuera del catálogo queda como -1 (nulo); auditoria.py los reporta
+    indice = {c: i for i, c in enumerate(categorias)}
+    return np.fromiter((indice.get(v, -1) for v in valores), dtype=np.int8, count=len(valores))
+
+def _esquema_arrow(pa):
+    return pa.schema([
+        ("folio", pa.int64()),
+        ("evento", pa.string()),
+        ("id_cliente", pa.string()),
+        ("id_sala", pa.string()),
+        ("dia", pa.date32()),
+        ("fecha", pa.timestamp("s")),
+        ("turno", pa.dictionary(pa.int8(), pa.string())),
+        ("estado", pa.dictionary(pa.int8(), pa.string())),
+        ("hora_inicio", pa.int16()),
+        ("hora_fin", pa.int16()),
+    ])
+
+def _lote_arrow(pa, esquema, lote: Dict[str, tuple]):
+    columnas = []
+    for campo in esquema:
+        valores = lote[campo.name]
+        if campo.name in CATEGORIAS:
+            codigos = _codigos(valores, CATEGORIAS[campo.name])
+            columnas.append(pa.DictionaryArray.from_arrays(
+                pa.array(codigos, mask=codigos < 0), pa.array(CATEGORIAS[campo.name], pa.string())
+            ))
+        else:
+            columnas.append(pa.array(valores, type=campo.type))
+    return pa.RecordBatch.from_arrays(columnas, schema=esquema)
+
+def _exportar_arrow(lotes: Iterator[Dict[str, tuple]], ruta: str, formato: str) -> int:
+    import pyarrow as pa
+
+    esquema = _esquema_arrow(pa)
+    filas = 0
+    if formato == "parquet":
+        import pyarrow.parquet as pq
+
+        escritor = pq.ParquetWriter(ruta, esquema)
+    else:
+        escritor = pa.ipc.new_file(ruta, esquema)
+    try:
+        for lote in lotes:
+            registro = _lote_arrow(pa, esquema, lote)
+            escritor.write_batch(registro)
+            filas += registro.num_rows
+    finally:
+        escritor.close()
+    return filas
+
+def _exportar_npz(lotes: Iterator[Dict[str, tuple]], ruta: str) -> int:
+    # Respaldo sin pyarrow: un arreglo por columna con tipo nativo de NumPy. turno y
+    # estado van como códigos int8 más su catálogo (turno_categorias, estado_categorias);
+    # las horas vacías de las reservaciones por turno quedan en -1.
+    partes: Dict[str, List[np.ndarray]] = {nombre: [] for nombre, _ in COLUMNAS}
+    for lote in lotes:
+        partes["folio"].append(np.asarray(lote["folio"], dtype=np.int64))
+        for nombre in ("evento", "id_cliente", "id_sala"):
+            partes[nombre].append(np.asarray(lote[nombre], dtype=str))
+        partes["dia"].append(np.asarray(lote["dia"], dtype=np.int64).astype("datetime64[D]"))
+        partes["fecha"].append(np.asarray(lote["fecha"], dtype=np.int64).astype("datetime64[s]"))
+        for nombre, categorias in CATEGORIAS.items():
+            partes[nombre].append(_codigos(lote[nombre], categorias))
+        for nombre in ("hora_inicio", "hora_fin"):
+            partes[nombre].append(np.fromiter((-1 if v is None else v for v in lote[nombre]),
+                                              dtype=np.int16, count=len(lote[nombre])))
+    vacios = {
+        "folio": np.int64, "evento": str, "id_cliente": str, "id_sala": str, "dia": "datetime64[D]",
+        "fecha": "datetime64[s]", "turno": np.int8, "estado": np.int8, "hora_inicio": np.int16, "hora_fin": np.int16,
+    }
+    arreglos = {
+        nombre: np.concatenate(lista) if lista else np.empty(0, dtype=vacios[nombre])
+        for nombre, lista in partes.items()
+    }
+    for nombre, categorias in CATEGORIAS.items():
+        arreglos[f"{nombre}_categorias"] = np.asarray(categorias, dtype=str)
+    # np.savez agrega .npz si falta; se escribe sobre el archivo abierto para respetar la ruta
+    with open(ruta, "wb") as f:
+        np.savez_compressed(f, **arreglos)
+    return len(arreglos["folio"])
+
+def formato_por_omision() -> str:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "npz"
+    return "parquet"
+
+def formato_de_ruta(ruta: str) -> Optional[str]:
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in (".feather", ".ipc"):
+        return "arrow"
+    for formato, ext in FORMATOS_COLUMNARES.items():
+        if extension == ext:
+            return formato
+    return None
+
+def exportar_columnar(db: BaseDatos, desde_dt: datetime, hasta_dt: datetime, ruta: str,
+                      formato: Optional[str] = None, tamano_lote: int = TAMANO_LOTE,
+                      incluir_historico: bool = True) -> Tuple[str, int]:
+    # Devuelve la ruta escrita y el número de filas. Sin formato se toma de la
+    # extensión y, si no la hay, Parquet con pyarrow o .npz sin él.
+    formato = formato or formato_de_ruta(ruta) or formato_por_omision()
+    if formato not in FORMATOS_COLUMNARES:
+        raise ValueError(f"Formato inválido: {formato}. Use {', '.join(FORMATOS_COLUMNARES)}.")
+    if not os.path.splitext(ruta)[1]:
+        ruta += FORMATOS_COLUMNARES[formato]
+    lotes = lotes_reservaciones(db, desde_dt, hasta_dt, tamano_lote, incluir_historico)
+    if formato == "npz":
+        return ruta, _exportar_npz(lotes, ruta)
+    return ruta, _exportar_arrow(lotes, ruta, formato)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Exporta por columnas las reservaciones de un rango de fechas")
+    parser.add_argument("desde", help="Fecha inicial (mm-dd-aaaa)")
+    parser.add_argument("hasta", help="Fecha final (mm-dd-aaaa)")
+    parser.add_argument("salida", help="Archivo de salida (.parquet, .arrow o .npz)")
+    parser.add_argument("--formato", choices=list(FORMATOS_COLUMNARES),
+                        help="Por omisión, según la extensión; sin extensión, parquet (o npz sin pyarrow)")
+    parser.add_argument("--db", default=DB_FILE, help="Archivo de base de datos")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Filas por lote")
+    parser.add_argument("--sin-historico", action="store_true", help="No incluye las reservaciones archivadas")
+    args = parser.parse_args(argv)
+
+    try:
+        desde = datetime.strptime(args.desde, "%m-%d-%Y")
+        hasta = datetime.strptime(args.hasta, "%m-%d-%Y")
+    except ValueError:
+        print("✗ Error: Formato de fecha inválido. Use mm-dd-aaaa (ejemplo: 12-25-2025).")
+        return 1
+
+    db = BaseDatos(args.db, solo_lectura=True)
+    try:
+        ruta, filas = exportar_columnar(db, desde, hasta, args.salida, args.formato, args.lote,
+                                        not args.sin_historico)
+    except ImportError:
+        print("✗ Error: El módulo 'pyarrow' no está instalado.")
+        print("   Instálelo con: pip install pyarrow (o exporte con --formato npz)")
+        return 1
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        return 1
+    except sqlite3.Error as e:
+        print(f"✗ Error de base de datos: {e}")
+        return 1
+    finally:
+        db.cerrar()
+    print(f"✓ {filas} reservaciones exportadas a {ruta}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
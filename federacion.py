@@ -0,0 +1,167 @@
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIA_EDD import (
+    TURNOS,
+    BaseDatos,
+    Disponibilidad,
+    Reservacion,
+    Sala,
+    fecha_a_str,
+    linea,
+    tabla,
+)
+
+# Consulta varias sedes, cada una con su propio coworking.db. Cada tarea abre una
+# conexión de solo lectura en el hilo que la ejecuta (sqlite3 no comparte conexiones
+# entre hilos) y la cierra al terminar; los resultados llevan la clave de la sede.
+class Federacion:
+    def __init__(self, sitios: Optional[Dict[str, str]] = None, hilos: Optional[int] = None):
+        self.sitios: Dict[str, str] = {}
+        self.hilos = hilos
+        self.errores: Dict[str, Exception] = {}
+        for sitio, db_file in (sitios or {}).items():
+            self.registrar(sitio, db_file)
+
+    def registrar(self, sitio: str, db_file: str):
+        sitio = (sitio or "").strip()
+        if not sitio:
+            raise ValueError("La clave de la sede no puede estar vacía.")
+        if sitio in self.sitios:
+            raise ValueError(f"La sede '{sitio}' ya está registrada.")
+        self.sitios[sitio] = db_file
+
+    def _consultar(self, sitio: str, fn: Callable[[BaseDatos], list]) -> list:
+        db = BaseDatos(self.sitios[sitio], solo_lectura=True)
+        try:
+            return fn(db)
+        finally:
+            db.cerrar()
+
+    def _en_paralelo(self, fn: Callable[[BaseDatos], list]) -> List[tuple]:
+        # Una sede caída no impide responder con las demás; su error queda en self.errores
+        self.errores = {}
+        if not self.sitios:
+            raise ValueError("No hay sedes registradas.")
+        resultados = []
+        with ThreadPoolExecutor(max_workers=self.hilos or len(self.sitios)) as pool:
+            futuros = {sitio: pool.submit(self._consultar, sitio, fn) for sitio in self.sitios}
+            for sitio, futuro in futuros.items():
+                try:
+                    resultados.extend((sitio, r) for r in futuro.result())
+                except Exception as e:
+                    self.errores[sitio] = e
+        return resultados
+
+    def salas_disponibles(self, fecha_dt: datetime, turno: str) -> List[Tuple[str, Sala]]:
+        if turno not in TURNOS:
+            raise ValueError("Turno inválido.")
+        resultados = self._en_paralelo(lambda db: db.salas_disponibles(fecha_dt, turno))
+        return sorted(resultados, key=lambda r: (r[1].cupo, r[0], r[1].id))
+
+    def buscar_sala_para(self, asistentes: int, desde_dt: datetime, turno: Optional[str] = None,
+                         alternativas: int = 3) -> List[Tuple[str, Disponibilidad]]:
+        if asistentes <= 0:
+            raise ValueError("El número de asistentes debe ser mayor que 0.")
+        if turno is not None and turno not in TURNOS:
+            raise ValueError("Turno inválido.")
+        orden_turno = {t: i for i, t in enumerate(TURNOS)}
+        resultados = self._en_paralelo(lambda db: db.buscar_sala_para(asistentes, desde_dt, turno, alternativas))
+        resultados.sort(key=lambda r: (r[1].fecha, orden_turno[r[1].turno], r[1].sala.cupo, r[0], r[1].sala.id))
+        return resultados[:alternativas + 1]
+
+    def buscar_reservas(self, texto: str, limite: int = 20, solo_activas: bool = True) -> List[Tuple[str, Reservacion]]:
+        # Cada sede ordena por relevancia; entre sedes se intercalan por fecha
+        resultados = self._en_paralelo(lambda db: db.buscar_reservas(texto, limite, solo_activas))
+        resultados.sort(key=lambda r: (r[1].fecha, r[0], r[1].folio))
+        return resultados[:limite]
+
+    def filas_reporte(self, desde_dt: datetime, hasta_dt: datetime) -> List[tuple]:
+        # (sede, dia, id_sala, folio, evento, cliente, sala, turno, cupo)
+        resultados = self._en_paralelo(lambda db: db.filas_reporte(desde_dt, hasta_dt))
+        orden_turno = {t: i for i, t in enumerate(TURNOS)}
+        return sorted(
+            ((sitio,) + tuple(fila) for sitio, fila in resultados),
+            key=lambda f: (f[1], orden_turno.get(f[7], len(orden_turno)), f[0], f[3]),
+        )
+
+def _sitios_desde_args(valores: List[str]) -> Dict[str, str]:
+    sitios = {}
+    for valor in valores:
+        sitio, sep, db_file = valor.partition("=")
+        if not sep or not db_file:
+            raise ValueError(f"Sede inválida '{valor}'. Use CLAVE=archivo.db")
+        sitios[sitio] = db_file
+    return sitios
+
+def _mostrar_errores(federacion: Federacion):
+    for sitio, error in federacion.errores.items():
+        print(f"⚠ La sede {sitio} no respondió: {error}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Consultas de disponibilidad, búsqueda y reportes en varias sedes")
+    parser.add_argument("--sitio", action="append", required=True, metavar="CLAVE=ARCHIVO",
+                        help="Sede y su base de datos; repita la opción por cada sede")
+    parser.add_argument("--hilos", type=int, help="Consultas simultáneas (por omisión, una por sede)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("disponibles", help="Salas libres en todas las sedes para una fecha y turno")
+    p.add_argument("fecha", help="Fecha (mm-dd-aaaa)")
+    p.add_argument("turno", choices=sorted(TURNOS))
+
+    p = sub.add_parser("asistentes", help="Sala más adecuada en cualquier sede para un número de asistentes")
+    p.add_argument("asistentes", type=int)
+    p.add_argument("desde", help="Fecha a partir de la cual buscar (mm-dd-aaaa)")
+    p.add_argument("--turno", choices=sorted(TURNOS))
+
+    p = sub.add_parser("buscar", help="Busca reservaciones por nombre de evento o cliente")
+    p.add_argument("texto")
+
+    p = sub.add_parser("reporte", help="Reservaciones de todas las sedes en un rango de fechas")
+    p.add_argument("desde", help="Fecha inicial (mm-dd-aaaa)")
+    p.add_argument("hasta", help="Fecha final (mm-dd-aaaa)")
+
+    args = parser.parse_args(argv)
+    try:
+        federacion = Federacion(_sitios_desde_args(args.sitio), hilos=args.hilos)
+        if args.comando == "disponibles":
+            fecha = datetime.strptime(args.fecha, "%m-%d-%Y")
+            filas = [[sitio, s.id, s.nombre, str(s.cupo)] for sitio, s in federacion.salas_disponibles(fecha, args.turno)]
+            encabezados = ["Sede", "Clave Sala", "Nombre", "Cupo"]
+        elif args.comando == "asistentes":
+            desde = datetime.strptime(args.desde, "%m-%d-%Y")
+            filas = [
+                [sitio, fecha_a_str(d.fecha), TURNOS[d.turno], d.sala.id, d.sala.nombre, str(d.sala.cupo)]
+                for sitio, d in federacion.buscar_sala_para(args.asistentes, desde, args.turno)
+            ]
+            encabezados = ["Sede", "Fecha", "Turno", "Clave Sala", "Nombre", "Cupo"]
+        elif args.comando == "buscar":
+            filas = [
+                [sitio, str(r.folio), r.evento, fecha_a_str(r.fecha), TURNOS.get(r.turno, r.turno), r.estado]
+                for sitio, r in federacion.buscar_reservas(args.texto)
+            ]
+            encabezados = ["Sede", "Folio", "Evento", "Fecha", "Turno", "Estado"]
+        else:
+            desde = datetime.strptime(args.desde, "%m-%d-%Y")
+            hasta = datetime.strptime(args.hasta, "%m-%d-%Y")
+            filas = [
+                [sitio, fecha_a_str(datetime.strptime(dia, "%Y-%m-%d")), TURNOS.get(turno, turno), str(folio), evento,
+                 cliente or "", sala or id_sala]
+                for sitio, dia, id_sala, folio, evento, cliente, sala, turno, _ in federacion.filas_reporte(desde, hasta)
+            ]
+            encabezados = ["Sede", "Fecha", "Turno", "Folio", "Evento", "Cliente", "Sala"]
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        return 1
+
+    _mostrar_errores(federacion)
+    print(linea())
+    print(tabla(encabezados, filas) if filas else "(sin resultados)")
+    print(linea())
+    return 0 if not federacion.errores else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import argparse
+import sqlite3
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+import metricas
+from PIA_EDD import DB_FILE, BaseDatos
+
+def comando_reconstruir_ocupacion(db: BaseDatos, args: argparse.Namespace) -> int:
+    total = db.reconstruir_ocupacion()
+    print(f"✓ Índice de ocupación reconstruido: {total} reservaciones activas.")
+    return 0
+
+def comando_reconstruir_busqueda(db: BaseDatos, args: argparse.Namespace) -> int:
+    total = db.reconstruir_indice_busqueda()
+    print(f"✓ Índice de búsqueda reconstruido: {total} reservaciones indexadas.")
+    return 0
+
+def comando_archivar(db: BaseDatos, args: argparse.Namespace) -> int:
+    corte = datetime.strptime(args.antes_de, "%m-%d-%Y") if args.antes_de else None
+    movidas = db.archivar(corte)
+    print(f"✓ {movidas} reservaciones pasadas o canceladas movidas al histórico.")
+    return 0
+
+def comando_cerrar_dias(db: BaseDatos, args: argparse.Namespace) -> int:
+    desde = datetime.strptime(args.desde, "%m-%d-%Y")
+    hasta = datetime.strptime(args.hasta, "%m-%d-%Y") if args.hasta else desde
+    total = db.cerrar_dias(desde, hasta, args.motivo)
+    print(f"✓ {total} días marcados como cerrados.")
+    return 0
+
+def comando_abrir_dias(db: BaseDatos, args: argparse.Namespace) -> int:
+    desde = datetime.strptime(args.desde, "%m-%d-%Y")
+    hasta = datetime.strptime(args.hasta, "%m-%d-%Y") if args.hasta else desde
+    total = db.abrir_dias(desde, hasta)
+    print(f"✓ {total} días vuelven a estar abiertos.")
+    return 0
+
+def comando_auditar(db: BaseDatos, args: argparse.Namespace) -> int:
+    from auditoria import auditar
+
+    hallazgos = auditar(db, reparar=args.reparar)
+    pendientes = 0
+    for h in hallazgos:
+        if not h.cantidad:
+            continue
+        estado = f"{h.reparados} reparados" if args.reparar and h.reparable else (
+            "requiere revisión manual" if not h.reparable else "reparable con --reparar")
+        print(f"✗ {h.problema}: {h.cantidad} ({estado})")
+        if h.ejemplos:
+            print(f"   Ejemplos: {', '.join(h.ejemplos)}")
+        pendientes += h.cantidad - h.reparados
+    if not any(h.cantidad for h in hallazgos):
+        print("✓ No se encontraron problemas de integridad.")
+    return 1 if pendientes else 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tareas de mantenimiento de la base de datos de coworking")
+    parser.add_argument("--db", default=DB_FILE, help="Archivo de base de datos")
+    parser.add_argument("--metricas", help="Archivo de métricas (.json o texto de Prometheus)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("reconstruir-ocupacion", help="Recalcula el índice de ocupación (intervalos) a partir de las reservaciones")
+    p.set_defaults(fn=comando_reconstruir_ocupacion)
+
+    p = sub.add_parser("reconstruir-busqueda", help="Recalcula el índice de texto completo de eventos y clientes")
+    p.set_defaults(fn=comando_reconstruir_busqueda)
+
+    p = sub.add_parser("archivar", help="Mueve las reservaciones pasadas y canceladas al histórico")
+    p.add_argument("--antes-de", help="Fecha de corte mm-dd-aaaa (por omisión, hoy)")
+    p.set_defaults(fn=comando_archivar)
+
+    p = sub.add_parser("auditar", help="Revisa dobles reservaciones, huérfanos, contadores y valores inválidos")
+    p.add_argument("--reparar", action="store_true", help="Corrige lo reparable en una sola transacción")
+    p.set_defaults(fn=comando_auditar)
+
+    p = sub.add_parser("cerrar-dias", help="Marca un día o rango de días como cerrado (festivo, cierre de la sede)")
+    p.add_argument("desde", help="Fecha inicial mm-dd-aaaa")
+    p.add_argument("hasta", nargs="?", help="Fecha final mm-dd-aaaa (por omisión, la inicial)")
+    p.add_argument("--motivo", required=True)
+    p.set_defaults(fn=comando_cerrar_dias)
+
+    p = sub.add_parser("abrir-dias", help="Vuelve a abrir un día o rango de días cerrados")
+    p.add_argument("desde", help="Fecha inicial mm-dd-aaaa")
+    p.add_argument("hasta", nargs="?", help="Fecha final mm-dd-aaaa (por omisión, la inicial)")
+    p.set_defaults(fn=comando_abrir_dias)
+
+    args = parser.parse_args(argv)
+    if args.metricas:
+        metricas.activar(args.metricas)
+    db = BaseDatos(args.db)
+    try:
+        with metricas.tramo(args.comando):
+            return args.fn(db, args)
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        return 1
+    except sqlite3.Error as e:
+        print(f"✗ Error de base de datos: {e}")
+        return 1
+    finally:
+        db.cerrar()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import atexit
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Tramos de tiempo por opción del menú y por fase (sql, tabla, exportación, entrada...).
+# Se activan con COWORKING_METRICAS=<archivo>; sin la variable, tramo() devuelve un
+# contexto vacío compartido y no se mide nada. El archivo se reescribe cada
+# COWORKING_METRICAS_INTERVALO segundos y al salir: JSON si termina en .json y, si no,
+# el formato de texto de Prometheus.
+
+LIMITES = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+class Histograma:
+    def __init__(self):
+        self.cubetas = [0] * (len(LIMITES) + 1)
+        self.suma = 0.0
+        self.cuenta = 0
+
+    def observar(self, segundos: float):
+        self.cubetas[bisect.bisect_left(LIMITES, segundos)] += 1
+        self.suma += segundos
+        self.cuenta += 1
+
+class Registro:
+    def __init__(self, ruta: Optional[str] = None, intervalo: float = 10.0):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.histogramas: Dict[str, Histograma] = {}
+        self._candado = threading.Lock()
+        self._local = threading.local()
+        self._hilo: Optional[threading.Thread] = None
+
+    @contextmanager
+    def tramo(self, nombre: str):
+        # Los tramos anidados se nombran con la ruta completa: opcion_consultar_por_fecha/sql
+        pila: List[str] = self._local.__dict__.setdefault("pila", [])
+        pila.append(nombre)
+        ruta = "/".join(pila)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            transcurrido = time.perf_counter() - t0
+            pila.pop()
+            with self._candado:
+                self.histogramas.setdefault(ruta, Histograma()).observar(transcurrido)
+
+    def instantanea(self) -> Dict[str, dict]:
+        with self._candado:
+            return {
+                ruta: {"cubetas": list(h.cubetas), "suma": h.suma, "cuenta": h.cuenta}
+                for ruta, h in sorted(self.histogramas.items())
+            }
+
+    def como_json(self) -> str:
+        import json
+
+        datos = {
+            ruta: {
+                "cuenta": h["cuenta"],
+                "suma_segundos": h["suma"],
+                "promedio_segundos": h["suma"] / h["cuenta"] if h["cuenta"] else 0.0,
+                "cubetas": {str(l): c for l, c in zip(LIMITES + ["+Inf"], h["cubetas"])},
+            }
+            for ruta, h in self.instantanea().items()
+        }
+        return json.dumps({"generado": time.time(), "tramos": datos}, ensure_ascii=False, indent=2)
+
+    def como_prometheus(self) -> str:
+        lineas = [
+            "# HELP coworking_tramo_segundos Duración de cada opción y de sus fases internas.",
+            "# TYPE coworking_tramo_segundos histogram",
+        ]
+        for ruta, h in self.instantanea().items():
+            etiqueta = ruta.replace("\\", "\\\\").replace('"', '\\"')
+            acumulado = 0
+            for limite, cuenta in zip(LIMITES + ["+Inf"], h["cubetas"]):
+                acumulado += cuenta
+                lineas.append(f'coworking_tramo_segundos_bucket{{tramo="{etiqueta}",le="{limite}"}} {acumulado}')
+            lineas.append(f'coworking_tramo_segundos_sum{{tramo="{etiqueta}"}} {h["suma"]}')
+            lineas.append(f'coworking_tramo_segundos_count{{tramo="{etiqueta}"}} {h["cuenta"]}')
+        return "\n".join(lineas) + "\n"
+
+    def escribir(self):
+        if not self.ruta:
+            return
+        contenido = self.como_json() if self.ruta.endswith(".json") else self.como_prometheus()
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(contenido)
+        os.replace(temporal, self.ruta)
+
+    def _escribir_periodicamente(self):
+        while True:
+            time.sleep(self.intervalo)
+            try:
+                self.escribir()
+            except OSError:
+                pass
+
+    def iniciar(self):
+        if self._hilo is None and self.ruta:
+            self._hilo = threading.Thread(target=self._escribir_periodicamente, name="metricas", daemon=True)
+            self._hilo.start()
+            atexit.register(self.escribir)
+
+class _TramoVacio:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_TRAMO_VACIO = _TramoVacio()
+
+def _tramo_inactivo(nombre: str) -> _TramoVacio:
+    return _TRAMO_VACIO
+
+REGISTRO: Optional[Registro] = None
+tramo = _tramo_inactivo
+
+def activar(ruta: Optional[str] = None, intervalo: float = 10.0) -> Registro:
+    global REGISTRO, tramo
+    REGISTRO = Registro(ruta, intervalo)
+    REGISTRO.iniciar()
+    tramo = REGISTRO.tramo
+    return REGISTRO
+
+if os.environ.get("COWORKING_METRICAS"):
+    activar(os.environ["COWORKING_METRICAS"], float(os.environ.get("COWORKING_METRICAS_INTERVALO", "10")))
@@ -0,0 +1,227 @@
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIA_EDD import (
+    DB_FILE,
+    FORMATOS_EXPORTACION,
+    BaseDatos,
+    escribir_hoja_xlsx,
+    exportar_reporte,
+    fecha_a_str,
+    fila_reporte,
+    input_fecha,
+    linea,
+    pausar,
+)
+
+AGRUPACIONES = ("dia", "sala")
+
+def _tramos_de_dias(desde: datetime, hasta: datetime, partes: int) -> List[Tuple[datetime, datetime]]:
+    total = (hasta.date() - desde.date()).days + 1
+    tamano = max(1, -(-total // partes))
+    tramos = []
+    inicio = desde
+    while inicio.date() <= hasta.date():
+        fin = min(inicio + timedelta(days=tamano - 1), hasta)
+        tramos.append((inicio, fin))
+        inicio = fin + timedelta(days=1)
+    return tramos
+
+def _generar_tramo(db_file: str, desde: datetime, hasta: datetime, id_salas: Optional[List[str]],
+                   agrupar: str, formatos: List[str], directorio: str, devolver_filas: bool) -> List[tuple]:
+    # Cada proceso abre su propia conexión de solo lectura
+    db = BaseDatos(db_file, solo_lectura=True)
+    try:
+        if id_salas is None:
+            rows = db.filas_reporte(desde, hasta)
+        else:
+            rows = [row for id_sala in id_salas for row in db.filas_reporte(desde, hasta, id_sala=id_sala)]
+    finally:
+        db.cerrar()
+
+    grupos: Dict[str, List[tuple]] = {}
+    for row in rows:
+        grupos.setdefault(row[0] if agrupar == "dia" else row[1], []).append(row)
+
+    resultados = []
+    for clave, grupo in grupos.items():
+        filas = [fila_reporte(row) for row in grupo]
+        if agrupar == "dia":
+            etiqueta = fecha_a_str(datetime.strptime(clave, "%Y-%m-%d"))
+            titulo = f"RESERVACIONES DEL {etiqueta}"
+            nombre_base = os.path.join(directorio, f"reporte_{etiqueta.replace('-', '')}")
+        else:
+            etiqueta = f"{clave} {grupo[0][5]}"
+            titulo = f"RESERVACIONES DE {grupo[0][5]} DEL {fecha_a_str(desde)} AL {fecha_a_str(hasta)}"
+            nombre_base = os.path.join(directorio, f"reporte_{clave}")
+        rutas = [exportar_reporte(filas, nombre_base, formato, titulo) for formato in formatos]
+        resultados.append((clave, etiqueta, titulo, filas if devolver_filas else None, rutas))
+    return resultados
+
+def _nombre_hoja(etiqueta: str, usados: set) -> str:
+    base = re.sub(r"[\[\]:*?/\\]", "_", etiqueta)[:31]
+    nombre, i = base, 2
+    while nombre in usados:
+        sufijo = f" ({i})"
+        nombre = base[:31 - len(sufijo)] + sufijo
+        i += 1
+    usados.add(nombre)
+    return nombre
+
+def escribir_libro(resultados: List[tuple], ruta: str) -> str:
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    usados: set = set()
+    for _, etiqueta, titulo, filas, _ in resultados:
+        escribir_hoja_xlsx(wb.create_sheet(_nombre_hoja(etiqueta, usados)), titulo, filas)
+    wb.save(ruta)
+    return ruta
+
+def mostrar_progreso(hechos: int, total: int):
+    ancho = 30
+    llenos = ancho * hechos // total if total else ancho
+    print(f"\r  Progreso: [{'#' * llenos}{' ' * (ancho - llenos)}] {hechos}/{total} tramos", end="", flush=True)
+    if hechos == total:
+        print()
+
+def generar_lote(db_file: str, desde: datetime, hasta: datetime, agrupar: str = "dia",
+                 formatos: Tuple[str, ...] = ("csv",), directorio: Optional[str] = None,
+                 procesos: Optional[int] = None, libro: bool = False,
+                 progreso: Optional[Callable[[int, int], None]] = mostrar_progreso) -> Tuple[List[str], Optional[str]]:
+    if hasta.date() < desde.date():
+        raise ValueError("La fecha final no puede ser anterior a la inicial.")
+    if agrupar not in AGRUPACIONES:
+        raise ValueError("Agrupación inválida. Use 'dia' o 'sala'.")
+    invalidos = [f for f in formatos if f not in FORMATOS_EXPORTACION]
+    if invalidos:
+        raise ValueError(f"Formato inválido: {', '.join(invalidos)}")
+    if not formatos and not libro:
+        raise ValueError("Indique al menos un formato o el libro de Excel.")
+    if libro or "xlsx" in formatos:
+        # Falla antes de repartir el trabajo si openpyxl no está instalado
+        import openpyxl  # noqa: F401
+
+    procesos = procesos or os.cpu_count() or 1
+    directorio = directorio or os.path.join(
+        "exportaciones", f"lote_{fecha_a_str(desde).replace('-', '')}_{fecha_a_str(hasta).replace('-', '')}"
+    )
+    os.makedirs(directorio, exist_ok=True)
+
+    # Se comprueba el esquema (y se migra si hace falta) antes de abrir los lectores
+    db = BaseDatos(db_file)
+    try:
+        id_salas = [s[0] for s in db.conn.execute("SELECT id FROM salas ORDER BY id")]
+    finally:
+        db.cerrar()
+
+    if agrupar == "dia":
+        tareas = [(a, b, None) for a, b in _tramos_de_dias(desde, hasta, procesos * 4)]
+    else:
+        tamano = max(1, -(-len(id_salas) // (procesos * 4)))
+        tareas = [(desde, hasta, id_salas[i:i + tamano]) for i in range(0, len(id_salas), tamano)]
+
+    resultados = []
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = [
+            pool.submit(_generar_tramo, db_file, a, b, salas, agrupar, list(formatos), directorio, libro)
+            for a, b, salas in tareas
+        ]
+        if progreso:
+            progreso(0, len(futuros))
+        for hechos, futuro in enumerate(as_completed(futuros), start=1):
+            resultados.extend(futuro.result())
+            if progreso:
+                progreso(hechos, len(futuros))
+
+    resultados.sort(key=lambda r: r[0])
+    rutas = [ruta for r in resultados for ruta in r[4]]
+    ruta_libro = None
+    if libro and resultados:
+        ruta_libro = escribir_libro(resultados, os.path.join(directorio, "reportes.xlsx"))
+    return rutas, ruta_libro
+
+def opcion_reportes_lote(db: BaseDatos):
+    print(linea())
+    print("GENERAR REPORTES POR LOTE")
+    print(linea())
+
+    fecha_desde = input_fecha("Fecha inicial del rango (mm-dd-aaaa): ")
+    fecha_hasta = input_fecha("Fecha final del rango (mm-dd-aaaa): ")
+
+    print("\nAgrupar reportes por:")
+    print("  1) Día")
+    print("  2) Sala")
+    while True:
+        op = input("Seleccione una opción: ").strip()
+        if op in {"1", "2"}:
+            agrupar = "dia" if op == "1" else "sala"
+            break
+        print("⚠ Opción inválida. Use 1 o 2.")
+
+    print("\nFormatos (separados por coma): csv, json, xlsx")
+    while True:
+        formatos = tuple(f.strip().lower() for f in input("Formatos [csv]: ").split(",") if f.strip()) or ("csv",)
+        if all(f in FORMATOS_EXPORTACION for f in formatos):
+            break
+        print("⚠ Formato inválido. Use csv, json o xlsx.")
+    libro = input("¿Generar también un libro de Excel con una hoja por reporte? (S/N): ").strip().upper() == "S"
+
+    try:
+        print()
+        rutas, ruta_libro = generar_lote(db.db_file, fecha_desde, fecha_hasta, agrupar=agrupar,
+                                         formatos=formatos, libro=libro)
+        print("\n" + linea())
+        if not rutas:
+            print(f"No hay reservaciones del {fecha_a_str(fecha_desde)} al {fecha_a_str(fecha_hasta)}.")
+        else:
+            print(f"✓ {len(rutas)} archivos generados en {os.path.dirname(rutas[0])}")
+        if ruta_libro:
+            print(f"✓ Libro de Excel generado: {ruta_libro}")
+        print(linea())
+    except ImportError:
+        print("\n✗ Error: El módulo 'openpyxl' no está instalado.")
+        print("   Instálelo con: pip install openpyxl")
+    except ValueError as e:
+        print(f"\n✗ Error: {e}")
+    except Exception as e:
+        print(f"\n✗ Error al generar los reportes: {e}")
+    pausar()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Genera reportes de reservaciones por día o por sala para un rango de fechas")
+    parser.add_argument("desde", help="Fecha inicial (mm-dd-aaaa)")
+    parser.add_argument("hasta", help="Fecha final (mm-dd-aaaa)")
+    parser.add_argument("--db", default=DB_FILE, help="Archivo de base de datos")
+    parser.add_argument("--agrupar", choices=AGRUPACIONES, default="dia")
+    parser.add_argument("--formato", action="append", choices=sorted(FORMATOS_EXPORTACION),
+                        help="Formato de salida; puede repetirse (por omisión, csv)")
+    parser.add_argument("--libro", action="store_true", help="Genera además un libro de Excel con una hoja por reporte")
+    parser.add_argument("--directorio", help="Carpeta de salida")
+    parser.add_argument("--procesos", type=int, help="Número de procesos (por omisión, uno por núcleo)")
+    args = parser.parse_args(argv)
+
+    desde = datetime.strptime(args.desde, "%m-%d-%Y")
+    hasta = datetime.strptime(args.hasta, "%m-%d-%Y")
+    formatos = tuple(args.formato) if args.formato else (() if args.libro else ("csv",))
+    try:
+        rutas, ruta_libro = generar_lote(args.db, desde, hasta, agrupar=args.agrupar, formatos=formatos,
+                                         directorio=args.directorio, procesos=args.procesos, libro=args.libro)
+    except ImportError:
+        print("✗ Error: El módulo 'openpyxl' no está instalado.")
+        print("   Instálelo con: pip install openpyxl")
+        return 1
+    print(f"✓ {len(rutas)} archivos generados.")
+    if ruta_libro:
+        print(f"✓ Libro de Excel generado: {ruta_libro}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
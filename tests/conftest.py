@@ -0,0 +1,23 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIA_EDD import BaseDatos  # noqa: E402
+
+@pytest.fixture
+def db(tmp_path):
+    base = BaseDatos(str(tmp_path / "coworking.db"))
+    yield base
+    base.cerrar()
+
+def dia_reservable(db: BaseDatos, despues: int = 0) -> datetime:
+    # El n-ésimo día abierto a partir del primero que se puede reservar (y cancelar)
+    calendario = db.calendario()
+    dia = calendario.primer_dia_reservable()
+    for _ in range(despues):
+        dia = calendario.siguiente_abierto(dia + timedelta(days=1))
+    return datetime.combine(dia, datetime.min.time())
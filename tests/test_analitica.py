@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+import analitica
+from conftest import dia_reservable
+
+def _cubo(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    a = db.registrar_sala("Sala A", 10)
+    b = db.registrar_sala("Sala B", 30)
+    c = db.registrar_sala("Sala C", 5)
+    dia = dia_reservable(db)
+    db.registrar_reserva("Junta", cliente.id, a.id, dia, "M")
+    cancelada = db.registrar_reserva("Clase", cliente.id, a.id, dia, "V")
+    db.cancelar_reservacion(cancelada.folio)
+    # 12:00 a 14:00 ocupa el turno matutino y el vespertino
+    db.registrar_reserva_intervalo("Taller", cliente.id, b.id, dia, 12 * 60, 14 * 60)
+    # Siete días seguidos: seis hábiles y un domingo
+    return analitica.cargar_cubo(db, dia, dia + timedelta(days=6)), dia, c
+
+def test_cubo_marca_los_turnos_ocupados_por_sala_y_dia(db):
+    cubo, dia, _ = _cubo(db)
+
+    assert cubo.ocupado.shape == (3, 7, 3)
+    assert cubo.habiles.sum() == 6
+    assert cubo.dias[0] == np.datetime64(dia.date(), "D")
+    assert cubo.ocupado[:, 0, :].tolist() == [
+        [True, False, False],
+        [True, True, False],
+        [False, False, False],
+    ]
+    assert not cubo.ocupado[:, 1:, :].any()
+
+def test_utilizacion_por_sala_turno_y_cupo(db):
+    cubo, dia, ociosa = _cubo(db)
+
+    np.testing.assert_allclose(analitica.utilizacion_por_sala(cubo), [1 / 18, 2 / 18, 0])
+    np.testing.assert_allclose(analitica.utilizacion_por_turno(cubo), [2 / 18, 1 / 18, 0])
+    assert analitica.utilizacion_ponderada_por_cupo(cubo) == pytest.approx((10 + 2 * 30) / (45 * 6 * 3))
+    dias, turnos, lugares = analitica.dias_pico(cubo)
+    assert dias.tolist() == [dia.date()]
+    assert turnos.tolist() == [3]
+    assert lugares.tolist() == [70]
+    assert [s.id for s in analitica.salas_ociosas(cubo)] == [ociosa.id]
+
+def test_rango_invertido(db):
+    dia = dia_reservable(db)
+    with pytest.raises(ValueError):
+        analitica.cargar_cubo(db, dia, dia - timedelta(days=1))
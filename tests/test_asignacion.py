@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+from asignacion import Solicitud, asignar_lote, emparejamiento_maximo
+from conftest import dia_reservable
+
+def test_emparejamiento_supera_al_voraz():
+    # El arranque voraz (menos opciones primero) coloca 0 -> 0 y 1 -> 1 y deja a 2 sin
+    # lugar; el camino de aumento 2 -> 1 -> 2 coloca a los tres
+    assert emparejamiento_maximo([[0], [1, 2], [0, 1]], 3) == [0, 2, 1]
+
+def test_emparejamiento_sin_opciones():
+    assert emparejamiento_maximo([[], [0], [0]], 1) in ([-1, 0, -1], [-1, -1, 0])
+
+def test_lote_coloca_mas_que_en_orden_de_llegada(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    fecha = dia_reservable(db)
+    resultado = asignar_lote(db, [
+        Solicitud("Junta", cliente.id, 5, [(fecha, "M")]),
+        Solicitud("Curso", cliente.id, 5, [(fecha, "V"), (fecha, "N")]),
+        Solicitud("Clase", cliente.id, 5, [(fecha, "M"), (fecha, "V")]),
+    ])
+    assert resultado.en_orden_de_llegada == 2
+    assert resultado.sin_lugar == []
+    assert sorted((a.solicitud.evento, a.turno) for a in resultado.asignadas) == [
+        ("Clase", "V"), ("Curso", "N"), ("Junta", "M")
+    ]
+    assert sorted((r.evento, r.turno, r.id_sala) for r in db.reservas_por_fecha(fecha)) == [
+        ("Clase", "V", sala.id), ("Curso", "N", sala.id), ("Junta", "M", sala.id)
+    ]
+
+def test_solicitud_sin_espacio_factible_queda_sin_lugar(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    db.registrar_sala("Sala A", 10)
+    fecha, cerrado = dia_reservable(db), dia_reservable(db, 1)
+    db.cerrar_dias(cerrado, cerrado, "Inventario")
+    resultado = asignar_lote(db, [
+        Solicitud("Congreso", cliente.id, 50, [(fecha, "M")]),
+        Solicitud("Posada", cliente.id, 5, [(cerrado, "N")]),
+        Solicitud("Junta", cliente.id, 5, [(fecha, "M")]),
+    ])
+    assert [a.solicitud.evento for a in resultado.asignadas] == ["Junta"]
+    assert [s.evento for s in resultado.sin_lugar] == ["Congreso", "Posada"]
+
+def test_evento_vacio_se_rechaza(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    db.registrar_sala("Sala A", 10)
+    fecha = dia_reservable(db)
+    with pytest.raises(ValueError, match="evento"):
+        asignar_lote(db, [
+            Solicitud("Junta", cliente.id, 5, [(fecha, "M")]),
+            Solicitud("  ", cliente.id, 5, [(fecha, "V")]),
+        ])
+    assert db.reservas_por_fecha(fecha) == []
+
+def test_falla_a_medio_lote_revierte_todo(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    db.registrar_sala("Sala A", 10)
+    fecha = dia_reservable(db)
+    db.conn.execute("""
+        CREATE TEMP TRIGGER falla_insertar BEFORE INSERT ON reservaciones
+        WHEN NEW.evento = 'Clase'
+        BEGIN
+            SELECT RAISE(ABORT, 'falla simulada');
+        END
+    """)
+    with pytest.raises(sqlite3.IntegrityError):
+        asignar_lote(db, [
+            Solicitud("Junta", cliente.id, 5, [(fecha, "M")]),
+            Solicitud("Clase", cliente.id, 5, [(fecha, "V")]),
+        ])
+    assert db.reservas_por_fecha(fecha) == []
+    assert db.conn.execute("SELECT COUNT(*) FROM intervalos").fetchone()[0] == 0
+    assert len(db.salas_disponibles(fecha, "M")) == 1
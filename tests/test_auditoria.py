@@ -0,0 +1,72 @@
+import sqlite3
+
+import auditoria
+import mantenimiento
+from conftest import dia_reservable
+
+def _insertar(db, folio, turno, estado="activa", sala="S0001", dia=None):
+    db.conn.execute("""
+        INSERT INTO reservaciones (folio, evento, id_cliente, id_sala, fecha, dia, turno, estado)
+        VALUES (?, ?, 'C0001', ?, ?, ?, ?, ?)
+    """, (folio, f"Evento {folio}", sala, dia, dia.date().isoformat(), turno, estado))
+    db.conn.commit()
+
+def _hallazgo(hallazgos, problema):
+    return next(h for h in hallazgos if h.problema == problema)
+
+def _preparar(db):
+    db.registrar_cliente("Ana", "López")
+    db.registrar_sala("Sala A", 10)
+    return dia_reservable(db)
+
+def test_reparar_turno_que_choca_con_otra_reservacion_activa(db):
+    dia = _preparar(db)
+    _insertar(db, 1, "M", dia=dia)
+    _insertar(db, 2, "m", dia=dia)
+
+    hallazgos = auditoria.auditar(db, reparar=True)
+
+    assert _hallazgo(hallazgos, "Reservaciones con turno inválido").reparados == 1
+    filas = db.conn.execute("SELECT folio, turno, estado FROM reservaciones ORDER BY folio").fetchall()
+    # Se conserva la más antigua; la repetida queda cancelada
+    assert filas == [(1, "M", "activa"), (2, "M", "cancelada")]
+    assert db.conn.execute("SELECT folio FROM intervalos").fetchall() == [(1,)]
+    assert not any(h.cantidad for h in auditoria.auditar(db))
+
+def test_reparar_conserva_la_de_menor_folio_aunque_sea_la_invalida(db):
+    dia = _preparar(db)
+    _insertar(db, 1, " n ", estado="ACTIVA", dia=dia)
+    _insertar(db, 2, "N", dia=dia)
+
+    auditoria.auditar(db, reparar=True)
+
+    filas = db.conn.execute("SELECT folio, turno, estado FROM reservaciones ORDER BY folio").fetchall()
+    assert filas == [(1, "N", "activa"), (2, "N", "cancelada")]
+    assert not any(h.cantidad for h in auditoria.auditar(db))
+
+def test_reparar_traslapes_en_cadena_cancela_solo_el_del_medio(db):
+    dia = _preparar(db)
+    # A [8:00, 10:00), B [9:00, 12:00), C [11:00, 13:00): B choca con ambas, A y C no se tocan
+    for folio, inicio, fin in [(1, 480, 600), (2, 540, 720), (3, 660, 780)]:
+        db.conn.execute("""
+            INSERT INTO reservaciones (folio, evento, id_cliente, id_sala, fecha, dia, turno, estado, hora_inicio, hora_fin)
+            VALUES (?, ?, 'C0001', 'S0001', ?, ?, 'M', 'activa', ?, ?)
+        """, (folio, f"Evento {folio}", dia, dia.date().isoformat(), inicio, fin))
+    db.conn.commit()
+
+    hallazgos = auditoria.auditar(db, reparar=True)
+
+    assert _hallazgo(hallazgos, "Reservaciones con horarios traslapados").reparados == 2
+    filas = db.conn.execute("SELECT folio, estado FROM reservaciones ORDER BY folio").fetchall()
+    assert filas == [(1, "activa"), (2, "cancelada"), (3, "activa")]
+    assert not any(h.cantidad for h in auditoria.auditar(db))
+
+def test_mantenimiento_auditar_informa_errores_de_base_de_datos(tmp_path, capsys, monkeypatch):
+    def falla(db, reparar=False):
+        raise sqlite3.IntegrityError("UNIQUE constraint failed")
+
+    monkeypatch.setattr(auditoria, "auditar", falla)
+    codigo = mantenimiento.main(["--db", str(tmp_path / "m.db"), "auditar", "--reparar"])
+
+    assert codigo == 1
+    assert "✗ Error de base de datos: UNIQUE constraint failed" in capsys.readouterr().out
@@ -0,0 +1,52 @@
+import pytest
+
+from conftest import dia_reservable
+
+def _opciones(disponibles):
+    return [(d.sala.nombre, d.fecha, d.turno) for d in disponibles]
+
+def _preparar(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    db.registrar_sala("Chica", 4)
+    media = db.registrar_sala("Media", 10)
+    grande = db.registrar_sala("Grande", 30)
+    return cliente, media, grande
+
+def test_prefiere_la_sala_mas_chica_que_alcanza(db):
+    _preparar(db)
+    dia = dia_reservable(db)
+
+    assert _opciones(db.buscar_sala_para(8, dia, "M", alternativas=1)) == [
+        ("Media", dia, "M"), ("Grande", dia, "M")
+    ]
+    assert db.buscar_sala_para(31, dia, "M") == []
+
+def test_salta_los_dias_ocupados_consecutivos(db):
+    cliente, media, _ = _preparar(db)
+    dia0, dia1, dia2 = (dia_reservable(db, n) for n in range(3))
+    db.registrar_reserva("Junta", cliente.id, media.id, dia0, "M")
+    db.registrar_reserva("Curso", cliente.id, media.id, dia1, "M")
+
+    assert _opciones(db.buscar_sala_para(8, dia0, "M")) == [
+        ("Grande", dia0, "M"), ("Media", dia2, "M")
+    ]
+
+def test_una_reservacion_por_horario_ocupa_los_turnos_que_cruza(db):
+    cliente, media, grande = _preparar(db)
+    dia0, dia1 = dia_reservable(db), dia_reservable(db, 1)
+    db.registrar_reserva_intervalo("Taller", cliente.id, media.id, dia0, 12 * 60, 14 * 60)
+    db.registrar_reserva("Posada", cliente.id, grande.id, dia0, "M")
+
+    # Sin turno: primero la fecha, luego el turno y al final el cupo
+    assert _opciones(db.buscar_sala_para(8, dia0, alternativas=4)) == [
+        ("Grande", dia0, "V"), ("Media", dia0, "N"), ("Grande", dia0, "N"),
+        ("Media", dia1, "M"), ("Grande", dia1, "M"),
+    ]
+
+def test_valida_asistentes_y_turno(db):
+    _preparar(db)
+    dia = dia_reservable(db)
+    with pytest.raises(ValueError):
+        db.buscar_sala_para(0, dia)
+    with pytest.raises(ValueError):
+        db.buscar_sala_para(5, dia, "X")
@@ -0,0 +1,57 @@
+from conftest import dia_reservable
+
+def _folios(reservas):
+    return [r.folio for r in reservas]
+
+def _preparar(db):
+    ana = db.registrar_cliente("Ana", "López")
+    luis = db.registrar_cliente("Luis", "Pérez")
+    sala = db.registrar_sala("Sala A", 10)
+    dia = dia_reservable(db)
+    junta = db.registrar_reserva("Junta de ventas", ana.id, sala.id, dia, "M")
+    curso = db.registrar_reserva("Curso de Python", luis.id, sala.id, dia, "V")
+    return ana, luis, junta, curso
+
+def test_busca_por_prefijo_en_evento_y_cliente_sin_acentos(db):
+    _, _, junta, curso = _preparar(db)
+
+    assert _folios(db.buscar_reservas("junta vent")) == [junta.folio]
+    assert _folios(db.buscar_reservas("perez")) == [curso.folio]
+    assert _folios(db.buscar_reservas("lóp")) == [junta.folio]
+    assert db.buscar_reservas("  ") == []
+    assert db.buscar_reservas("taller") == []
+
+def test_solo_activas_omite_las_canceladas(db):
+    _, _, junta, _ = _preparar(db)
+    db.cancelar_reservacion(junta.folio)
+
+    assert db.buscar_reservas("junta") == []
+    encontradas = db.buscar_reservas("junta", solo_activas=False)
+    assert [(r.folio, r.estado) for r in encontradas] == [(junta.folio, "cancelada")]
+
+def test_los_triggers_siguen_los_cambios_de_evento_cliente_y_borrado(db):
+    ana, _, junta, curso = _preparar(db)
+
+    db.editar_nombre_evento(junta.folio, "Posada")
+    assert db.buscar_reservas("junta") == []
+    assert _folios(db.buscar_reservas("posada")) == [junta.folio]
+
+    db.conn.execute("UPDATE clientes SET apellidos = 'Martínez' WHERE id = ?", (ana.id,))
+    db.conn.commit()
+    assert db.buscar_reservas("lopez") == []
+    assert _folios(db.buscar_reservas("martinez")) == [junta.folio]
+
+    db.conn.execute("DELETE FROM reservaciones WHERE folio = ?", (curso.folio,))
+    db.conn.commit()
+    assert db.buscar_reservas("python") == []
+    assert db.conn.execute("SELECT rowid FROM reservaciones_fts").fetchall() == [(junta.folio,)]
+
+def test_reconstruir_indice_busqueda(db):
+    _, _, junta, curso = _preparar(db)
+    db.conn.execute("DELETE FROM reservaciones_fts")
+    db.conn.commit()
+    assert db.buscar_reservas("curso") == []
+
+    assert db.reconstruir_indice_busqueda() == 2
+    assert _folios(db.buscar_reservas("curso")) == [curso.folio]
+    assert _folios(db.buscar_reservas("ana")) == [junta.folio]
@@ -0,0 +1,49 @@
+from conftest import dia_reservable
+from PIA_EDD import BaseDatos
+
+def _ids(salas):
+    return [s.id for s in salas]
+
+def test_escritura_propia_invalida_solo_los_turnos_que_toca(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    fecha = dia_reservable(db)
+    for turno in ("M", "V", "N"):
+        assert _ids(db.salas_disponibles(fecha, turno)) == [sala.id]
+    assert _ids(db.salas_disponibles(fecha, "M")) == [sala.id]
+    assert db.cache_disponibilidad.estadisticas()["aciertos"] == 1
+
+    # 12:00-14:00 cruza la mañana y la tarde; la noche sigue en caché
+    db.registrar_reserva_intervalo("Taller", cliente.id, sala.id, fecha, 12 * 60, 14 * 60)
+    assert db.cache_disponibilidad.estadisticas()["invalidaciones"] == 2
+    assert db.salas_disponibles(fecha, "M") == []
+    assert db.salas_disponibles(fecha, "V") == []
+    assert _ids(db.salas_disponibles(fecha, "N")) == [sala.id]
+    estadisticas = db.cache_disponibilidad.estadisticas()
+    assert (estadisticas["aciertos"], estadisticas["fallos"]) == (2, 5)
+
+def test_cancelacion_devuelve_la_sala(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    fecha = dia_reservable(db)
+    reserva = db.registrar_reserva("Junta", cliente.id, sala.id, fecha, "V")
+    assert db.salas_disponibles(fecha, "V") == []
+    db.cancelar_reservacion(reserva.folio)
+    assert _ids(db.salas_disponibles(fecha, "V")) == [sala.id]
+
+def test_escritura_de_otra_conexion_vacia_el_cache(tmp_path):
+    ruta = str(tmp_path / "coworking.db")
+    db = BaseDatos(ruta)
+    otra = BaseDatos(ruta)
+    try:
+        cliente = db.registrar_cliente("Ana", "López")
+        sala = db.registrar_sala("Sala A", 10)
+        fecha = dia_reservable(db)
+        assert _ids(db.salas_disponibles(fecha, "M")) == [sala.id]
+
+        otra.registrar_reserva("Junta", cliente.id, sala.id, fecha, "M")
+        assert db.salas_disponibles(fecha, "M") == []
+        assert db.cache_disponibilidad.estadisticas()["invalidaciones_globales"] == 1
+    finally:
+        otra.cerrar()
+        db.cerrar()
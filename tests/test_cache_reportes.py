@@ -0,0 +1,46 @@
+import os
+
+from cache_reportes import CacheReportes
+from conftest import dia_reservable
+from PIA_EDD import BaseDatos
+
+def _reporte_del_dia(db: BaseDatos, fecha) -> bytes:
+    def generar():
+        cursor = db.conn.cursor()
+        cursor.execute("SELECT evento FROM reservaciones WHERE dia = ?", (fecha.date().isoformat(),))
+        return ",".join(e for (e,) in cursor.fetchall()).encode("utf-8")
+    dia = fecha.date()
+    return db.cache_reportes.obtener(("tabla", dia, dia), db.version_datos(fecha, fecha), generar)
+
+def _base_con_evento(ruta: str, evento: str):
+    db = BaseDatos(ruta)
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    fecha = dia_reservable(db)
+    db.registrar_reserva(evento, cliente.id, sala.id, fecha, "M")
+    return db, fecha
+
+def test_base_recreada_no_sirve_reporte_viejo(tmp_path):
+    ruta = str(tmp_path / "t5.db")
+    db, dia = _base_con_evento(ruta, "Evento VIEJO")
+    assert _reporte_del_dia(db, dia) == b"Evento VIEJO"
+    db.cerrar()
+    os.remove(ruta)
+
+    db, dia_nuevo = _base_con_evento(ruta, "Evento NUEVO")
+    try:
+        assert dia_nuevo == dia
+        assert _reporte_del_dia(db, dia) == b"Evento NUEVO"
+    finally:
+        db.cerrar()
+
+def test_disco_limitado_a_capacidad(tmp_path):
+    cache = CacheReportes(str(tmp_path / "cache"), capacidad_disco=3)
+    for i in range(5):
+        cache.obtener(("tabla", i), 1, lambda i=i: f"reporte {i}".encode("utf-8"))
+    assert len(os.listdir(tmp_path / "cache")) == 3
+
+    cache.obtener(("tabla", 4), 2, lambda: b"reporte 4 v2")
+    archivos = os.listdir(tmp_path / "cache")
+    assert len(archivos) == 3
+    assert sum(nombre.endswith("_2") for nombre in archivos) == 1
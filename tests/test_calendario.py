@@ -0,0 +1,62 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from calendario import Calendario
+from conftest import dia_reservable
+
+# Lunes 7 de enero de 2030, con 30 días de horizonte (hasta el 5 de febrero)
+HOY = date(2030, 1, 7)
+CERRADOS = {date(2030, 1, 10): "Inventario", date(2030, 3, 5): "Feriado"}
+TEMPRANO = "La reservación debe ser al menos 2 días después de hoy."
+
+@pytest.fixture
+def calendario():
+    return Calendario(CERRADOS, inicio=HOY, dias=30)
+
+CASOS = [
+    (date(2030, 1, 8), TEMPRANO),
+    (date(2030, 1, 9), None),
+    (date(2030, 1, 10), "El coworking está cerrado ese día (Inventario)."),
+    (date(2030, 1, 13), "El coworking está cerrado ese día (Domingo)."),
+    # Fuera del horizonte
+    (date(2030, 3, 5), "El coworking está cerrado ese día (Feriado)."),
+    (date(2030, 3, 6), None),
+    (date(2030, 3, 10), "El coworking está cerrado ese día (Domingo)."),
+]
+
+def test_validar_lote(calendario):
+    fechas = [f for f, _ in CASOS]
+    assert calendario.validar_lote(fechas, hoy=HOY) == [e for _, e in CASOS]
+
+def test_validar_lote_con_arreglo_y_datetimes(calendario):
+    fechas = [f for f, _ in CASOS]
+    esperado = [e for _, e in CASOS]
+    assert calendario.validar_lote(np.array(fechas, dtype="datetime64[D]"), hoy=HOY) == esperado
+    assert calendario.validar_lote([datetime.combine(f, datetime.min.time()) for f in fechas], hoy=HOY) == esperado
+    assert calendario.validar_lote([], hoy=HOY) == []
+
+def test_validar_coincide_con_validar_lote(calendario):
+    for fecha, error in CASOS:
+        if error is None:
+            calendario.validar(fecha, hoy=HOY)
+        else:
+            with pytest.raises(ValueError, match=error.replace("(", r"\(").replace(")", r"\)")):
+                calendario.validar(fecha, hoy=HOY)
+
+def test_ajustar_lote(calendario):
+    fechas = [date(2030, 1, 8), date(2030, 1, 10), date(2030, 1, 13), date(2030, 2, 5), date(2030, 3, 5)]
+    esperado = [date(2030, 1, 9), date(2030, 1, 11), date(2030, 1, 14), date(2030, 2, 5), date(2030, 3, 6)]
+    assert calendario.ajustar_lote(fechas, hoy=HOY) == esperado
+    vectorizado = calendario.ajustar_lote(np.array(fechas, dtype="datetime64[D]"), hoy=HOY)
+    assert vectorizado.astype(date).tolist() == esperado
+
+def test_calendario_de_la_base_sigue_a_dias_cerrados(db):
+    dia = dia_reservable(db)
+    assert db.calendario().validar_lote([dia]) == [None]
+    db.cerrar_dias(dia, dia, "Mantenimiento")
+    assert db.calendario().validar_lote([dia]) == ["El coworking está cerrado ese día (Mantenimiento)."]
+    assert db.calendario().primer_dia_reservable() > dia.date()
+    db.abrir_dias(dia, dia)
+    assert db.calendario().validar_lote([dia]) == [None]
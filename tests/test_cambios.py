@@ -0,0 +1,65 @@
+import io
+import json
+
+import cambios
+from conftest import dia_reservable
+
+def _preparar(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    reserva = db.registrar_reserva("Junta", cliente.id, sala.id, dia_reservable(db), "M")
+    db.cancelar_reservacion(reserva.folio)
+    return reserva
+
+def _resumen(lista):
+    return [(c["seq"], c["tabla"], c["operacion"], c["clave"]) for c in lista]
+
+def test_registra_cada_cambio_con_la_fila_completa(db):
+    reserva = _preparar(db)
+
+    lista = list(db.cambios_desde())
+    assert _resumen(lista) == [
+        (1, "clientes", "INSERT", "C0001"),
+        (2, "salas", "INSERT", "S0001"),
+        (3, "reservaciones", "INSERT", str(reserva.folio)),
+        (4, "reservaciones", "UPDATE", str(reserva.folio)),
+    ]
+    assert lista[0]["datos"] == {"id": "C0001", "nombres": "Ana", "apellidos": "López"}
+    assert lista[3]["datos"]["estado"] == "cancelada"
+
+def test_ajustar_solo_dia_no_es_un_cambio(db):
+    reserva = _preparar(db)
+    db.conn.execute("UPDATE reservaciones SET dia = NULL WHERE folio = ?", (reserva.folio,))
+    db.conn.commit()
+    assert len(list(db.cambios_desde())) == 4
+
+def test_lee_por_lotes_desde_una_secuencia_y_con_limite(db):
+    _preparar(db)
+
+    assert [c["seq"] for c in db.cambios_desde(1, tamano_lote=2)] == [2, 3, 4]
+    assert [c["seq"] for c in db.cambios_desde(0, limite=3, tamano_lote=2)] == [1, 2, 3]
+    assert list(db.cambios_desde(4)) == []
+
+def test_exportar_cambios_escribe_ndjson(db):
+    _preparar(db)
+    salida = io.StringIO()
+
+    assert db.exportar_cambios(salida, seq=2) == 4
+    lineas = [json.loads(l) for l in salida.getvalue().splitlines()]
+    assert [c["seq"] for c in lineas] == [3, 4]
+    # Sin cambios nuevos se conserva la posición
+    assert db.exportar_cambios(io.StringIO(), seq=4) == 4
+
+def test_cli_continua_desde_la_posicion_guardada(db, tmp_path):
+    _preparar(db)
+    posicion, salida = str(tmp_path / "pos"), str(tmp_path / "cambios.ndjson")
+    argumentos = ["--db", db.db_file, "--posicion", posicion, "--salida", salida]
+
+    assert cambios.main(argumentos + ["--limite", "3"]) == 0
+    assert cambios.leer_posicion(posicion) == 3
+    db.registrar_cliente("Luis", "Pérez")
+    assert cambios.main(argumentos) == 0
+    assert cambios.leer_posicion(posicion) == 5
+
+    with open(salida, encoding="utf-8") as f:
+        assert [json.loads(l)["seq"] for l in f] == [1, 2, 3, 4, 5]
@@ -0,0 +1,43 @@
+from datetime import date, datetime
+
+import pytest
+
+from conftest import dia_reservable
+
+def test_cancela_el_rango_filtrado_y_rechaza_las_cercanas(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    a = db.registrar_sala("Sala A", 10)
+    b = db.registrar_sala("Sala B", 10)
+    # Un día abierto antes de la anticipación mínima: no se puede cancelar
+    cercano = datetime.combine(db.calendario().siguiente_abierto(date.today()), datetime.min.time())
+    dia0, dia1 = dia_reservable(db), dia_reservable(db, 1)
+    temprana = db.registrar_reserva("Junta", cliente.id, a.id, cercano, "M")
+    manana0 = db.registrar_reserva("Curso", cliente.id, a.id, dia0, "M")
+    tarde0 = db.registrar_reserva("Clase", cliente.id, a.id, dia0, "V")
+    otra_sala = db.registrar_reserva("Taller", cliente.id, b.id, dia0, "M")
+    manana1 = db.registrar_reserva("Posada", cliente.id, a.id, dia1, "M")
+    assert [s.id for s in db.salas_disponibles(dia0, "M")] == []
+
+    cancelados, rechazados = db.cancelar_lote(cercano, dia1, id_sala=a.id, turno="M")
+    assert cancelados == [manana0.folio, manana1.folio]
+    assert rechazados == [temprana.folio]
+    activas = {r.folio for r in db.reservas_en_rango(cercano, dia1)}
+    assert activas == {temprana.folio, tarde0.folio, otra_sala.folio}
+    assert [s.id for s in db.salas_disponibles(dia0, "M")] == [a.id]
+
+def test_promueve_la_lista_de_espera_de_cada_espacio_liberado(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    dias = [dia_reservable(db, i) for i in range(2)]
+    folios = [db.registrar_reserva("Junta", cliente.id, sala.id, d, "N").folio for d in dias]
+    db.agregar_lista_espera("Clase", cliente.id, dias[1], "N", id_sala=sala.id)
+
+    cancelados, _ = db.cancelar_lote(dias[0], dias[1])
+    assert cancelados == folios
+    assert db.promocion_por_cancelacion(folios[0]) is None
+    assert db.promocion_por_cancelacion(folios[1]).estado == "promovida"
+    assert [(r.evento, r.turno) for r in db.reservas_por_fecha(dias[1])] == [("Clase", "N")]
+
+def test_rango_invertido(db):
+    with pytest.raises(ValueError, match="anterior"):
+        db.cancelar_lote(dia_reservable(db, 1), dia_reservable(db))
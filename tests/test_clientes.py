@@ -0,0 +1,30 @@
+# La búsqueda difusa compara trigramas: encuentra un nombre si al menos el 40 % de los
+# trigramas buscados aparece en él. Eso tolera una letra cambiada o faltante en una
+# palabra larga, pero no una transposición en una palabra corta ("Lpoez" no comparte
+# ningún trigrama con "López").
+
+def _nombres(clientes):
+    return [f"{c.nombres} {c.apellidos}" for c in clientes]
+
+def test_difuso_tolera_una_letra_cambiada(db):
+    db.registrar_cliente("Luis", "Fernández")
+    db.registrar_cliente("Sofía", "Herrera")
+    db.registrar_cliente("Ana", "López")
+    assert _nombres(db.buscar_clientes("Fernandes", difuso=True)) == ["Luis Fernández"]
+    assert _nombres(db.buscar_clientes("Herera", difuso=True)) == ["Sofía Herrera"]
+
+def test_difuso_no_tolera_transposicion_corta(db):
+    db.registrar_cliente("Ana", "López")
+    assert db.buscar_clientes("Lpoez", difuso=True) == []
+
+def test_difuso_no_depende_del_rowid_de_clientes(db):
+    primero = db.registrar_cliente("Marta", "Ruiz")
+    db.registrar_cliente("Pedro", "Gómez")
+    db.registrar_cliente("Sofía", "Herrera")
+    db.conn.execute("DELETE FROM clientes WHERE id = ?", (primero.id,))
+    # Sin INTEGER PRIMARY KEY, VACUUM puede renumerar el rowid de clientes; aquí se
+    # renumera a mano para que la prueba no dependa de cuándo lo hace SQLite
+    db.conn.execute("UPDATE clientes SET rowid = rowid - 1")
+    db.conn.commit()
+    assert _nombres(db.buscar_clientes("Herrera", difuso=True)) == ["Sofía Herrera"]
+    assert _nombres(db.buscar_clientes("Pedro Gomes", difuso=True)) == ["Pedro Gómez"]
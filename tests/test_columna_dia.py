@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import dia_reservable
+
+def _preparar(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    dia0, dia1 = dia_reservable(db), dia_reservable(db, 1)
+    tarde = db.registrar_reserva("Clase", cliente.id, sala.id, dia1, "V")
+    manana = db.registrar_reserva("Junta", cliente.id, sala.id, dia0, "M")
+    cancelada = db.registrar_reserva("Curso", cliente.id, sala.id, dia0, "V")
+    db.cancelar_reservacion(cancelada.folio)
+    return dia0, dia1, manana, tarde
+
+def test_filas_en_rango_devuelve_tuplas_ordenadas_por_dia(db):
+    dia0, dia1, manana, tarde = _preparar(db)
+
+    filas = db.filas_en_rango(dia0, dia1)
+    assert filas == [
+        (manana.folio, dia0.date().isoformat()),
+        (tarde.folio, dia1.date().isoformat()),
+    ]
+    assert db.filas_en_rango(dia0, dia0, columnas=("evento", "turno")) == [("Junta", "M")]
+
+def test_filas_en_rango_nombradas(db):
+    dia0, _, manana, _ = _preparar(db)
+
+    filas = db.filas_en_rango(dia0, dia0, columnas=("folio", "dia", "evento"), nombradas=True)
+    assert [tuple(f) for f in filas] == [(manana.folio, dia0.date().isoformat(), "Junta")]
+    assert filas[0]["evento"] == "Junta"
+
+def test_filas_en_rango_rechaza_columnas_fuera_de_la_lista(db):
+    dia = dia_reservable(db)
+    with pytest.raises(ValueError, match="hora_inicio"):
+        db.filas_en_rango(dia, dia, columnas=("folio", "hora_inicio"))
+    with pytest.raises(ValueError):
+        db.filas_en_rango(dia, dia, columnas=())
+
+def test_dia_sigue_a_la_fecha(db):
+    dia0, _, manana, _ = _preparar(db)
+    nueva = datetime.combine(dia0.date() + timedelta(days=7), datetime.min.time())
+
+    db.conn.execute("UPDATE reservaciones SET fecha = ? WHERE folio = ?", (nueva, manana.folio))
+    db.conn.commit()
+
+    dia = db.conn.execute("SELECT dia FROM reservaciones WHERE folio = ?", (manana.folio,)).fetchone()[0]
+    assert dia == nueva.date().isoformat()
+    assert [r.folio for r in db.reservas_por_fecha(nueva)] == [manana.folio]
@@ -0,0 +1,28 @@
+import inspect
+
+from concurrente import METODOS_ESCRITURA, METODOS_LECTURA, METODOS_LOCALES, BaseDatosConcurrente
+from conftest import dia_reservable
+from PIA_EDD import BaseDatos
+
+def test_todo_metodo_publico_esta_clasificado():
+    publicos = {n for n, f in inspect.getmembers(BaseDatos, inspect.isfunction) if not n.startswith("_")}
+    assert publicos - METODOS_LECTURA - METODOS_ESCRITURA - METODOS_LOCALES == set()
+    assert (METODOS_LECTURA | METODOS_ESCRITURA | METODOS_LOCALES) - publicos == set()
+    assert not METODOS_LECTURA & METODOS_ESCRITURA
+
+def test_generadores_se_consumen_en_el_hilo_lector(tmp_path):
+    ruta = str(tmp_path / "coworking.db")
+    db = BaseDatos(ruta)
+    dia = dia_reservable(db)
+    db.cerrar()
+
+    concurrente = BaseDatosConcurrente(ruta, lectores=2)
+    try:
+        concurrente.registrar_cliente("Ana", "López").result()
+        assert concurrente.cerrar_dias(dia, dia, "Inventario").result() == 1
+        assert [d for d, _ in concurrente.dias_cerrados(dia).result()] == [dia.date()]
+        cambios = concurrente.cambios_desde(0).result()
+        assert isinstance(cambios, list)
+        assert [c["tabla"] for c in cambios] == ["clientes"]
+    finally:
+        concurrente.cerrar()
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from conftest import dia_reservable
+from exportacion_columnar import exportar_columnar
+
+def _folios(ruta):
+    with np.load(ruta) as datos:
+        return datos["folio"].tolist(), [datos["estado_categorias"][c] for c in datos["estado"]]
+
+def test_incluye_canceladas_futuras_archivadas(db, tmp_path):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    fecha = dia_reservable(db)
+    activa = db.registrar_reserva("Junta", cliente.id, sala.id, fecha, "M")
+    cancelada = db.registrar_reserva("Curso", cliente.id, sala.id, fecha, "V")
+    db.cancelar_reservacion(cancelada.folio)
+    # Archivar mueve las canceladas de cualquier fecha; el corte queda en hoy
+    db.archivar(datetime.today())
+
+    ruta, filas = exportar_columnar(db, fecha, fecha, str(tmp_path / "reservas.npz"))
+    assert filas == 2
+    assert _folios(ruta) == ([activa.folio, cancelada.folio], ["activa", "cancelada"])
+
+    _, filas = exportar_columnar(db, fecha, fecha, str(tmp_path / "vivas.npz"), incluir_historico=False)
+    assert filas == 1
+
+def test_rango_invalido_no_crea_el_archivo(db, tmp_path):
+    ruta = tmp_path / "reservas.npz"
+    with pytest.raises(ValueError, match="anterior"):
+        exportar_columnar(db, dia_reservable(db, 1), dia_reservable(db), str(ruta))
+    with pytest.raises(ValueError, match="lote"):
+        exportar_columnar(db, dia_reservable(db), dia_reservable(db), str(ruta), tamano_lote=0)
+    assert not ruta.exists()
+
+def test_rango_invalido_no_crea_el_parquet(db, tmp_path):
+    pytest.importorskip("pyarrow")
+    ruta = tmp_path / "reservas.parquet"
+    with pytest.raises(ValueError, match="anterior"):
+        exportar_columnar(db, dia_reservable(db, 1), dia_reservable(db), str(ruta))
+    assert not ruta.exists()
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+
+import federacion
+from conftest import dia_reservable
+from federacion import Federacion
+from PIA_EDD import BaseDatos, fecha_a_str
+
+def _sede(ruta, sala, cupo, evento, dia=None):
+    db = BaseDatos(ruta)
+    try:
+        cliente = db.registrar_cliente("Ana", "López")
+        s = db.registrar_sala(sala, cupo)
+        dia = dia or dia_reservable(db)
+        db.registrar_reserva(evento, cliente.id, s.id, dia, "M")
+    finally:
+        db.cerrar()
+    return dia
+
+def _sedes(tmp_path):
+    norte, sur = str(tmp_path / "norte.db"), str(tmp_path / "sur.db")
+    dia = _sede(norte, "Grande", 30, "Junta norte")
+    _sede(sur, "Chica", 8, "Junta sur", dia)
+    return {"NTE": norte, "SUR": sur}, dia
+
+def test_combina_las_sedes_con_su_clave(tmp_path):
+    sitios, dia = _sedes(tmp_path)
+    fed = Federacion(sitios)
+
+    assert [(sitio, s.nombre) for sitio, s in fed.salas_disponibles(dia, "V")] == [("SUR", "Chica"), ("NTE", "Grande")]
+    assert fed.salas_disponibles(dia, "M") == []
+    assert [(sitio, d.sala.nombre) for sitio, d in fed.buscar_sala_para(5, dia, "V", alternativas=0)] == [
+        ("SUR", "Chica")
+    ]
+    assert [(sitio, r.evento) for sitio, r in fed.buscar_reservas("junta")] == [
+        ("NTE", "Junta norte"), ("SUR", "Junta sur")
+    ]
+    assert [(f[0], f[4]) for f in fed.filas_reporte(dia, dia)] == [("NTE", "Junta norte"), ("SUR", "Junta sur")]
+    assert fed.errores == {}
+
+def test_una_sede_que_falla_no_impide_responder(tmp_path):
+    sitios, dia = _sedes(tmp_path)
+    sitios["OTE"] = str(tmp_path / "no_existe.db")
+    fed = Federacion(sitios)
+
+    assert [sitio for sitio, _ in fed.salas_disponibles(dia, "V")] == ["SUR", "NTE"]
+    assert list(fed.errores) == ["OTE"]
+
+def test_cli_avisa_de_la_sede_caida(tmp_path, capsys):
+    sitios, dia = _sedes(tmp_path)
+    argumentos = [f"--sitio={k}={v}" for k, v in sitios.items()] + [f"--sitio=OTE={tmp_path / 'no_existe.db'}"]
+
+    assert federacion.main(argumentos + ["disponibles", fecha_a_str(dia), "V"]) == 2
+    salida = capsys.readouterr().out
+    assert "⚠ La sede OTE no respondió" in salida
+    assert "Grande" in salida and "Chica" in salida
+
+def test_validaciones(tmp_path, capsys):
+    fed = Federacion()
+    with pytest.raises(ValueError):
+        fed.salas_disponibles(datetime.now(), "M")
+    fed.registrar("NTE", str(tmp_path / "norte.db"))
+    with pytest.raises(ValueError):
+        fed.registrar("NTE", str(tmp_path / "otra.db"))
+    with pytest.raises(ValueError):
+        fed.registrar("  ", str(tmp_path / "otra.db"))
+
+    assert federacion.main(["--sitio", "NTE", "buscar", "junta"]) == 1
+    assert "✗ Error: Sede inválida 'NTE'" in capsys.readouterr().out
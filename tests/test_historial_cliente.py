@@ -0,0 +1,69 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conftest import dia_reservable
+
+def _preparar(db):
+    ana = db.registrar_cliente("Ana", "López")
+    luis = db.registrar_cliente("Luis", "Pérez")
+    a = db.registrar_sala("Sala A", 10)
+    b = db.registrar_sala("Sala B", 10)
+    # Una reservación pasada que termina en el histórico al archivar
+    pasado = datetime.combine(date.today() - timedelta(days=5), datetime.min.time())
+    db.conn.execute("""
+        INSERT INTO reservaciones (evento, id_cliente, id_sala, fecha, turno, estado)
+        VALUES ('Pasada', ?, ?, ?, 'M', 'activa')
+    """, (ana.id, b.id, pasado))
+    db.conn.commit()
+    dia0, dia1 = dia_reservable(db), dia_reservable(db, 1)
+    folios = [
+        db.registrar_reserva("Junta", ana.id, a.id, dia0, "M").folio,
+        db.registrar_reserva("Curso", ana.id, a.id, dia0, "V").folio,
+        db.registrar_reserva("Taller", ana.id, b.id, dia1, "M").folio,
+        db.registrar_reserva("Posada", ana.id, a.id, dia1, "V").folio,
+    ]
+    db.registrar_reserva("Ajena", luis.id, b.id, dia0, "M")
+    db.cancelar_reservacion(folios[2])
+    db.archivar()
+    return ana, a, b, [1] + folios
+
+def _paginas(db, id_cliente, limite):
+    paginas, despues_de = [], None
+    while True:
+        pagina = db.historial_cliente(id_cliente, limite=limite, despues_de=despues_de)
+        if not pagina:
+            return paginas
+        paginas.append([r.folio for r in pagina])
+        despues_de = (pagina[-1].fecha.date().isoformat(), pagina[-1].folio)
+
+def test_historial_pagina_por_llave_entre_ambas_tablas(db):
+    ana, _, _, folios = _preparar(db)
+    pasada, junta, curso, taller, posada = folios
+
+    # De la más reciente a la más antigua, sin repetir ni saltar entre páginas
+    assert _paginas(db, ana.id, 2) == [[posada, taller], [curso, junta], [pasada]]
+    assert _paginas(db, ana.id, 10) == [[posada, taller, curso, junta, pasada]]
+    with pytest.raises(ValueError):
+        db.historial_cliente(ana.id, limite=0)
+
+def test_estadisticas_cliente(db):
+    ana, a, _, _ = _preparar(db)
+
+    estadisticas = db.estadisticas_cliente(ana.id, salas_favoritas=1)
+    assert estadisticas["total"] == 5
+    assert estadisticas["por_estado"] == {"activa": 4, "cancelada": 1}
+    assert estadisticas["tasa_cancelacion"] == pytest.approx(0.2)
+    assert estadisticas["proximas"] == 3
+    assert estadisticas["primera"] == date.today() - timedelta(days=5)
+    assert estadisticas["ultima"] == dia_reservable(db, 1).date()
+    # Las canceladas no cuentan para las salas favoritas
+    assert estadisticas["salas_favoritas"] == [(a.id, 3)]
+
+def test_estadisticas_de_cliente_sin_reservaciones(db):
+    cliente = db.registrar_cliente("Eva", "Ruiz")
+    estadisticas = db.estadisticas_cliente(cliente.id)
+    assert estadisticas["total"] == 0
+    assert estadisticas["tasa_cancelacion"] == 0.0
+    assert estadisticas["primera"] is None
+    assert estadisticas["salas_favoritas"] == []
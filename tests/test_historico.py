@@ -0,0 +1,62 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conftest import dia_reservable
+
+def _folios(reservas):
+    return [r.folio for r in reservas]
+
+def _preparar(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    # Las reservaciones pasadas solo pueden venir de datos anteriores
+    pasado = datetime.combine(date.today() - timedelta(days=10), datetime.min.time())
+    db.conn.execute("""
+        INSERT INTO reservaciones (evento, id_cliente, id_sala, fecha, turno, estado)
+        VALUES ('Pasada', ?, ?, ?, 'M', 'activa')
+    """, (cliente.id, sala.id, pasado))
+    db.conn.commit()
+    dia = dia_reservable(db)
+    futura = db.registrar_reserva("Futura", cliente.id, sala.id, dia, "M")
+    cancelada = db.registrar_reserva("Cancelada", cliente.id, sala.id, dia, "V")
+    db.cancelar_reservacion(cancelada.folio)
+    return pasado, dia, futura, cancelada
+
+def test_archiva_las_pasadas_y_las_canceladas(db):
+    _, _, futura, cancelada = _preparar(db)
+
+    assert db.archivar() == 2
+    assert db.corte_historico() == date.today()
+    assert db.conn.execute("SELECT folio FROM reservaciones").fetchall() == [(futura.folio,)]
+    assert db.conn.execute("SELECT folio FROM reservaciones_historico ORDER BY folio").fetchall() == [
+        (1,), (cancelada.folio,)
+    ]
+    # Los índices de la tabla caliente ya no las incluyen
+    assert db.conn.execute("SELECT folio FROM intervalos").fetchall() == [(futura.folio,)]
+    assert db.buscar_reservas("pasada", solo_activas=False) == []
+
+def test_rangos_anteriores_al_corte_unen_el_historico(db):
+    pasado, dia, futura, _ = _preparar(db)
+    db.archivar()
+
+    assert _folios(db.reservas_en_rango(pasado, dia)) == [1, futura.folio]
+    assert _folios(db.reservas_en_rango(pasado, dia, incluir_historico=False)) == [futura.folio]
+    assert db._tablas_reservaciones(date.today(), incluir_historico=True) == ["reservaciones"]
+    assert db._tablas_reservaciones(pasado.date(), incluir_historico=True) == [
+        "reservaciones", "reservaciones_historico"
+    ]
+    # Las canceladas se archivan sin importar su fecha
+    assert db._tablas_reservaciones(date.today(), incluir_historico=True, solo_activas=False) == [
+        "reservaciones", "reservaciones_historico"
+    ]
+
+def test_el_corte_no_puede_ser_futuro_ni_retroceder(db):
+    _preparar(db)
+    with pytest.raises(ValueError):
+        db.archivar(datetime.now() + timedelta(days=1))
+    assert db.corte_historico() is None
+
+    db.archivar()
+    assert db.archivar(datetime.now() - timedelta(days=30)) == 0
+    assert db.corte_historico() == date.today()
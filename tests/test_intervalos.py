@@ -0,0 +1,55 @@
+import sqlite3
+from datetime import timedelta
+
+import pytest
+
+from analitica import ORDEN_TURNOS, cargar_cubo
+from asignacion import Solicitud, planear
+from conftest import dia_reservable
+
+def _reservar_intervalo(db, inicio, fin):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    fecha = dia_reservable(db)
+    db.registrar_reserva_intervalo("Taller", cliente.id, sala.id, fecha, inicio, fin)
+    return cliente, sala, fecha
+
+def test_cubo_cuenta_reservaciones_por_horario(db):
+    # 12:00-14:00 se cruza con la mañana (08-13) y con la tarde (13-18)
+    _, _, fecha = _reservar_intervalo(db, 12 * 60, 14 * 60)
+    cubo = cargar_cubo(db, fecha, fecha + timedelta(days=1))
+    assert cubo.ocupado.sum() == 2
+    assert list(cubo.ocupado[0, 0]) == [t in ("M", "V") for t in ORDEN_TURNOS]
+
+def test_asignacion_respeta_reservaciones_por_horario(db):
+    cliente, sala, fecha = _reservar_intervalo(db, 9 * 60, 10 * 60)
+    resultado = planear(db, [
+        Solicitud("Junta", cliente.id, 5, [(fecha, "M")]),
+        Solicitud("Clase", cliente.id, 5, [(fecha, "N")]),
+    ])
+    assert [(a.solicitud.evento, a.turno, a.sala.id) for a in resultado.asignadas] == [("Clase", "N", sala.id)]
+    assert [s.evento for s in resultado.sin_lugar] == ["Junta"]
+
+def test_buscar_sala_salta_dias_ocupados_por_turno_y_por_horario(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    dias = [dia_reservable(db, i) for i in range(3)]
+    db.registrar_reserva("Junta", cliente.id, sala.id, dias[0], "M")
+    db.registrar_reserva_intervalo("Taller", cliente.id, sala.id, dias[1], 12 * 60, 14 * 60)
+
+    assert [(o.fecha, o.turno) for o in db.buscar_sala_para(5, dias[0], "M")] == [(dias[2], "M")]
+    assert [(o.fecha, o.turno) for o in db.buscar_sala_para(5, dias[0], "V")] == [(dias[0], "V")]
+    assert [(o.fecha, o.turno) for o in db.buscar_sala_para(5, dias[1], "N")] == [(dias[1], "N")]
+
+def test_indice_unico_impide_dos_turnos_activos_en_el_mismo_espacio(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    fecha = dia_reservable(db)
+    db.registrar_reserva("Junta", cliente.id, sala.id, fecha, "M")
+    with pytest.raises(sqlite3.IntegrityError):
+        db.conn.execute("""
+            INSERT INTO reservaciones (evento, id_cliente, id_sala, fecha, dia, turno, estado)
+            VALUES ('Otra', ?, ?, ?, ?, 'M', 'activa')
+        """, (cliente.id, sala.id, fecha, fecha.date().isoformat()))
+    db.conn.rollback()
+    assert db.reconstruir_ocupacion() == 1
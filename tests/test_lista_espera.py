@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import dia_reservable
+
+@pytest.fixture
+def ocupada(db):
+    # Un cliente, una sala chica ya reservada en la mañana y una sala grande libre
+    cliente = db.registrar_cliente("Ana", "López")
+    chica = db.registrar_sala("Sala Chica", 4)
+    grande = db.registrar_sala("Sala Grande", 20)
+    fecha = dia_reservable(db)
+    reserva = db.registrar_reserva("Junta", cliente.id, chica.id, fecha, "M")
+    return cliente, chica, grande, fecha, reserva
+
+def test_rechaza_fecha_sin_anticipacion(db, ocupada):
+    cliente, chica, _, _, _ = ocupada
+    with pytest.raises(ValueError, match="días después de hoy"):
+        db.agregar_lista_espera("Clase", cliente.id, datetime.today(), "M", id_sala=chica.id)
+
+def test_rechaza_dia_cerrado(db, ocupada):
+    cliente, chica, _, _, _ = ocupada
+    cerrado = dia_reservable(db, 1)
+    db.cerrar_dias(cerrado, cerrado, "Inventario")
+    with pytest.raises(ValueError, match="cerrado"):
+        db.agregar_lista_espera("Clase", cliente.id, cerrado, "M", id_sala=chica.id)
+
+def test_rechaza_espacio_libre(db, ocupada):
+    cliente, chica, grande, fecha, _ = ocupada
+    with pytest.raises(ValueError, match="libre"):
+        db.agregar_lista_espera("Clase", cliente.id, fecha, "V", id_sala=chica.id)
+    with pytest.raises(ValueError, match="libre"):
+        db.agregar_lista_espera("Clase", cliente.id, fecha, "M", id_sala=grande.id)
+    # Sin sala, basta con que haya una libre con cupo suficiente
+    with pytest.raises(ValueError, match="libres"):
+        db.agregar_lista_espera("Clase", cliente.id, fecha, "M", cupo_minimo=10)
+    assert db.lista_espera_pendiente() == []
+
+def test_acepta_espacio_ocupado(db, ocupada):
+    cliente, chica, grande, fecha, _ = ocupada
+    db.registrar_reserva("Curso", cliente.id, grande.id, fecha, "M")
+    db.agregar_lista_espera("Clase", cliente.id, fecha, "M", id_sala=chica.id)
+    db.agregar_lista_espera("Taller", cliente.id, fecha, "M", cupo_minimo=10)
+    assert [e.evento for e in db.lista_espera_pendiente()] == ["Clase", "Taller"]
+
+def test_cancelacion_promueve_primera_solicitud_compatible(db, ocupada):
+    cliente, chica, grande, fecha, reserva = ocupada
+    db.registrar_reserva("Curso", cliente.id, grande.id, fecha, "M")
+    db.agregar_lista_espera("Taller", cliente.id, fecha, "M", cupo_minimo=10)
+    clase = db.agregar_lista_espera("Clase", cliente.id, fecha, "M", id_sala=chica.id)
+
+    db.cancelar_reservacion(reserva.folio)
+    promovida = db.promocion_por_cancelacion(reserva.folio)
+    # "Taller" llegó antes pero no cabe en la sala chica
+    assert (promovida.id, promovida.estado) == (clase.id, "promovida")
+    assert [(r.folio, r.evento) for r in db.reservas_por_fecha(fecha) if r.id_sala == chica.id] == [
+        (promovida.folio, "Clase")
+    ]
+    assert [e.evento for e in db.lista_espera_pendiente()] == ["Taller"]
+
+def test_no_promueve_si_el_turno_sigue_parcialmente_ocupado(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    sala = db.registrar_sala("Sala A", 10)
+    fecha = dia_reservable(db)
+    primera = db.registrar_reserva_intervalo("Taller", cliente.id, sala.id, fecha, 8 * 60, 9 * 60)
+    db.registrar_reserva_intervalo("Curso", cliente.id, sala.id, fecha, 10 * 60, 11 * 60)
+    db.agregar_lista_espera("Clase", cliente.id, fecha, "M", id_sala=sala.id)
+
+    db.cancelar_reservacion(primera.folio)
+    assert db.promocion_por_cancelacion(primera.folio) is None
+    assert [e.evento for e in db.lista_espera_pendiente()] == ["Clase"]
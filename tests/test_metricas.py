@@ -0,0 +1,91 @@
+import json
+import threading
+
+import pytest
+
+import metricas
+from metricas import LIMITES, Registro
+
+def test_los_tramos_anidados_se_nombran_con_la_ruta():
+    registro = Registro()
+    with registro.tramo("opcion"):
+        with registro.tramo("sql"):
+            pass
+        with registro.tramo("sql"):
+            pass
+    with pytest.raises(ValueError):
+        with registro.tramo("opcion"):
+            raise ValueError("falla")
+    # La pila se vacía aunque el tramo termine con una excepción
+    with registro.tramo("entrada"):
+        pass
+
+    cuentas = {ruta: h["cuenta"] for ruta, h in registro.instantanea().items()}
+    assert cuentas == {"entrada": 1, "opcion": 2, "opcion/sql": 2}
+
+def test_cada_hilo_lleva_su_propia_pila():
+    registro = Registro()
+    listo, seguir = threading.Event(), threading.Event()
+
+    def otro_hilo():
+        with registro.tramo("hilo"):
+            listo.set()
+            seguir.wait()
+
+    hilo = threading.Thread(target=otro_hilo)
+    hilo.start()
+    listo.wait()
+    with registro.tramo("principal"):
+        pass
+    seguir.set()
+    hilo.join()
+
+    assert sorted(registro.instantanea()) == ["hilo", "principal"]
+
+def test_histograma_por_cubetas():
+    h = metricas.Histograma()
+    for segundos in (0.0005, 0.001, 0.003, 60.0):
+        h.observar(segundos)
+    assert h.cubetas[:3] == [2, 0, 1]
+    assert h.cubetas[-1] == 1
+    assert h.cuenta == 4
+    assert h.suma == pytest.approx(60.0045)
+
+def _registro_fijo():
+    registro = Registro()
+    for segundos in (0.002, 0.02):
+        registro.histogramas.setdefault('opcion/"sql"', metricas.Histograma()).observar(segundos)
+    return registro
+
+def test_formato_prometheus_acumula_las_cubetas():
+    lineas = _registro_fijo().como_prometheus().splitlines()
+
+    assert lineas[1] == "# TYPE coworking_tramo_segundos histogram"
+    cubetas = [l for l in lineas if "_bucket" in l]
+    assert len(cubetas) == len(LIMITES) + 1
+    assert cubetas[0] == 'coworking_tramo_segundos_bucket{tramo="opcion/\\"sql\\"",le="0.001"} 0'
+    assert cubetas[2] == 'coworking_tramo_segundos_bucket{tramo="opcion/\\"sql\\"",le="0.005"} 1'
+    assert cubetas[-1] == 'coworking_tramo_segundos_bucket{tramo="opcion/\\"sql\\"",le="+Inf"} 2'
+    assert lineas[-1] == 'coworking_tramo_segundos_count{tramo="opcion/\\"sql\\""} 2'
+
+def test_escribir_elige_el_formato_por_la_extension(tmp_path):
+    registro = _registro_fijo()
+    registro.ruta = str(tmp_path / "metricas.json")
+    registro.escribir()
+    with open(registro.ruta, encoding="utf-8") as f:
+        tramo = json.load(f)["tramos"]['opcion/"sql"']
+    assert tramo["cuenta"] == 2
+    assert tramo["promedio_segundos"] == pytest.approx(0.011)
+    assert tramo["cubetas"]["+Inf"] == 0
+
+    registro.ruta = str(tmp_path / "metricas.prom")
+    registro.escribir()
+    with open(registro.ruta, encoding="utf-8") as f:
+        assert f.read() == registro.como_prometheus()
+
+def test_sin_activar_tramo_no_mide_nada():
+    if metricas.REGISTRO is not None:
+        pytest.skip("COWORKING_METRICAS está activo")
+    assert metricas.tramo("sql") is metricas.tramo("tabla")
+    with metricas.tramo("sql"):
+        pass
@@ -0,0 +1,96 @@
+import sqlite3
+
+import auditoria
+from PIA_EDD import MIGRACIONES, BaseDatos
+
+# Esquema de la primera versión, antes de que existiera PRAGMA user_version
+ESQUEMA_BASE = """
+    CREATE TABLE clientes (
+        id TEXT PRIMARY KEY,
+        nombres TEXT NOT NULL,
+        apellidos TEXT NOT NULL
+    );
+    CREATE TABLE salas (
+        id TEXT PRIMARY KEY,
+        nombre TEXT NOT NULL,
+        cupo INTEGER NOT NULL
+    );
+    CREATE TABLE reservaciones (
+        folio INTEGER PRIMARY KEY AUTOINCREMENT,
+        evento TEXT NOT NULL,
+        id_cliente TEXT NOT NULL,
+        id_sala TEXT NOT NULL,
+        fecha timestamp NOT NULL,
+        turno TEXT NOT NULL,
+        estado TEXT NOT NULL DEFAULT 'activa',
+        FOREIGN KEY (id_cliente) REFERENCES clientes(id),
+        FOREIGN KEY (id_sala) REFERENCES salas(id)
+    );
+    CREATE TABLE contadores (
+        tipo TEXT PRIMARY KEY,
+        valor INTEGER NOT NULL
+    );
+    INSERT INTO contadores VALUES ('C', 1), ('S', 2);
+    INSERT INTO clientes VALUES ('C0001', 'Ana', 'López');
+    INSERT INTO salas VALUES ('S0001', 'Sala A', 10), ('S0002', 'Sala B', 4);
+    INSERT INTO reservaciones (evento, id_cliente, id_sala, fecha, turno, estado) VALUES
+        ('Junta', 'C0001', 'S0001', '2030-01-07 00:00:00', 'M', 'activa'),
+        ('Taller', 'C0001', 'S0002', '2030-01-07 00:00:00', 'V', 'cancelada'),
+        ('Curso', 'C0001', 'S0001', '2030-01-08 00:00:00', 'N', 'activa'),
+        ('Repetida', 'C0001', 'S0001', '2030-01-08 00:00:00', 'N', 'activa');
+"""
+
+def _base_original(ruta):
+    conn = sqlite3.connect(ruta)
+    conn.executescript(ESQUEMA_BASE)
+    conn.close()
+
+def _esquema(conn):
+    return conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY type, name").fetchall()
+
+def _reservaciones(conn):
+    return conn.execute("""
+        SELECT folio, evento, id_sala, dia, turno, estado FROM reservaciones ORDER BY folio
+    """).fetchall()
+
+def test_migra_la_base_original_hasta_la_ultima_version(tmp_path):
+    ruta = str(tmp_path / "original.db")
+    _base_original(ruta)
+
+    db = BaseDatos(ruta)
+    try:
+        assert db.version_esquema() == len(MIGRACIONES)
+        assert _reservaciones(db.conn) == [
+            (1, "Junta", "S0001", "2030-01-07", "M", "activa"),
+            (2, "Taller", "S0002", "2030-01-07", "V", "cancelada"),
+            (3, "Curso", "S0001", "2030-01-08", "N", "activa"),
+            # Dos activas en el mismo turno: se conserva la de menor folio
+            (4, "Repetida", "S0001", "2030-01-08", "N", "cancelada"),
+        ]
+        assert db.conn.execute("SELECT folio FROM intervalos ORDER BY folio").fetchall() == [(1,), (3,)]
+        assert db.conn.execute("SELECT tipo, valor FROM contadores ORDER BY tipo").fetchall() == [
+            ("C", 1), ("S", 2)
+        ]
+        assert db.registrar_cliente("Luis", "Pérez").id == "C0002"
+        assert not any(h.cantidad for h in auditoria.auditar(db))
+    finally:
+        db.cerrar()
+
+def test_reabrir_una_base_migrada_no_la_modifica(tmp_path):
+    ruta = str(tmp_path / "original.db")
+    _base_original(ruta)
+    BaseDatos(ruta).cerrar()
+
+    conn = sqlite3.connect(ruta)
+    esquema, datos = _esquema(conn), _reservaciones(conn)
+    conn.close()
+
+    db = BaseDatos(ruta)
+    try:
+        assert db.version_esquema() == len(MIGRACIONES)
+        assert _esquema(db.conn) == esquema
+        assert _reservaciones(db.conn) == datos
+        # Con el esquema al día la apertura no escribe nada
+        assert db.conn.total_changes == 0
+    finally:
+        db.cerrar()
@@ -0,0 +1,67 @@
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import reportes_lote
+from conftest import dia_reservable
+from PIA_EDD import fecha_a_str
+
+def _preparar(db):
+    cliente = db.registrar_cliente("Ana", "López")
+    a = db.registrar_sala("Sala A", 10)
+    b = db.registrar_sala("Sala B", 20)
+    dia0, dia1 = dia_reservable(db), dia_reservable(db, 1)
+    db.registrar_reserva("Junta", cliente.id, a.id, dia0, "M")
+    db.registrar_reserva("Curso", cliente.id, b.id, dia0, "V")
+    db.registrar_reserva("Taller", cliente.id, a.id, dia1, "N")
+    return dia0, dia1, a, b
+
+def _filas_csv(ruta):
+    with open(ruta, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))[1:]
+
+def test_tramos_cubren_el_rango_sin_huecos():
+    desde = datetime(2030, 1, 1)
+    tramos = reportes_lote._tramos_de_dias(desde, datetime(2030, 1, 10), 4)
+    assert [(a.day, b.day) for a, b in tramos] == [(1, 3), (4, 6), (7, 9), (10, 10)]
+    assert reportes_lote._tramos_de_dias(desde, desde, 8) == [(desde, desde)]
+
+def test_un_reporte_por_dia_en_cada_formato(db, tmp_path):
+    dia0, dia1, _, _ = _preparar(db)
+
+    rutas, libro = reportes_lote.generar_lote(db.db_file, dia0, dia1, formatos=("csv", "json"),
+                                              directorio=str(tmp_path), procesos=2, progreso=None)
+
+    nombres = [f"reporte_{fecha_a_str(d).replace('-', '')}" for d in (dia0, dia1)]
+    assert [os.path.basename(r) for r in rutas] == [
+        nombres[0] + ".csv", nombres[0] + ".json", nombres[1] + ".csv", nombres[1] + ".json"
+    ]
+    assert libro is None
+    assert [f[1] for f in _filas_csv(rutas[0])] == ["Junta", "Curso"]
+    with open(rutas[3], encoding="utf-8") as f:
+        assert [r["Evento"] for r in json.load(f)] == ["Taller"]
+
+def test_un_reporte_por_sala_y_libro(db, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    dia0, dia1, a, b = _preparar(db)
+
+    rutas, libro = reportes_lote.generar_lote(db.db_file, dia0, dia1, agrupar="sala", directorio=str(tmp_path),
+                                              procesos=2, libro=True, progreso=None)
+
+    assert [os.path.basename(r) for r in rutas] == [f"reporte_{a.id}.csv", f"reporte_{b.id}.csv"]
+    assert [f[1] for f in _filas_csv(rutas[0])] == ["Junta", "Taller"]
+    assert openpyxl.load_workbook(libro).sheetnames == [f"{a.id} Sala A", f"{b.id} Sala B"]
+
+def test_validaciones(db, tmp_path):
+    dia = dia_reservable(db)
+    with pytest.raises(ValueError):
+        reportes_lote.generar_lote(db.db_file, dia, dia - timedelta(days=1), directorio=str(tmp_path))
+    with pytest.raises(ValueError):
+        reportes_lote.generar_lote(db.db_file, dia, dia, agrupar="mes", directorio=str(tmp_path))
+    with pytest.raises(ValueError):
+        reportes_lote.generar_lote(db.db_file, dia, dia, formatos=("pdf",), directorio=str(tmp_path))
+    with pytest.raises(ValueError):
+        reportes_lote.generar_lote(db.db_file, dia, dia, formatos=(), directorio=str(tmp_path))
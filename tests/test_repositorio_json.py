@@ -0,0 +1,61 @@
+import json
+import os
+
+from untitled2 import Repositorio
+
+def _reserva(folio, fecha, evento="Junta"):
+    return {"folio": folio, "evento": evento, "id_cliente": "C0001", "id_sala": "S0001", "fecha": fecha, "turno": "M"}
+
+def _archivo_anterior(ruta):
+    # Formato previo a los archivos por mes: todas las reservaciones en el índice
+    data = {
+        "clientes": [{"id": "C0001", "nombres": "Ana", "apellidos": "López"}],
+        "salas": [{"id": "S0001", "nombre": "Sala A", "cupo": 10}],
+        "reservas": [_reserva("R0001", "2031-01-10"), _reserva("R0002", "2031-02-03"), _reserva("R0003", "2031-01-20")],
+        "contadores": {"C": 1, "S": 1, "R": 3},
+    }
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def _leer(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+def test_migra_archivo_anterior_a_un_archivo_por_mes(tmp_path):
+    ruta = str(tmp_path / "data.json")
+    _archivo_anterior(ruta)
+    Repositorio(ruta)
+
+    indice = _leer(ruta)
+    assert "reservas" not in indice
+    assert indice["meses"] == ["2031-01", "2031-02"]
+    assert sorted(os.listdir(tmp_path / "data_reservas")) == ["2031-01.json", "2031-02.json"]
+    assert [r["folio"] for r in _leer(tmp_path / "data_reservas" / "2031-01.json")] == ["R0001", "R0003"]
+
+    repo = Repositorio(ruta)
+    assert [r.folio for r in repo.reservas_en_rango("2031-01-01", "2031-02-28")] == ["R0001", "R0003", "R0002"]
+    assert repo._contadores["R"] == 3
+
+def test_carga_solo_los_meses_consultados(tmp_path):
+    ruta = str(tmp_path / "data.json")
+    _archivo_anterior(ruta)
+    Repositorio(ruta)
+
+    repo = Repositorio(ruta)
+    assert repo._cargados == {}
+    assert [r.folio for r in repo.reservas_por_fecha("2031-02-03")] == ["R0002"]
+    assert set(repo._cargados) == {"2031-02"}
+    assert repo.hay_reservas()
+
+def test_guardar_reescribe_solo_el_mes_modificado(tmp_path):
+    ruta = str(tmp_path / "data.json")
+    _archivo_anterior(ruta)
+    Repositorio(ruta)
+    febrero = tmp_path / "data_reservas" / "2031-02.json"
+    os.utime(febrero, ns=(0, 0))
+
+    repo = Repositorio(ruta)
+    repo.editar_nombre_evento("R0003", "Taller")
+    assert os.stat(febrero).st_mtime_ns == 0
+    assert [r["evento"] for r in _leer(tmp_path / "data_reservas" / "2031-01.json")] == ["Junta", "Taller"]
+    assert Repositorio(ruta).reservas["R0003"].evento == "Taller"
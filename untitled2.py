@@ -51,12 +51,25 @@ class Reservacion:
 # Capa de datos y utilidades
 # -----------------------------
 
+def _escribir_json(ruta: str, data) -> None:
+    # Se escribe a un temporal y se reemplaza, así un corte no deja el archivo a medias
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+
+# Clientes, salas y contadores viven en data_file; las reservaciones, en un archivo por
+# mes (AAAA-MM.json) dentro de la carpeta <data_file sin extensión>_reservas. Cada mes se
+# lee la primera vez que se consulta y al guardar solo se reescriben los meses modificados.
 class Repositorio:
     def __init__(self, data_file: str = DATA_FILE) -> None:
         self.data_file = data_file
+        self.dir_reservas = os.path.splitext(data_file)[0] + "_reservas"
         self.clientes: Dict[str, Cliente] = {}
         self.salas: Dict[str, Sala] = {}
-        self.reservas: Dict[str, Reservacion] = {}
+        self._meses: set = set()
+        self._cargados: Dict[str, Dict[str, Reservacion]] = {}
+        self._sucios: set = set()
         self._contadores = {"C": 0, "S": 0, "R": 0}
         self._cargar()
 
@@ -79,20 +92,71 @@ class Repositorio:
             self.clientes[c["id"]] = Cliente(**c)
         for s in data.get("salas", []):
             self.salas[s["id"]] = Sala(**s)
-        for r in data.get("reservas", []):
-            self.reservas[r["folio"]] = Reservacion(**r)
+        self._meses = set(data.get("meses", []))
 
         self._contadores = data.get("contadores", {"C": 0, "S": 0, "R": 0})
 
+        # Archivo de la versión anterior, con todas las reservaciones: se reparte por mes
+        if "reservas" in data:
+            for r in data["reservas"]:
+                reserva = Reservacion(**r)
+                self._mes_cargado(reserva.fecha[:7])[reserva.folio] = reserva
+                self._sucios.add(reserva.fecha[:7])
+            self._guardar()
+
+    def _ruta_mes(self, mes: str) -> str:
+        return os.path.join(self.dir_reservas, f"{mes}.json")
+
+    def _mes_cargado(self, mes: str) -> Dict[str, Reservacion]:
+        # Reservaciones del mes (AAAA-MM), leyendo su archivo solo la primera vez
+        if mes not in self._cargados:
+            reservas: Dict[str, Reservacion] = {}
+            if mes in self._meses:
+                try:
+                    with open(self._ruta_mes(mes), "r", encoding="utf-8") as f:
+                        for r in json.load(f):
+                            reservas[r["folio"]] = Reservacion(**r)
+                except FileNotFoundError:
+                    pass
+            self._cargados[mes] = reservas
+            self._meses.add(mes)
+        return self._cargados[mes]
+
+    def _meses_en_rango(self, d1: date, d2: date) -> List[str]:
+        meses = []
+        anio, mes = d1.year, d1.month
+        while (anio, mes) <= (d2.year, d2.month):
+            clave = f"{anio:04d}-{mes:02d}"
+            if clave in self._meses:
+                meses.append(clave)
+            anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+        return meses
+
     def _guardar(self) -> None:
+        # Primero los meses modificados y al final el índice, que ya los nombra
+        if self._sucios:
+            os.makedirs(self.dir_reservas, exist_ok=True)
+        for mes in sorted(self._sucios):
+            _escribir_json(self._ruta_mes(mes), [asdict(r) for r in self._cargados[mes].values()])
+        self._sucios.clear()
         data = {
             "clientes": [asdict(c) for c in self.clientes.values()],
             "salas": [asdict(s) for s in self.salas.values()],
-            "reservas": [asdict(r) for r in self.reservas.values()],
+            "meses": sorted(m for m in self._meses if self._cargados.get(m, True)),
             "contadores": self._contadores,
         }
-        with open(self.data_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        _escribir_json(self.data_file, data)
+
+    @property
+    def reservas(self) -> Dict[str, Reservacion]:
+        # Todas las reservaciones; carga cada mes pendiente, úsese solo cuando haga falta el total
+        todas: Dict[str, Reservacion] = {}
+        for mes in sorted(self._meses):
+            todas.update(self._mes_cargado(mes))
+        return todas
+
+    def hay_reservas(self) -> bool:
+        return any(self._cargados.get(mes, True) for mes in self._meses)
 
     # -----------------------------
     # (Christopher de Jesus) Gestión de clientes
@@ -156,7 +220,7 @@ class Repositorio:
         if turno not in TURNOS:
             raise ValueError("Turno inválido. Use M, T o N.")
 
-        ocupadas = {r.id_sala for r in self.reservas.values() if r.fecha == fecha_iso and r.turno == turno}
+        ocupadas = {r.id_sala for r in self._mes_cargado(fecha_iso[:7]).values() if r.fecha == fecha_iso and r.turno == turno}
         return [s for s in self.salas.values() if s.id not in ocupadas]
 
     def registrar_reserva(self, evento: str, id_cliente: str, id_sala: str, fecha_iso: str, turno: str) -> Reservacion:
@@ -172,7 +236,8 @@ class Repositorio:
         if turno not in TURNOS:
             raise ValueError("Turno inválido. Use M, T o N.")
 
-        for r in self.reservas.values():
+        reservas_mes = self._mes_cargado(fecha_iso[:7])
+        for r in reservas_mes.values():
             if r.id_sala == id_sala and r.fecha == fecha_iso and r.turno == turno:
                 raise ValueError("Ya existe una reservación en esa sala para la fecha y turno seleccionados.")
 
@@ -185,7 +250,8 @@ class Repositorio:
             fecha=fecha_iso,
             turno=turno
         )
-        self.reservas[rid] = reserva
+        reservas_mes[rid] = reserva
+        self._sucios.add(fecha_iso[:7])
         self._guardar()
         return reserva
 
@@ -203,22 +269,34 @@ class Repositorio:
             raise ValueError("La fecha final no puede ser anterior a la inicial.")
 
         res = []
-        for r in self.reservas.values():
-            rf = datetime.strptime(r.fecha, "%Y-%m-%d").date()
-            if d1 <= rf <= d2:
-                res.append(r)
+        for mes in self._meses_en_rango(d1, d2):
+            for r in self._mes_cargado(mes).values():
+                rf = datetime.strptime(r.fecha, "%Y-%m-%d").date()
+                if d1 <= rf <= d2:
+                    res.append(r)
         res.sort(key=lambda x: (x.fecha, x.folio))
         return res
 
+    def _mes_de_folio(self, folio: str) -> Optional[str]:
+        # Normalmente el folio está en un mes ya cargado (se eligió de una consulta);
+        # si no, se van leyendo los demás hasta encontrarlo
+        for mes in sorted(self._cargados) + sorted(self._meses - set(self._cargados)):
+            if folio in self._mes_cargado(mes):
+                return mes
+        return None
+
     def editar_nombre_evento(self, folio: str, nuevo_nombre: str) -> Reservacion:
-        if folio not in self.reservas:
+        mes = self._mes_de_folio(folio)
+        if mes is None:
             raise ValueError("Folio no encontrado.")
         nuevo_nombre = (nuevo_nombre or "").strip()
         if not nuevo_nombre:
             raise ValueError("El nuevo nombre del evento no puede estar vacío.")
-        self.reservas[folio].evento = nuevo_nombre
+        reserva = self._cargados[mes][folio]
+        reserva.evento = nuevo_nombre
+        self._sucios.add(mes)
         self._guardar()
-        return self.reservas[folio]
+        return reserva
 
     # -----------------------------
     # (David Oswaldo) Consultas y formato
@@ -230,7 +308,7 @@ class Repositorio:
         except ValueError:
             raise ValueError("Formato de fecha inválido. Use YYYY-MM-DD.")
 
-        res = [r for r in self.reservas.values() if r.fecha == fecha_iso]
+        res = [r for r in self._mes_cargado(fecha_iso[:7]).values() if r.fecha == fecha_iso]
         res.sort(key=lambda x: (x.turno, x.folio))
         return res
 
@@ -393,7 +471,7 @@ def opcion_editar_evento(repo: Repositorio):
     print(_linea())
     print("EDITAR NOMBRE DE EVENTO (por rango de fechas)")
     print(_linea())
-    if not repo.reservas:
+    if not repo.hay_reservas():
         print("No hay reservaciones registradas.")
         pausar()
         return